@@ -0,0 +1,131 @@
+"""
+イベントのシリアライズ処理のベンチマーク
+
+以前の方式（行ごとにEventのPydanticモデルを作成し、レスポンス時にFastAPIが
+response_model で再検証してからJSONに変換する）と、serialize_events で行から
+直接dictを作る方式の、1イベントあたりの処理時間を比較する。
+DBには接続せず、列のタプル（Row）と同じ属性を持つダミー行を使用する。
+
+実行方法 (api ディレクトリで):
+    python benchmarks/bench_event_serialization.py -n 1000 -r 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from src.models import EventTypeEnum
+from src.schemas.database.event import (
+    EVENT_COLUMNS, Event as EventSchema, event_image_url, serialize_events
+)
+
+EventRow = namedtuple("EventRow", [column.name for column in EVENT_COLUMNS])
+
+
+def make_rows(count: int) -> List[EventRow]:
+    """ベンチマーク用のダミー行を作成する"""
+    now = datetime(2025, 5, 1, 10, 0)
+    rows = []
+    for i in range(count):
+        start = now + timedelta(hours=i)
+        rows.append(EventRow(
+            event_id=uuid.uuid4(),
+            company_id=uuid.uuid4(),
+            event_type=EventTypeEnum.SEMINAR,
+            title=f"イベント {i}",
+            image_etag=uuid.uuid4().hex * 2 if i % 2 else None,
+            description="イベントの説明文です。" * 5,
+            start_date=start,
+            end_date=start + timedelta(hours=2),
+            location="東京都千代田区",
+            reward="5000円",
+            required_qualifications="普通自動車免許, 危険物取扱者",
+            available_spots=10,
+            remaining_spots=3,
+            created_at=now,
+            updated_at=now,
+            tags=[{"label": "溶接", "color": "hsl(10, 70%, 60%)"},
+                  {"label": "金属加工", "color": "hsl(200, 70%, 60%)"}],
+        ))
+    return rows
+
+
+def legacy_payload(row: EventRow) -> dict:
+    """以前の方式でEventモデルに渡していたペイロード"""
+    return {
+        "event_id": row.event_id,
+        "company_id": row.company_id,
+        "event_type": row.event_type.value,
+        "title": row.title,
+        "description": row.description,
+        "start_date": row.start_date,
+        "end_date": row.end_date,
+        "location": row.location,
+        "reward": row.reward,
+        "required_qualifications": [q.strip() for q in row.required_qualifications.split(",") if q.strip()],
+        "available_spots": row.available_spots,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "tags": row.tags,
+        "image": None,
+        "image_etag": row.image_etag,
+        "image_url": event_image_url(row.event_id, row.image_etag),
+        "image_thumbnail_url": event_image_url(row.event_id, row.image_etag, "thumb"),
+        "remaining_spots": row.remaining_spots,
+    }
+
+
+RESPONSE_ADAPTER = TypeAdapter(List[EventSchema])
+
+
+def serialize_before(rows: List[EventRow]) -> str:
+    """以前の方式: モデル作成 → response_model での再検証 → JSON化"""
+    models = [EventSchema.model_validate(legacy_payload(row)) for row in rows]
+    validated = RESPONSE_ADAPTER.validate_python(models)
+    return json.dumps(RESPONSE_ADAPTER.dump_python(validated, mode="json"))
+
+
+def serialize_after(rows: List[EventRow]) -> str:
+    """現在の方式: serialize_events で直接dictを作りJSON化"""
+    return json.dumps(serialize_events(rows))
+
+
+def measure(func, rows: List[EventRow], repeat: int) -> float:
+    """最速の実行時間から1イベントあたりのマイクロ秒を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="イベントのシリアライズ処理のベンチマーク")
+    parser.add_argument("-n", "--events", type=int, default=1000, help="1回あたりのイベント数")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="繰り返し回数（最速の結果を使用）")
+    args = parser.parse_args()
+
+    rows = make_rows(args.events)
+    # 両方式の出力が同じ内容になることを確認
+    assert json.loads(serialize_before(rows)) == json.loads(serialize_after(rows))
+
+    before = measure(serialize_before, rows, args.repeat)
+    after = measure(serialize_after, rows, args.repeat)
+    print(f"events={args.events} repeat={args.repeat}")
+    print(f"before (Pydantic + response_model): {before:8.2f} us/event")
+    print(f"after  (serialize_events)        : {after:8.2f} us/event")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+ランキング (InMemoryLeaderboardBackend) のベンチマーク
+
+プレイヤー数ごとに、経験値の付与 (add)・上位100件の取得 (top)・順位の取得 (rank) の1回あたりの処理時間を計測する。
+比較のため、全プレイヤーを並べ替えて上位100件・順位を求める場合 (ORDER BY experience 相当) の処理時間もあわせて表示する。
+
+実行方法 (api ディレクトリで):
+    python benchmarks/bench_leaderboard.py --players 10000 100000 -n 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.leaderboard import InMemoryLeaderboardBackend
+
+BOARD = "global"
+
+
+def per_call_us(start: float, number: int) -> float:
+    return (time.perf_counter() - start) / number * 1_000_000
+
+
+async def run(players: int, number: int, seed: int) -> None:
+    rng = random.Random(seed)
+    members = [f"user-{i}" for i in range(players)]
+    backend = InMemoryLeaderboardBackend()
+    for member in members:
+        await backend.set(BOARD, member, rng.randint(0, 100000))
+
+    start = time.perf_counter()
+    for _ in range(number):
+        await backend.add(BOARD, rng.choice(members), rng.randint(1, 300))
+    add_us = per_call_us(start, number)
+
+    start = time.perf_counter()
+    for _ in range(number):
+        await backend.top(BOARD, 100)
+    top_us = per_call_us(start, number)
+
+    start = time.perf_counter()
+    for _ in range(number):
+        await backend.rank(BOARD, rng.choice(members))
+    rank_us = per_call_us(start, number)
+
+    # 全件の並べ替え (毎回 ORDER BY する場合の下限の目安。DBとの通信は含まない)
+    scores = dict(await backend.members(BOARD))
+    sort_number = max(number // 100, 1)
+    start = time.perf_counter()
+    for _ in range(sort_number):
+        ranking = sorted(scores.items(), key=lambda item: -item[1])
+        ranking[:100]
+    sort_us = per_call_us(start, sort_number)
+
+    print(
+        f"players={players:>8d}  add={add_us:7.1f} us  top100={top_us:7.1f} us  rank={rank_us:7.1f} us  "
+        f"full-sort={sort_us:10.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ランキングのベンチマーク")
+    parser.add_argument("--players", type=int, nargs="+", default=[1000, 10000, 100000], help="プレイヤー数")
+    parser.add_argument("-n", "--number", type=int, default=2000, help="操作ごとの呼び出し回数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for players in args.players:
+        asyncio.run(run(players, args.number, args.seed))
+
+
+if __name__ == "__main__":
+    main()
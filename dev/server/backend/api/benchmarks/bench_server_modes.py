@@ -0,0 +1,91 @@
+"""
+起動モード (SERVER_MODE=development / production) ごとのスループットの比較
+
+モードごとに main.py をサブプロセスとして起動し、--concurrency 本の Keep-Alive 接続から
+--duration 秒間 GET --path を送り続けて、リクエスト数/秒とレイテンシ (p50 / p99) を表示する。
+クライアントは benchmarks/common.py の asyncio 実装を使う。
+
+実行方法 (api ディレクトリで):
+    python benchmarks/bench_server_modes.py --duration 10 --concurrency 64
+    # DBを使うエンドポイントを計測する場合 (PostgreSQLを起動した状態で)
+    python benchmarks/bench_server_modes.py --path /event/<event_id>
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from common import run_load
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(mode: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, SERVER_MODE=mode, PORT=str(port), LOG_LEVEL="WARNING")
+    if workers:
+        env["WEB_CONCURRENCY"] = str(workers)
+    # 自動リロードやワーカーの子プロセスもまとめて終了できるよう、新しいプロセスグループで起動する
+    return subprocess.Popen(
+        [sys.executable, "main.py"], cwd=API_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_until_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/livez", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"ポート {port} のサーバーが起動しませんでした")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動モードごとのスループットの比較")
+    parser.add_argument("--path", default="/livez", help="計測するエンドポイント")
+    parser.add_argument("--duration", type=float, default=10.0, help="モードごとの計測秒数")
+    parser.add_argument("--concurrency", type=int, default=64, help="同時接続数")
+    parser.add_argument("--workers", type=int, default=0, help="production のワーカー数 (0: CPUコア数)")
+    parser.add_argument("--port", type=int, default=3100, help="計測に使うポート")
+    parser.add_argument("--modes", default="development,production", help="計測するモード (カンマ区切り)")
+    args = parser.parse_args()
+
+    print(f"path={args.path} duration={args.duration}s concurrency={args.concurrency}")
+    results = {}
+    factory = lambda rng: ("GET", args.path, None)
+    for mode in args.modes.split(","):
+        process = start_server(mode, args.port, args.workers)
+        try:
+            wait_until_ready(args.port)
+            # ウォームアップ
+            asyncio.run(run_load("127.0.0.1", args.port, factory, 1.0, args.concurrency))
+            result = asyncio.run(run_load("127.0.0.1", args.port, factory, args.duration, args.concurrency))
+        finally:
+            stop_server(process)
+
+        results[mode] = result["rps"]
+        print(
+            f"{mode:12s} {result['rps']:9.0f} req/s  "
+            f"p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  errors={result['errors']}"
+        )
+
+    if results.get("development") and results.get("production"):
+        print(f"production / development: {results['production'] / results['development']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+タグの正規化処理 (normalize_tags / is_normalized) のベンチマーク
+
+DBやAPIで受け取る形式 (JSON文字列・カンマ区切り・文字列のリスト・正規形) ごとに、
+normalize_tags の1回あたりの処理時間を計測する。
+読み出し時の高速パス (is_normalized で正規形かを判定するだけ) の処理時間もあわせて表示する。
+
+実行方法 (api ディレクトリで):
+    python benchmarks/bench_tag_normalizer.py -n 100000 -r 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.tag_normalizer import is_normalized, normalize_tags
+
+LABELS = ["金属加工", "プラスチック成形", "組立", "検査", "包装"]
+
+INPUTS = {
+    "json-string": json.dumps(LABELS, ensure_ascii=False),
+    "comma-separated": ",".join(LABELS),
+    "list-of-str": LABELS,
+    "list-of-dict": [{"label": label} for label in LABELS],
+    "normalized": normalize_tags(LABELS),
+}
+
+
+def measure(func: Callable[[Any], Any], value: Any, number: int, repeat: int) -> float:
+    """最速の実行時間から1回あたりのナノ秒を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(value)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1_000_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="タグの正規化処理のベンチマーク")
+    parser.add_argument("-n", "--number", type=int, default=100000, help="1回の計測での呼び出し回数")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="繰り返し回数（最速の結果を使用）")
+    args = parser.parse_args()
+
+    print(f"number={args.number} repeat={args.repeat} tags={len(LABELS)}")
+    for name, value in INPUTS.items():
+        print(f"normalize_tags({name:15s}): {measure(normalize_tags, value, args.number, args.repeat):8.0f} ns/call")
+    normalized = INPUTS["normalized"]
+    print(f"is_normalized(normalized)      : {measure(is_normalized, normalized, args.number, args.repeat):8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+ベンチマーク・負荷テストで共通に使う処理
+
+- asyncio で実装した Keep-Alive の HTTP/1.1 クライアント（クライアント側がボトルネックになりにくい）
+- レイテンシのパーセンタイルと、結果のまとめ (JSON に保存する形式)
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (メソッド, パス, JSONボディ) を返す関数。リクエストごとに呼び出して内容を変える
+RequestFactory = Callable[[random.Random], Tuple[str, str, Optional[Any]]]
+
+
+class HttpConnection:
+    """1本の Keep-Alive 接続で、順番にリクエストを送るクライアント"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def open(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, bytes]:
+        """リクエストを送り、(ステータスコード, レスポンスボディ) を返す"""
+        if self.writer is None:
+            await self.open()
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nConnection: keep-alive\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + payload)
+        header = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(header.split(b" ", 2)[1])
+        length = 0
+        close = False
+        for line in header.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"connection" and value.strip().lower() == b"close":
+                close = True
+        data = await self.reader.readexactly(length)
+        if close:
+            self.close()
+        return status, data
+
+
+def percentile(values: List[float], p: float) -> float:
+    """p (0〜1) パーセンタイルの値を返す"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+async def run_load(
+    host: str,
+    port: int,
+    factory: RequestFactory,
+    duration: float,
+    concurrency: int,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    concurrency 本の接続から duration 秒間リクエストを送り続け、結果をまとめて返す
+    :param factory: リクエストの内容を返す関数
+    :param seed: リクエストの内容を決める乱数のシード（接続ごとに seed + 接続番号 を使う）
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed + index)
+        conn = HttpConnection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                method, path, body = factory(rng)
+                start = time.perf_counter()
+                try:
+                    status, _ = await conn.request(method, path, body)
+                except (OSError, asyncio.IncompleteReadError):
+                    conn.close()
+                    status = 0  # 接続エラー
+                latencies.append(time.perf_counter() - start)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, elapsed)
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    """レイテンシ (ミリ秒) とリクエスト数/秒をまとめる"""
+    errors = sum(count for status, count in statuses.items() if status == "0" or status.startswith("5"))
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+    }
@@ -0,0 +1,146 @@
+"""
+募集枠管理 (EventAdmission) の負荷テスト
+
+起動中のAPIサーバーに対して、募集人数 --spots のイベントを作成し、
+--requests 件の POST /join-event を --concurrency 並列で送信する。
+その後、PENDING/APPROVED の応募数が募集人数を超えていないこと（オーバーブッキングがないこと）と、
+残り枠数・キャンセル待ちの件数が整合していることを確認する。
+また、最も古い応募をキャンセル待ちに変更したときに、その応募自身が繰り上げられず、
+次のキャンセル待ちが繰り上げられることを確認する。問題があれば終了コード1で終了する。
+
+実行方法 (api ディレクトリで、PostgreSQL と API サーバーを起動した状態で):
+    python benchmarks/load_test_admission.py --company-id <companyテーブルのuser_id> \
+        --spots 10 --requests 500 --concurrency 50
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+PENDING = "未対応"
+APPROVED = "承認"
+WAITLISTED = "キャンセル待ち"
+
+
+def request_json(base_url: str, method: str, path: str, body=None):
+    """JSONのリクエストを送信し、(ステータスコード, レスポンス) を返す"""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(
+        base_url + path, data=data, method=method,
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=60) as res:
+            return res.status, json.loads(res.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def create_event(base_url: str, company_id: str, spots: int) -> str:
+    start = datetime.now().replace(microsecond=0) + timedelta(days=30)
+    status, body = request_json(base_url, "POST", "/event", {
+        "company_id": company_id,
+        "event_type": "説明会",
+        "title": f"負荷テスト {start.isoformat()}",
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(hours=2)).isoformat(),
+        "available_spots": spots,
+    })
+    if status != 201:
+        raise RuntimeError(f"イベントを作成できませんでした: {status} {body}")
+    return body["event_id"]
+
+
+def join(base_url: str, event_id: str, index: int):
+    return request_json(base_url, "POST", "/join-event", {
+        "applicant": {
+            "applicant_id": str(uuid.uuid4()),
+            "company_id": "",
+            "event_id": event_id,
+            "name": f"負荷 {index}",
+            "phone_num": "000-0000-0000",
+            # 応募者はメールアドレスで特定されるため、実行ごとに別の応募者にする
+            "email": f"load{index}-{event_id}@example.com",
+        },
+        "event_id_model": {"event_id": event_id},
+    })
+
+
+def check_demotion(base_url: str, company_id: str) -> list:
+    """
+    募集人数1のイベントで、枠を確保した最も古い応募をキャンセル待ちに変更し、
+    その応募はキャンセル待ちのまま、次のキャンセル待ちが繰り上げられることを確認する
+    :return: 問題の一覧
+    """
+    event_id = create_event(base_url, company_id, 1)
+    (_, first), (_, second) = join(base_url, event_id, 0), join(base_url, event_id, 1)
+    if first.get("status") != PENDING or second.get("status") != WAITLISTED:
+        return [f"キャンセル待ちの確認用の応募を作成できませんでした: {first} {second}"]
+
+    errors = []
+    _, demoted = request_json(base_url, "PUT", f"/applications/{first['application_id']}", {"status": WAITLISTED})
+    if demoted.get("status") != WAITLISTED:
+        errors.append(f"キャンセル待ちに変更した応募が繰り上げられました: {demoted.get('status')}")
+    # 繰り上げられていれば枠を確保済みのため、承認できる
+    code, _ = request_json(base_url, "PUT", f"/applications/{second['application_id']}", {"status": APPROVED})
+    if code != 200:
+        errors.append(f"次のキャンセル待ちが繰り上げられていません (承認: {code})")
+    _, event = request_json(base_url, "GET", f"/event/{event_id}")
+    if event.get("remaining_spots") != 0:
+        errors.append(f"キャンセル待ちへの変更後の残り枠数が一致しません: {event.get('remaining_spots')} != 0")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="募集枠管理の負荷テスト")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--company-id", required=True, help="イベントを作成する企業のID")
+    parser.add_argument("--spots", type=int, default=10, help="募集人数")
+    parser.add_argument("--requests", type=int, default=500, help="参加リクエストの件数")
+    parser.add_argument("--concurrency", type=int, default=50, help="同時に送信するリクエスト数")
+    args = parser.parse_args()
+
+    event_id = create_event(args.base_url, args.company_id, args.spots)
+    print(f"event_id={event_id} spots={args.spots} requests={args.requests} concurrency={args.concurrency}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda i: join(args.base_url, event_id, i), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    status_codes = Counter(code for code, _ in results)
+    statuses = Counter(body.get("status") for code, body in results if code == 200)
+    admitted = statuses[PENDING] + statuses[APPROVED]
+    _, event = request_json(args.base_url, "GET", f"/event/{event_id}")
+
+    print(f"elapsed={elapsed:.2f}s ({args.requests / elapsed:.0f} req/s)")
+    print(f"http status: {dict(status_codes)}")
+    print(f"application status: {dict(statuses)}")
+    print(f"remaining_spots: {event.get('remaining_spots')}")
+
+    errors = []
+    if admitted > args.spots:
+        errors.append(f"オーバーブッキング: {admitted}件の応募が枠を確保しました (募集人数 {args.spots})")
+    if status_codes[200] == args.requests and admitted != min(args.spots, args.requests):
+        errors.append(f"枠が余っています: 確保 {admitted}件 / 募集人数 {args.spots}")
+    if event.get("remaining_spots") != args.spots - admitted:
+        errors.append(f"残り枠数が一致しません: {event.get('remaining_spots')} != {args.spots - admitted}")
+    if statuses[WAITLISTED] != status_codes[200] - admitted:
+        errors.append("キャンセル待ちの件数が一致しません")
+    errors += check_demotion(args.base_url, args.company_id)
+
+    for error in errors:
+        print(f"NG: {error}")
+    if errors:
+        sys.exit(1)
+    print("OK: オーバーブッキングはありませんでした")
+
+
+if __name__ == "__main__":
+    main()
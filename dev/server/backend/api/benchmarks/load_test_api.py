@@ -0,0 +1,172 @@
+"""
+APIの主要なエンドポイントの負荷テスト
+
+seed.py で投入したデータ (--manifest) を使い、シナリオごとに --concurrency 本の Keep-Alive 接続から
+--duration 秒間リクエストを送り続けて、リクエスト数/秒と p50 / p95 / p99 を計測する。
+結果は JSON (--output) に保存し、--compare に以前の結果を指定すると差分を表示する。
+
+シナリオ:
+    get-events     POST /get-events (seed.py で投入した期間の日付をランダムに指定)
+    event-list     GET  /event?cursor=&limit=50
+    event-detail   GET  /event/{event_id}
+    applications   GET  /applications?cursor=&limit=50
+    reviews        GET  /reviews?cursor=&limit=50
+    join-event     POST /join-event (書き込み。応募者・応募が増える)
+    search         GET  /events/search?q= (SEARCH_QUERIES からランダムに選んだ検索語)
+    filter         GET  /events/filter (FILTER_QUERIES からランダムに選んだ条件。ファセットの集計を含む)
+
+実行方法 (api ディレクトリで、PostgreSQL と API サーバーを起動した状態で):
+    python benchmarks/seed.py --events 100000 --applicants 20000
+    python benchmarks/load_test_api.py --duration 30 --concurrency 32 --output benchmarks/results/baseline.json
+    # 変更後に同じ条件で計測し、基準と比較する
+    python benchmarks/load_test_api.py --compare benchmarks/results/baseline.json --output benchmarks/results/after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict
+from urllib.parse import quote
+
+from common import RequestFactory, run_load
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MANIFEST = os.path.join(BENCHMARKS_DIR, "results", "seed_manifest.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIR, "results", "load_test_api.json")
+
+# filter シナリオの条件 (seed.py が使う EventGenerator の語彙)
+FILTER_QUERIES = [
+    "",
+    "prefecture=東京都",
+    "tag=金属加工",
+    "tag=金属加工&tag=検査&prefecture=大阪府",
+    "reward_min=5000&reward_max=6000",
+    "event_type=説明会&qualification=CADの基礎知識",
+]
+# search シナリオの検索語 (seed.py が使う EventGenerator の語彙。一致件数の多い語・少ない語・複数語を含む)
+SEARCH_QUERIES = ["金属加工", "大田区", "検査", "プラスチック成形", "金属加工 大田区", "組立 セミナー", "最新技術", "存在しない語"]
+
+
+def build_scenarios(manifest: Dict[str, Any]) -> Dict[str, RequestFactory]:
+    """シナリオ名 → リクエストを作る関数"""
+    event_ids = manifest["event_ids"]
+    dates = manifest["dates"]
+    applicant_ids = manifest.get("applicant_ids") or []
+
+    def join_event(rng):
+        event_id = rng.choice(event_ids)
+        return "POST", "/join-event", {
+            "applicant": {
+                "applicant_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "company_id": "",
+                "event_id": event_id,
+                "name": "負荷 テスト",
+                "phone_num": "000-0000-0000",
+                "email": "load@example.com",
+            },
+            "event_id_model": {"event_id": event_id},
+        }
+
+    return {
+        "get-events": lambda rng: ("POST", "/get-events", {"target_date": rng.choice(dates)}),
+        "event-list": lambda rng: ("GET", "/event?cursor=&limit=50", None),
+        "event-detail": lambda rng: ("GET", f"/event/{rng.choice(event_ids)}", None),
+        "applications": lambda rng: ("GET", "/applications?cursor=&limit=50", None),
+        "reviews": lambda rng: ("GET", "/reviews?cursor=&limit=50", None),
+        "join-event": join_event,
+        "search": lambda rng: ("GET", f"/events/search?q={quote(rng.choice(SEARCH_QUERIES))}&limit=20", None),
+        "filter": lambda rng: ("GET", f"/events/filter?{quote(rng.choice(FILTER_QUERIES), safe='=&')}&limit=20", None),
+        "recommend": lambda rng: ("GET", f"/applicant/{rng.choice(applicant_ids)}/recommended-events?limit=20", None),
+        "calendar": lambda rng: ("GET", f"/events/calendar?month={rng.choice(dates)[:7]}", None),
+        "feed": lambda rng: ("GET", f"/applicant/{rng.choice(applicant_ids)}/feed?limit=20", None),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_comparison(baseline: Dict[str, Any], results: Dict[str, Any]) -> None:
+    """以前の結果との差分を表示する (RPSは増加、レイテンシは減少が改善)"""
+    print(f"\ncompare with {baseline.get('revision') or '-'} ({baseline.get('timestamp')})")
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        diffs = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                diffs.append(f"{key} {(result[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"  {name:14s} " + "  ".join(diffs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIの主要なエンドポイントの負荷テスト")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--scenarios", default="get-events,event-list,event-detail,applications,reviews,search,filter,calendar,recommend,feed,join-event",
+                        help="実行するシナリオ (カンマ区切り)")
+    parser.add_argument("--duration", type=float, default=30.0, help="シナリオごとの計測秒数")
+    parser.add_argument("--warmup", type=float, default=3.0, help="シナリオごとのウォームアップ秒数")
+    parser.add_argument("--concurrency", type=int, default=32, help="同時接続数")
+    parser.add_argument("--seed", type=int, default=0, help="リクエスト内容を決める乱数のシード")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="seed.py が保存した manifest")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果の保存先 (JSON)")
+    parser.add_argument("--compare", help="比較する以前の結果 (JSON)")
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    scenarios = build_scenarios(manifest)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f"不明なシナリオ: {', '.join(unknown)}")
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "target": f"{args.host}:{args.port}",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "data": manifest.get("counts"),
+        "scenarios": {},
+    }
+    print(f"target={results['target']} concurrency={args.concurrency} duration={args.duration}s data={results['data']}")
+    for name in names:
+        factory = scenarios[name]
+        if args.warmup > 0:
+            asyncio.run(run_load(args.host, args.port, factory, args.warmup, args.concurrency, args.seed))
+        result = asyncio.run(run_load(args.host, args.port, factory, args.duration, args.concurrency, args.seed))
+        results["scenarios"][name] = result
+        print(
+            f"  {name:14s} {result['rps']:8.1f} req/s  p50={result['p50_ms']:.2f}ms  "
+            f"p95={result['p95_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  "
+            f"errors={result['errors']}  statuses={result['statuses']}"
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"saved: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), results)
+
+    if any(result["errors"] for result in results["scenarios"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
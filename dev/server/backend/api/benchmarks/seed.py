@@ -0,0 +1,292 @@
+"""
+負荷テスト用のデータを PostgreSQL に投入するスクリプト
+
+企業・応募者・イベント・応募・レビューを指定した件数 (1万〜100万件規模) だけ作成する。
+イベントの内容 (タイトル・説明・場所・資格・タグ・画像) は EventGenerator の候補から選ぶ。
+乱数のシードを固定しているため、同じ引数なら同じデータになる。
+--fixtures を指定すると、先に database/init/1_insert.sql の固定データを投入する（未投入の場合のみ）。
+
+投入後、負荷テスト (load_test_api.py) が使うイベントID・日付などを --manifest に保存する。
+
+実行方法 (api ディレクトリで、PostgreSQL を起動した状態で):
+    python benchmarks/seed.py --events 10000 --applicants 5000 --applications-per-event 3
+    python benchmarks/seed.py --events 1000000 --applicants 100000 --truncate
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+# 同期エンジンのみ使う
+os.environ.setdefault("DB_ASYNC", "false")
+
+from sqlalchemy import column, insert, table, text
+
+from src.classes.event_facets import derive_facet_values
+from src.classes.event_matching import qualification_tokens
+from src.classes.tag_normalizer import normalize_tags
+from src.database import engine
+from src.demo.generator import EventGenerator
+from src.models import (
+    Applicant as ApplicantModel, ApplicantFeedState as ApplicantFeedStateModel, Application as ApplicationModel, ApplicationStatusEnum,
+    Event as EventModel, EventQualification as EventQualificationModel, EventTypeEnum, Review as ReviewModel
+)
+
+FIXTURES_SQL = os.path.join(API_DIR, "..", "database", "init", "1_insert.sql")
+DEFAULT_MANIFEST = os.path.join(API_DIR, "benchmarks", "results", "seed_manifest.json")
+
+# モデルが定義されていないテーブル
+users_table = table(
+    "users", column("user_id"), column("user_type"), column("user_name"), column("created_at")
+)
+company_table = table(
+    "company", column("user_id"), column("company_name"), column("mail_address"), column("address")
+)
+
+HOLDING_STATUSES = (ApplicationStatusEnum.PENDING, ApplicationStatusEnum.APPROVED)
+
+
+def new_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def insert_batches(conn, target, rows: List[Dict], batch_size: int) -> None:
+    for i in range(0, len(rows), batch_size):
+        conn.execute(insert(target), rows[i:i + batch_size])
+
+
+def load_fixtures(conn) -> None:
+    """1_insert.sql の固定データを投入する（既に投入済みの場合は何もしない）"""
+    exists = conn.execute(
+        text("SELECT 1 FROM users WHERE user_id = '11111111-1111-1111-1111-111111111111'")
+    ).first()
+    if exists:
+        print("fixtures: 投入済みのためスキップしました")
+        return
+    with open(FIXTURES_SQL, encoding="utf-8") as f:
+        conn.exec_driver_sql(f.read())
+    print("fixtures: 1_insert.sql を投入しました")
+
+
+def seed_users(conn, rng: random.Random, args) -> Dict[str, List[uuid.UUID]]:
+    now = datetime.now()
+    qualifications = EventGenerator().required_qualifications
+    company_ids = [new_uuid(rng) for _ in range(args.companies)]
+    applicant_ids = [new_uuid(rng) for _ in range(args.applicants)]
+
+    insert_batches(conn, users_table, [
+        {"user_id": user_id, "user_type": "COMPANY", "user_name": f"負荷テスト企業 {i}", "created_at": now}
+        for i, user_id in enumerate(company_ids)
+    ] + [
+        {"user_id": user_id, "user_type": "APPLICANT", "user_name": f"負荷テスト {i}", "created_at": now}
+        for i, user_id in enumerate(applicant_ids)
+    ], args.batch_size)
+    insert_batches(conn, company_table, [
+        {
+            "user_id": user_id,
+            "company_name": f"負荷テスト企業 {i}",
+            "mail_address": f"company{i}@example.com",
+            "address": "東京都 大田区",
+        }
+        for i, user_id in enumerate(company_ids)
+    ], args.batch_size)
+    insert_batches(conn, ApplicantModel, [
+        {
+            "user_id": user_id,
+            "last_name": "負荷",
+            "first_name": f"テスト{i}",
+            "mail_address": f"applicant{i}@example.com",
+            "phone_number": "000-0000-0000",
+            # おすすめイベント (recommend シナリオ) の照合用の資格
+            "license": ", ".join(rng.sample(qualifications, k=rng.randint(1, 4))),
+        }
+        for i, user_id in enumerate(applicant_ids)
+    ], args.batch_size)
+    # フィード (feed シナリオ) は python -m src.classes.applicant_feed rebuild で作成する
+    insert_batches(conn, ApplicantFeedStateModel, [
+        {"user_id": user_id, "dirty": True} for user_id in applicant_ids
+    ], args.batch_size)
+    return {"company_ids": company_ids, "applicant_ids": applicant_ids}
+
+
+def load_images(generator: EventGenerator) -> List[Dict]:
+    """EventGenerator のサンプル画像を読み込む（イベントごとに読み込まないよう一度だけ）"""
+    images = []
+    for path in generator.sample_images:
+        with open(os.path.join(API_DIR, path), "rb") as f:
+            data = f.read()
+        images.append({"image": data, "image_etag": hashlib.sha256(data).hexdigest()})
+    return images
+
+
+def seed_events(conn, rng: random.Random, args, users: Dict[str, List[uuid.UUID]]) -> Dict:
+    """
+    イベントと、その応募・レビューを args.batch_size 件のイベントごとに投入する
+    応募者は (応募の番号 + イベントの番号 * 7) % 応募者数 で選ぶため、同じイベントに重複して応募しない。
+    """
+    generator = EventGenerator()
+    images = load_images(generator) if args.with_images else []
+    company_ids = users["company_ids"]
+    applicant_ids = users["applicant_ids"]
+    applications_per_event = min(args.applications_per_event, len(applicant_ids))
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days // 3)
+
+    event_ids: List[str] = []
+    counts = {"events": 0, "applications": 0, "reviews": 0}
+    for batch_start in range(0, args.events, args.batch_size):
+        events, applications, reviews, event_qualifications = [], [], [], []
+        for e in range(batch_start, min(batch_start + args.batch_size, args.events)):
+            index = rng.randrange(len(generator.event_titles))
+            start = first_day + timedelta(days=rng.randrange(args.days), hours=rng.randint(9, 16))
+            spots = rng.randint(5, 20)
+            event_id = new_uuid(rng)
+            company_id = company_ids[e % len(company_ids)]
+
+            holding = 0
+            for j in range(applications_per_event):
+                if holding < spots:
+                    status = rng.choices(
+                        (ApplicationStatusEnum.PENDING, ApplicationStatusEnum.APPROVED, ApplicationStatusEnum.REJECTED),
+                        weights=(5, 4, 1)
+                    )[0]
+                else:
+                    status = ApplicationStatusEnum.WAITLISTED
+                holding += status in HOLDING_STATUSES
+                application_id = new_uuid(rng)
+                applied_at = start - timedelta(days=rng.randint(1, 30), minutes=rng.randrange(1440))
+                applications.append({
+                    "application_id": application_id,
+                    "event_id": event_id,
+                    "user_id": applicant_ids[(j + e * 7) % len(applicant_ids)],
+                    "status": status,
+                    "applied_at": applied_at,
+                })
+                if status == ApplicationStatusEnum.APPROVED and rng.random() < args.review_ratio:
+                    reviews.append({
+                        "review_id": new_uuid(rng),
+                        "application_id": application_id,
+                        "reviewer_id": company_id,
+                        "rating": rng.randint(2, 10) / 2,
+                        "comment": "負荷テスト用のレビューです。",
+                        "created_at": applied_at + timedelta(days=1),
+                    })
+
+            row = {
+                "event_id": event_id,
+                "company_id": company_id,
+                "event_type": rng.choice(list(EventTypeEnum)),
+                "title": generator.event_titles[index],
+                "description": generator.event_descriptions[index],
+                "start_date": start,
+                "end_date": start + timedelta(hours=rng.randint(1, 3)),
+                "location": rng.choice(generator.event_locations),
+                "reward": f"{rng.randint(40, 80) * 100}円",
+                "required_qualifications": ", ".join(rng.sample(generator.required_qualifications, k=rng.randint(1, 3))),
+                "available_spots": spots,
+                "remaining_spots": spots - holding,
+                "created_at": start - timedelta(days=rng.randint(30, 60)),
+                "tags": normalize_tags(rng.sample(generator.event_types, k=rng.randint(1, 3))),
+                "image": None,
+                "image_etag": None,
+            }
+            row.update(derive_facet_values(row["reward"], row["location"], row["required_qualifications"]))
+            tokens = qualification_tokens(row["required_qualifications"])
+            event_qualifications.extend(
+                {
+                    "qualification": token, "event_id": event_id, "start_date": start,
+                    "reward_amount": row["reward_amount"], "required_count": len(tokens),
+                }
+                for token in tokens
+            )
+            if images:
+                row.update(rng.choice(images))
+            events.append(row)
+            if len(event_ids) < args.manifest_events:
+                event_ids.append(str(event_id))
+
+        insert_batches(conn, EventModel, events, args.batch_size)
+        insert_batches(conn, EventQualificationModel, event_qualifications, args.batch_size)
+        insert_batches(conn, ApplicationModel, applications, args.batch_size)
+        insert_batches(conn, ReviewModel, reviews, args.batch_size)
+        conn.commit()
+        counts["events"] += len(events)
+        counts["applications"] += len(applications)
+        counts["reviews"] += len(reviews)
+        print(f"  events {counts['events']}/{args.events}", end="\r", flush=True)
+
+    print()
+    dates = [(first_day + timedelta(days=d)).date().isoformat() for d in range(args.days)]
+    return {"counts": counts, "event_ids": event_ids, "dates": dates}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="負荷テスト用のデータを投入する")
+    parser.add_argument("--events", type=int, default=10000, help="イベント数")
+    parser.add_argument("--companies", type=int, default=100, help="企業数")
+    parser.add_argument("--applicants", type=int, default=5000, help="応募者数")
+    parser.add_argument("--applications-per-event", type=int, default=3, help="イベントあたりの応募数")
+    parser.add_argument("--review-ratio", type=float, default=0.5, help="承認済みの応募にレビューを付ける割合")
+    parser.add_argument("--days", type=int, default=90, help="イベントの開始日を分散させる日数 (今日の days/3 日前から)")
+    parser.add_argument("--with-images", action="store_true", help="イベントにサンプル画像を付ける")
+    parser.add_argument("--fixtures", action="store_true", help="先に 1_insert.sql の固定データを投入する")
+    parser.add_argument("--truncate", action="store_true", help="投入前にユーザー・イベント関連のテーブルを空にする")
+    parser.add_argument("--batch-size", type=int, default=5000, help="1回のINSERTの件数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="負荷テスト用の情報の保存先")
+    parser.add_argument("--manifest-events", type=int, default=1000, help="manifest に保存するイベントIDの件数")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if args.truncate:
+            conn.execute(text(
+                "TRUNCATE users, company, applicant, events, applications, reviews, idempotency_keys CASCADE"
+            ))
+            conn.commit()
+        if args.fixtures:
+            load_fixtures(conn)
+            conn.commit()
+
+        users = seed_users(conn, rng, args)
+        conn.commit()
+        result = seed_events(conn, rng, args, users)
+        # カレンダー表示用の集計を作り直す (APIでは apply_calendar_changes で更新している)
+        conn.execute(text("DELETE FROM event_calendar_days"))
+        conn.execute(text(
+            "INSERT INTO event_calendar_days (day, event_type, event_count) "
+            "SELECT date_trunc('day', start_date)::DATE, event_type, count(*) FROM events GROUP BY 1, 2"
+        ))
+        conn.commit()
+
+        # 統計情報を更新して、投入直後から実運用に近い実行計画にする
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+    elapsed = time.perf_counter() - started
+    counts = dict(companies=args.companies, applicants=args.applicants, **result["counts"])
+    print(f"seeded {counts} in {elapsed:.1f}s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump({
+            "seed": args.seed,
+            "counts": counts,
+            "company_ids": [str(company_id) for company_id in users["company_ids"][:20]],
+            "applicant_ids": [str(user_id) for user_id in users["applicant_ids"][:args.manifest_events]],
+            "event_ids": result["event_ids"],
+            "dates": result["dates"],
+        }, f, ensure_ascii=False, indent=2)
+    print(f"manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
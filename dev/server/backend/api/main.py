@@ -1,43 +1,95 @@
 """
 Main FastAPI application for Gamification API.
 """
+import asyncio
 import base64
+import csv
+import hashlib
+import io
 import os
 import sys
 import json
 import uuid
 import sqlalchemy
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from fastapi import Depends, FastAPI, HTTPException, APIRouter, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from PIL import Image, UnidentifiedImageError
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from dotenv import load_dotenv
 import uvicorn
 
 # local imports
-from src.database import get_db
+from src.logger import LOG_DEBUG_PAYLOADS, get_logger
+from src.server import server_options, worker_count
+from src import database
+from src.database import (
+    check_database, dispose_engine, get_async_db, get_db_connector, get_pool_status, init_db_connector,
+    is_pool_saturated
+)
 from src.schemas.database.applicant import ApplicantCreate, Applicant as ApplicantSchema
-from src.schemas.database.event import Event as EventSchema, EventCreate, EventUpdate
+from src.schemas.database.event import (
+    Event as EventSchema, EventCreate, EventUpdate, EVENT_COLUMNS, serialize_event, serialize_events
+)
 from src.schemas.database.review import Review as ReviewSchema, ReviewCreate, ReviewDetail
-from src.schemas.api.base import DateModel, DebugModel
+from src.schemas.api.base import DateModel, DateRangeModel, DebugModel
 from src.schemas.api.join_event import JoinEventRequest, EventIdModel, FrontendApplicant
+from src.schemas.api.bulk import BulkImportError, BulkImportResult
+from src.schemas.api.leaderboard import LeaderboardEntry, LeaderboardPage, LeaderboardRank
+from src.schemas.api.calendar import EventCalendarMonth
+from src.schemas.api.feed import ApplicantFeedPage
+from src.schemas.api.filter import EventFilterResult
+from src.schemas.api.pagination import CursorPage
+from src.schemas.api.recommend import RecommendedEvents
+from src.schemas.api.search import EventSearchResult
 # 古いschema.pyからschemasに移行完了
 from src.demo.generator import EventGenerator
 from src.classes.db_connector import DBConnector
+from src.classes.event_calendar import (
+    apply_calendar_changes, build_month_query, calendar_changes, parse_month, summarize_month
+)
+from src.classes.event_facets import build_facet_queries, build_filter_conditions, derive_facet_values
+from src.classes.event_matching import (
+    RECOMMEND_MAX_QUALIFICATIONS, build_recommendation_query, qualification_tokens, sync_event_qualifications
+)
+from src.classes.event_search import build_search_query, highlight_event, parse_terms
+from src.classes.admission import SPOT_HOLDING_STATUSES, EventAdmission
+from src.classes.applicant_feed import FeedRefresher, mark_applicants_dirty, record_event_feed_changes, refresh_feed
+from src.classes.image_store import ImageDerivativeStore
+from src.classes.leaderboard import (
+    GLOBAL_BOARD, InMemoryLeaderboardBackend, Leaderboard, RedisLeaderboardBackend, company_board, monthly_board
+)
+from src.classes.metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from src.classes.progression import (
+    XP_APPLICATION_APPROVED, XP_PARTICIPATION_COMPLETED, XP_REVIEW_PER_RATING, level_progress
+)
+from src.classes.response_cache import InMemoryCacheBackend, RedisCacheBackend, ResponseCache
+from src.classes.tag_normalizer import normalize_tags
+from src.classes.xp_ledger import XpAggregator, XpLedger
 from src.models import (
     Applicant as ApplicantModel,
+    ApplicantFeed as ApplicantFeedModel, ApplicantFeedState as ApplicantFeedStateModel,
     Application as ApplicationModel,
     ApplicationStatusEnum, Event as EventModel,
-    EventTypeEnum, Review as ReviewModel,
-    User as UserModel, UserTypeEnum
+    EventTypeEnum, IdempotencyKey as IdempotencyKeyModel, Participant as ParticipantModel,
+    ParticipantStatusEnum, Player as PlayerModel, Review as ReviewModel,
+    User as UserModel, UserTypeEnum, XpSourceEnum
 )
 from src.schemas.database.application import (
     ApplicationCreate, ApplicationDetail, ApplicationResponse, ApplicationUpdate
 )
+from src.schemas.database.participant import ParticipantResponse, ParticipantUpdate
+from src.schemas.database.player import Player as PlayerSchema
 # reviewsテーブルをリセット
 # reset_reviews_table()
 
@@ -57,6 +109,21 @@ if project_root not in sys.path:
 
 
 # --- ヘルパー関数 --- #
+logger = get_logger("main")
+
+
+def log_payload(message: str, route: str, payload: Any) -> None:
+    """
+    受信したリクエストの内容をログに出力する（デバッグ用。LOG_DEBUG_PAYLOADS=true の場合のみ）
+    画像 (Base64) などの長い項目はロガー側で切り詰める
+    """
+    if not LOG_DEBUG_PAYLOADS:
+        return
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    logger.info(message, extra={"route": route, "payload": payload})
+
+
 def get_event_type_enum(value: str) -> EventTypeEnum:
     """日本語の値からEventTypeEnumを取得する"""
     for enum_member in EventTypeEnum:
@@ -71,21 +138,317 @@ def get_application_status_enum(value: str) -> ApplicationStatusEnum:
         if enum_member.value == value:
             return enum_member
     raise ValueError(f"Invalid application_status value: {value}")
+
+
+def get_participant_status_enum(value: str) -> ParticipantStatusEnum:
+    """日本語の値からParticipantStatusEnumを取得する"""
+    for enum_member in ParticipantStatusEnum:
+        if enum_member.value == value:
+            return enum_member
+    raise ValueError(f"Invalid participant_status value: {value}")
+
+
+def strip_tz(value):
+    """
+    タイムゾーン付きの日時をTIMESTAMP（タイムゾーンなし）カラム用に変換する
+    asyncpgはタイムゾーン付きの値を受け付けないため、壁時計の時刻のまま tzinfo を外す
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def utc_now() -> datetime:
+    """現在のUTC日時をTIMESTAMP（タイムゾーンなし）カラム用に返す"""
+    return strip_tz(datetime.now(timezone.utc))
+
+
+def compute_image_etag(image: Optional[bytes]) -> Optional[str]:
+    """画像バイナリのETag (SHA-256の16進文字列) を計算する"""
+    if not image:
+        return None
+    return hashlib.sha256(image).hexdigest()
+
+
+def detect_image_media_type(image: bytes) -> str:
+    """画像バイナリの先頭バイトからContent-Typeを判定する"""
+    if image.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def encode_cursor(sort_value: Optional[datetime], key: uuid.UUID) -> str:
+    """カーソルページング用の不透明なカーソル文字列を作成する (並び順の値, 主キー)"""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, str(key)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], uuid.UUID]:
+    """encode_cursor で作成したカーソル文字列を (並び順の値, 主キー) に戻す"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, key = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(sort_value) if sort_value else None, uuid.UUID(key))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def build_cursor_page(
+    items: List[Any],
+    limit: int,
+    cursor_of: Callable[[Any], str]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    limit+1件取得した結果を1ページ分に切り詰め、続きがある場合は次のカーソルを返す
+    :param cursor_of: 要素からカーソル文字列を作成する関数
+    """
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, cursor_of(items[-1])
+
+
+# 画像レスポンスのキャッシュ有効期間（秒）。画像URLにはETagが含まれるため長めに設定できる
+IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", "86400"))
+
+# 縮小画像（サムネイル等）の保存先
+IMAGE_CACHE_DIR = os.getenv(
+    "IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "images")
+)
+image_store = ImageDerivativeStore(IMAGE_CACHE_DIR)
+
+
+# 読み出しの多いエンドポイント (POST /get-events, GET /event/{event_id}) のレスポンスキャッシュ
+# RESPONSE_CACHE_BACKEND: memory (プロセス内) / redis (ワーカー間で共有) / none (無効)
+# memory は更新したワーカーのキャッシュしか削除できないため、デフォルトは1ワーカーの場合のみ memory、複数ワーカーの場合は none
+RESPONSE_CACHE_BACKEND = (
+    os.getenv("RESPONSE_CACHE_BACKEND") or ("memory" if worker_count() == 1 else "none")
+).lower()
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def create_response_cache() -> ResponseCache:
+    """環境変数の設定に従ってレスポンスキャッシュを作成する"""
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return ResponseCache(RedisCacheBackend(REDIS_URL), ttl=RESPONSE_CACHE_TTL)
+    if RESPONSE_CACHE_BACKEND == "memory":
+        if worker_count() > 1:
+            logger.warning(
+                "複数ワーカーでプロセス内のレスポンスキャッシュを使用しています。"
+                "他のワーカーで更新されたイベントは最大 RESPONSE_CACHE_TTL 秒古いまま返されます"
+                "（RESPONSE_CACHE_BACKEND=redis を推奨）",
+                extra={"workers": worker_count(), "ttl": RESPONSE_CACHE_TTL}
+            )
+        return ResponseCache(InMemoryCacheBackend(RESPONSE_CACHE_MAXSIZE), ttl=RESPONSE_CACHE_TTL)
+    return ResponseCache(None, ttl=RESPONSE_CACHE_TTL)
+
+
+response_cache = create_response_cache()
+
+
+# 経験値のランキング (全体・企業ごと・月ごと)
+# LEADERBOARD_BACKEND: memory (プロセス内, デフォルト) / redis (ワーカー間で共有。複数ワーカーの場合はこちら)
+LEADERBOARD_BACKEND = os.getenv("LEADERBOARD_BACKEND", "memory").lower()
+# スナップショットの保存（複数ワーカーでプロセス内のランキングを使う場合は作り直し）の間隔（秒。0で無効）
+LEADERBOARD_SNAPSHOT_INTERVAL = float(os.getenv("LEADERBOARD_SNAPSHOT_INTERVAL", "300"))
+
+
+def create_leaderboard() -> Leaderboard:
+    """LEADERBOARD_BACKEND の設定からランキングを作成する"""
+    if LEADERBOARD_BACKEND == "redis":
+        return Leaderboard(RedisLeaderboardBackend(REDIS_URL))
+    return Leaderboard(InMemoryLeaderboardBackend())
+
+
+leaderboard = create_leaderboard()
+
+# 複数ワーカーでプロセス内のランキングを使う場合、各ワーカーのランキングには自分の XpAggregator が反映した経験値しか加算されない。
+# 一部の経験値しか含まないスナップショットは保存せず、定期的に player と xp_events から作り直してワーカー間の差をなくす。
+LEADERBOARD_PER_WORKER = not leaderboard.backend.shared and worker_count() > 1
+if LEADERBOARD_PER_WORKER:
+    logger.warning(
+        "複数ワーカーでプロセス内のランキングを使用しています。"
+        "ワーカーごとの順位は LEADERBOARD_SNAPSHOT_INTERVAL 秒ごとの作り直しまで一致しません（LEADERBOARD_BACKEND=redis を推奨）",
+        extra={"workers": worker_count(), "interval": LEADERBOARD_SNAPSHOT_INTERVAL}
+    )
+
+
+async def record_applied_xp(applied: Dict[str, Any]) -> None:
+    """player に反映した経験値をランキングに反映する (XpAggregator の on_applied)"""
+    for event in applied["events"]:
+        player = applied["players"].get(event.user_id)
+        if player is None:
+            continue
+        try:
+            await leaderboard.record(
+                event.user_id, player["experience"], event.amount, event.company_id, event.created_at, event.xp_event_id
+            )
+        except Exception as e:
+            # ランキングは次回起動時に player テーブルから復元できるため、集計は失敗させない
+            logger.warning("ランキングの更新に失敗しました", extra={"user_id": str(event.user_id), "error": str(e)})
+    # レベルが上がった応募者は、フィードの順位付け（イベントの種類の好み）が変わる
+    feed_refresher.mark(user_id for user_id, player in applied["players"].items() if player["leveled_up"])
+
+
+# 経験値の獲得履歴 (xp_events) を player にまとめて反映するバックグラウンドタスク
+xp_aggregator = XpAggregator(lambda: database.AsyncSessionLocal(), on_applied=record_applied_xp)
+
+# 応募者ごとのフィード (applicant_feed) を作り直すバックグラウンドタスク
+feed_refresher = FeedRefresher(lambda: database.AsyncSessionLocal())
+
+
+def event_company_id(event_id: uuid.UUID):
+    """イベントの企業ID (xp_events.company_id に記録する。INSERT と同じ文で取得するためのサブクエリ)"""
+    return select(EventModel.company_id).where(EventModel.event_id == event_id).scalar_subquery()
+
+
+async def snapshot_leaderboard() -> None:
+    """ランキングを leaderboard_snapshot テーブルに保存する"""
+    async with database.AsyncSessionLocal() as db:
+        await leaderboard.snapshot(db)
+
+
+async def reload_leaderboard() -> None:
+    """ランキングを player と xp_events から作り直す（複数ワーカーでプロセス内のランキングを使う場合）"""
+    async with database.AsyncSessionLocal() as db:
+        await leaderboard.reload(db)
+
+
+async def snapshot_leaderboard_periodically(interval: float) -> None:
+    """ランキングのスナップショットを定期的に保存する（ワーカーごとのランキングの場合は作り直す）タスク"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if LEADERBOARD_PER_WORKER:
+                await reload_leaderboard()
+            else:
+                await snapshot_leaderboard()
+        except Exception as e:
+            logger.warning("ランキングの保存・作り直しに失敗しました", extra={"error": str(e)})
+
+
+def event_cache_key(event_id: uuid.UUID) -> str:
+    """GET /event/{event_id} のキャッシュキー"""
+    return f"event:{event_id}"
+
+
+def events_by_date_cache_key(target_date: date) -> str:
+    """POST /get-events のキャッシュキー（日付ごと）"""
+    return f"events:date:{target_date.isoformat()}"
+
+
+async def invalidate_event_cache(event_id: uuid.UUID, *start_dates: Optional[datetime]) -> None:
+    """イベントの作成・更新・削除時に、そのイベントと開始日のキャッシュを削除する"""
+    keys = [event_cache_key(event_id)]
+    keys += [events_by_date_cache_key(d.date()) for d in set(start_dates) if d is not None]
+    await response_cache.invalidate(*keys)
+
+
+async def invalidate_admission_cache(admission: EventAdmission) -> None:
+    """応募の作成・更新・削除で残り枠数が変わったイベントのキャッシュを削除する（コミット後に呼び出す）"""
+    for event_id, start_date in admission.changed_events.items():
+        await invalidate_event_cache(event_id, start_date)
+
+
+async def render_image_derivatives(image: Optional[bytes]) -> Optional[Dict[str, bytes]]:
+    """
+    アップロードされた画像から縮小画像を作成する（画像として読み込めない場合は400）
+    ディスクには書き込まないため、コミット前に呼び出して画像を検証し、コミット後に save_image_derivatives で保存する。
+    """
+    if not image:
+        return None
+    try:
+        # Pillowの処理はCPUを使うため、イベントループを塞がないようスレッドプールで実行
+        return await run_in_threadpool(image_store.render, image)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image format: {e}"
+        ) from e
+
+
+async def save_image_derivatives(image_etag: Optional[str], derivatives: Optional[Dict[str, bytes]]) -> None:
+    """
+    コミット後に縮小画像を保存する
+    保存に失敗した場合も、GET /event/{event_id}/image で元画像から作り直せるため、リクエストは失敗させない。
+    """
+    if not image_etag or not derivatives:
+        return
+    try:
+        await run_in_threadpool(image_store.save, image_etag, derivatives)
+    except OSError as e:
+        logger.warning("縮小画像の保存に失敗しました", extra={"image_etag": image_etag, "error": str(e)})
+
+
 sys.path.append(current_dir)  # 現在のディレクトリをパスに追加
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションのライフサイクル管理 - 共有DB接続の初期化と解放"""
+    try:
+        # スキーマのリフレクションを起動時に一度だけ行う
+        init_db_connector()
+    except Exception as e:
+        # DBが未起動でもアプリは起動させ、最初のリクエスト時に再試行する
+        logger.warning("DBConnectorの初期化に失敗しました（リクエスト時に再試行します）", extra={"error": str(e)})
+
+    # ランキングを player テーブルと xp_events から復元する
+    snapshot_task = None
+    if database.AsyncSessionLocal is not None:
+        try:
+            async with database.AsyncSessionLocal() as db:
+                await leaderboard.load(db)
+        except Exception as e:
+            logger.warning("ランキングの復元に失敗しました", extra={"error": str(e)})
+        xp_aggregator.start()
+        feed_refresher.start()
+        if LEADERBOARD_SNAPSHOT_INTERVAL > 0:
+            snapshot_task = asyncio.create_task(snapshot_leaderboard_periodically(LEADERBOARD_SNAPSHOT_INTERVAL))
+    yield
+    await feed_refresher.stop()
+    if database.AsyncSessionLocal is not None:
+        try:
+            # 未集計の経験値を反映してから終了する
+            await xp_aggregator.stop()
+        except Exception as e:
+            logger.warning("経験値の集計に失敗しました", extra={"error": str(e)})
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        # 終了時に最新のランキングを保存する（ワーカーごとのランキングは一部の経験値しか含まないため保存しない）
+        if not LEADERBOARD_PER_WORKER:
+            try:
+                await snapshot_leaderboard()
+            except Exception as e:
+                logger.warning("ランキングのスナップショットの保存に失敗しました", extra={"error": str(e)})
+    # コネクションプールを解放
+    await dispose_engine()
+
+
 app = FastAPI(
     title="Gamification API",
     description="Gamification for factory API server",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # カスタム例外ハンドラーを追加
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    import traceback
-    print(f"Unhandled exception: {exc}")
-    print(f"Traceback: {traceback.format_exc()}")
+    logger.error(
+        "Unhandled exception",
+        exc_info=(type(exc), exc, exc.__traceback__),
+        extra={"route": request.url.path, "method": request.method}
+    )
     return JSONResponse(
         status_code=500,
         content={"detail": f"Internal server error: {str(exc)}"}
@@ -94,13 +457,14 @@ async def general_exception_handler(request, exc):
 # Pydanticバリデーションエラーハンドラーを追加
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print("Validation error for request:", request.url)
-    try:
-        body = await request.body()
-        print("Request body:", body.decode('utf-8') if body else "Empty body")
-    except Exception as e:
-        print("Could not read request body:", str(e))
-    print("Validation errors:", exc.errors())
+    extra = {"route": request.url.path, "method": request.method, "errors": exc.errors()}
+    if LOG_DEBUG_PAYLOADS:
+        # リクエストボディには画像などが含まれるため、デバッグ時のみ（切り詰めて）出力する
+        try:
+            extra["body"] = (await request.body()).decode("utf-8", errors="replace")
+        except Exception as e:
+            extra["body_error"] = str(e)
+    logger.info("Validation error", extra=extra)
     return JSONResponse(
         status_code=422,
         content={
@@ -110,6 +474,26 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+# アクセスログ (LOG_SAMPLE_RATES で route ごとに間引ける)
+@app.middleware("http")
+async def access_log_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    logger.info("request", extra={
+        "route": getattr(route, "path", request.url.path),
+        "method": request.method,
+        "path": request.url.path,
+        "status": response.status_code,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
+    return response
+
+
+# リクエスト数・レイテンシ・処理中の件数・レスポンスサイズを route ごとに記録する (/metrics で出力)
+app.add_middleware(MetricsMiddleware)
+
+
 # API Router with prefix
 api_router = APIRouter(prefix="/api")
 
@@ -135,31 +519,206 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get("/livez")
+async def liveness_check() -> Dict[str, str]:
+    """
+    プロセスが応答できるかを返すエンドポイント（DBには接続しない）
+    コンテナの再起動の判定 (Dockerfile の HEALTHCHECK など) に使う。
+    """
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readiness_check() -> JSONResponse:
+    """
+    リクエストを受け付けられるかを返すエンドポイント（ロードバランサーの振り分け判定用）
+    コネクションプールが枯渇している場合、または SELECT 1 が失敗・タイムアウトした場合は503を返す。
+    プールが枯渇している場合は、さらに接続待ちを増やさないよう SELECT 1 を実行しない。
+    """
+    pool = get_pool_status()
+    checks: Dict[str, Any] = {"pool": pool}
+    if is_pool_saturated(pool):
+        checks["database"] = "skipped: connection pool is saturated"
+    else:
+        try:
+            await check_database()
+            checks["database"] = "ok"
+        except asyncio.TimeoutError:
+            checks["database"] = "timeout"
+        except Exception as e:
+            checks["database"] = f"error: {type(e).__name__}"
+
+    ready = checks["database"] == "ok"
+    if not ready:
+        logger.warning("Not ready", extra={"route": "/readyz", "checks": checks})
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks}
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus形式のメトリクス (HTTPリクエスト・DB接続・SQL文の実行時間など) を返すエンドポイント"""
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    """レスポンスキャッシュの統計情報 (ヒット数・ミス数など) を返すエンドポイント"""
+    return await response_cache.stats()
+
+
 # --- CRUD関数 (リポジトリ層として分離も検討) --- #
-def get_event_by_id(db: Session, event_id: uuid.UUID) -> Optional[EventModel]:
+async def get_event_by_id(
+    db: AsyncSession,
+    event_id: uuid.UUID,
+    include_image: bool = False
+) -> Optional[EventModel]:
     """Get a single event by ID."""
-    return db.query(EventModel).filter(EventModel.event_id == event_id).first()
+    options = [undefer(EventModel.image)] if include_image else []
+    return await db.get(EventModel, event_id, options=options)
 
 
-def get_events(
-    db: Session,
+def select_event_columns(include_image: bool = False):
+    """イベントを列のタプルとして取得するSELECT文（ORMインスタンスを作らないため一覧取得が軽い）"""
+    columns = EVENT_COLUMNS + (EventModel.image,) if include_image else EVENT_COLUMNS
+    return select(*columns)
+
+
+async def get_event_row(
+    db: AsyncSession,
+    event_id: uuid.UUID,
+    include_image: bool = False
+) -> Optional[sqlalchemy.Row]:
+    """Get a single event by ID as a column row (for serialize_event)."""
+    stmt = select_event_columns(include_image).where(EventModel.event_id == event_id)
+    result = await db.execute(stmt)
+    return result.first()
+
+
+async def get_events(
+    db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
-) -> List[EventModel]:
-    """Get a list of events."""
-    return db.query(EventModel).offset(skip).limit(limit).all()
+    limit: int = 100,
+    include_image: bool = False,
+    after: Optional[Tuple[Optional[datetime], uuid.UUID]] = None
+) -> List[sqlalchemy.Row]:
+    """
+    Get a list of events as column rows (for serialize_events).
+    (created_at, event_id) 順に並べ、after を指定した場合はその位置より後ろから取得する (カーソルページング)
+    """
+    stmt = select_event_columns(include_image).order_by(EventModel.created_at, EventModel.event_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(EventModel.created_at, EventModel.event_id) > after)
+    else:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
+    return list(result.all())
+
+
+async def search_events(db: AsyncSession, q: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """
+    タイトル・説明・開催場所・タグからイベントを検索する（一致度の高い順）
+    ページングできるのは一致度の高い上位 SEARCH_MAX_CANDIDATES 件まで
+    :return: EventSearchResult の形式のdict
+    """
+    terms = parse_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="検索語を指定してください")
+    result = await db.execute(build_search_query(terms, EVENT_COLUMNS, limit, offset))
+    return {
+        "query": q,
+        "terms": terms,
+        "items": [
+            {"event": serialize_event(row), "score": float(row.score), "highlights": highlight_event(row, terms)}
+            for row in result.all()
+        ],
+    }
+
+
+async def filter_events(
+    db: AsyncSession,
+    conditions: Dict[str, Any],
+    limit: int = 50,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """
+    条件に一致するイベント（開始日時順）と、ファセットごとの値の件数を返す
+    :param conditions: build_filter_conditions で作成した絞り込み条件
+    :return: EventFilterResult の形式のdict
+    """
+    where = list(conditions.values())
+    total = await db.scalar(select(sqlalchemy.func.count()).select_from(EventModel).where(*where))
+    rows = (await db.execute(
+        select_event_columns()
+        .where(*where)
+        .order_by(EventModel.start_date, EventModel.event_id)
+        .offset(offset)
+        .limit(limit)
+    )).all()
+
+    facets = {}
+    for name, query in build_facet_queries(conditions).items():
+        facets[name] = [
+            {"value": value.value if isinstance(value, EventTypeEnum) else value, "count": count}
+            for value, count in (await db.execute(query)).all()
+        ]
+    return {"total": total, "items": serialize_events(rows), "facets": facets}
 
 
-def create_event(db: Session, event_data: EventCreate) -> EventModel:
+def build_event_values(event_data: EventCreate) -> Dict[str, Any]:
+    """
+    EventCreate から events テーブルに保存する列の値を作成する（create_event と一括登録で共通）
+    :raises ValueError: 画像やevent_typeが不正な場合
+    """
+    image_binary = None
+    if event_data.image:
+        try:
+            # "data:image/png;base64," のようなプレフィックスを除去
+            _, encoded = event_data.image.split(",", 1)
+            image_binary = base64.b64decode(encoded)
+        except Exception as e:
+            raise ValueError(f"Invalid image format: {e}") from e
+
+    # event_type の処理を修正
+    event_type_enum = None
+    if event_data.event_type:
+        event_type_enum = get_event_type_enum(event_data.event_type)
+
+    return {
+        "company_id": event_data.company_id,  # UUIDオブジェクトをそのまま使用
+        "event_type": event_type_enum,  # 修正されたevent_type処理
+        "title": event_data.title,
+        "description": event_data.description,
+        "start_date": strip_tz(event_data.start_date),
+        "end_date": strip_tz(event_data.end_date),
+        "location": event_data.location,
+        "reward": event_data.reward,
+        # 読み出し側はカンマ区切りとして解析するため、リストはカンマ区切り文字列にして保存
+        "required_qualifications": ", ".join(event_data.required_qualifications)
+            if event_data.required_qualifications else None,
+        "available_spots": event_data.available_spots,
+        # 応募がまだないため、残り枠数は募集人数と同じ
+        "remaining_spots": event_data.available_spots,
+        "image": image_binary,
+        "image_etag": compute_image_etag(image_binary),
+        # タグは読み出し時に変換しなくて済むよう、正規形 [{label, color}] にして保存
+        "tags": normalize_tags(event_data.tags),
+        # 絞り込み用の列 (reward_amount, prefecture, qualifications)
+        **derive_facet_values(event_data.reward, event_data.location, event_data.required_qualifications),
+    }
+
+
+async def create_event(db: AsyncSession, event_data: EventCreate) -> EventModel:
     """Create a new event."""
     # 最初にcompany_idが有効かどうかチェック
-    from sqlalchemy import text
     try:
         # companyテーブルにcompany_idが存在するか確認
-        company_exists = db.execute(
+        company_exists = (await db.execute(
             text("SELECT 1 FROM company WHERE user_id = :company_id"),
             {"company_id": event_data.company_id}
-        ).fetchone()
+        )).fetchone()
         if not company_exists:
             raise HTTPException(
                 status_code=400,
@@ -171,83 +730,186 @@ def create_event(db: Session, event_data: EventCreate) -> EventModel:
             detail=f"Error validating company_id: {e}"
         ) from e
             
-    image_binary = None
-    if event_data.image:
-        try:
-            # "data:image/png;base64," のようなプレフィックスを除去
-            _, encoded = event_data.image.split(",", 1)
-            image_binary = base64.b64decode(encoded)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid image format: {e}"
-            ) from e
-
-    tags_json = None
-    if event_data.tags:
-        try:
-            # フロントエンドから来るのは既にJSON文字列のはずだが、
-            # 念のためオブジェクトなら文字列化
-            if isinstance(event_data.tags, str):
-                tags_json = json.loads(event_data.tags)
-            else:
-                tags_json = [tag.model_dump() for tag in event_data.tags]
-        except json.JSONDecodeError as e:
-            raise HTTPException(
-                status_code=400,
-                detail="Tags must be a valid JSON string"
-            ) from e
-
-    # event_type の処理を修正
-    event_type_enum = None
-    if event_data.event_type:
-        try:
-            event_type_enum = get_event_type_enum(event_data.event_type)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e)) from e
+    try:
+        values = build_event_values(event_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    derivatives = await render_image_derivatives(values["image"])
+    db_event = EventModel(**values)
 
-    db_event = EventModel(
-        company_id=event_data.company_id,  # UUIDオブジェクトをそのまま使用
-        event_type=event_type_enum,  # 修正されたevent_type処理
-        title=event_data.title,
-        description=event_data.description,
-        start_date=event_data.start_date,
-        end_date=event_data.end_date,
-        location=event_data.location,
-        reward=event_data.reward,
-        required_qualifications=event_data.required_qualifications,
-        available_spots=event_data.available_spots,
-        image=image_binary,
-        tags=tags_json
-    )
-    
     try:
         db.add(db_event)
-        db.commit()
-        db.refresh(db_event)
+        await db.flush()
+        await sync_event_qualifications(db, [db_event], replace=False)
+        await record_event_feed_changes(db, [], qualification_tokens(db_event.required_qualifications))
+        await apply_calendar_changes(db, calendar_changes(added=[(db_event.start_date, db_event.event_type)]))
+        await db.commit()
+        await save_image_derivatives(values["image_etag"], derivatives)
+        feed_refresher.notify()
+        await db.refresh(db_event)
+        await invalidate_event_cache(db_event.event_id, db_event.start_date)
         return db_event
     except sqlalchemy.exc.IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         # 外部キー制約違反など、整合性エラーの場合
         raise HTTPException(
             status_code=400,
             detail=f"Database integrity error: {e}. Make sure company_id is valid."
         ) from e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to create event: {e}"
         ) from e
 
 
-def update_event(
-    db: Session,
+# 一括登録で1回に受け付ける最大行数
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "5000"))
+
+
+def parse_bulk_events(body: bytes, data_format: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[BulkImportError]]:
+    """
+    一括登録の入力 (JSON Lines または CSV) を行ごとのdictに変換する
+    CSVの required_qualifications はカンマ区切りで指定する。
+    :param body: リクエストボディ
+    :param data_format: "jsonl" または "csv"
+    :return: ((行番号, 行データ) のリスト, 解析できなかった行のエラーのリスト)
+    """
+    try:
+        content = body.decode("utf-8-sig")  # Excelで保存したCSVのBOMを除去
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Request body must be UTF-8: {e}") from e
+
+    rows: List[Tuple[int, Dict[str, Any]]] = []
+    errors: List[BulkImportError] = []
+    if data_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        for record in reader:
+            # 空のセルは未指定として扱う
+            row: Dict[str, Any] = {k: v for k, v in record.items() if k and v not in (None, "")}
+            if "required_qualifications" in row:
+                row["required_qualifications"] = [
+                    q.strip() for q in row["required_qualifications"].split(",") if q.strip()
+                ]
+            rows.append((reader.line_num, row))
+    else:
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append(BulkImportError(line=line_number, errors=[f"Invalid JSON: {e}"]))
+                continue
+            if not isinstance(row, dict):
+                errors.append(BulkImportError(line=line_number, errors=["Each line must be a JSON object"]))
+                continue
+            rows.append((line_number, row))
+    return rows, errors
+
+
+async def bulk_create_events(db: AsyncSession, body: bytes, data_format: str) -> BulkImportResult:
+    """
+    イベントを一括登録する
+    すべての行を先に検証し、company_id はまとめて1回のクエリで確認してから、
+    有効な行だけを1つのトランザクションでまとめてINSERTする (executemany)。
+    """
+    rows, errors = parse_bulk_events(body, data_format)
+    received = len(rows) + len(errors)
+    if received > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {received} (max {BULK_IMPORT_MAX_ROWS})"
+        )
+
+    # 1. 行ごとの検証と列の値の作成
+    candidates: List[Tuple[int, Dict[str, Any]]] = []
+    for line_number, row in rows:
+        try:
+            # tags は文字列のリストやカンマ区切りの文字列も受け付ける
+            if row.get("tags") is not None:
+                row["tags"] = normalize_tags(row["tags"])
+            values = build_event_values(EventCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append(BulkImportError(line=line_number, errors=[
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            ]))
+            continue
+        except ValueError as e:
+            errors.append(BulkImportError(line=line_number, errors=[str(e)]))
+            continue
+        candidates.append((line_number, values))
+
+    # 2. company_id の存在確認 (まとめて1回のクエリ)
+    company_ids = {values["company_id"] for _, values in candidates}
+    existing_company_ids = set()
+    if company_ids:
+        stmt = text("SELECT user_id FROM company WHERE user_id IN :company_ids").bindparams(
+            bindparam("company_ids", expanding=True)
+        )
+        result = await db.execute(stmt, {"company_ids": list(company_ids)})
+        existing_company_ids = {uuid.UUID(str(user_id)) for (user_id,) in result}
+
+    valid_rows: List[Dict[str, Any]] = []
+    # コミット後に保存する縮小画像 (ETag → サイズ名ごとのバイナリ)
+    derivatives: Dict[str, Dict[str, bytes]] = {}
+    for line_number, values in candidates:
+        if values["company_id"] not in existing_company_ids:
+            errors.append(BulkImportError(
+                line=line_number, errors=[f"Company ID {values['company_id']} does not exist"]
+            ))
+            continue
+        if values["image"] and values["image_etag"] not in derivatives:
+            try:
+                derivatives[values["image_etag"]] = await render_image_derivatives(values["image"])
+            except HTTPException as e:
+                errors.append(BulkImportError(line=line_number, errors=[str(e.detail)]))
+                continue
+        values["event_id"] = uuid.uuid4()
+        valid_rows.append(values)
+
+    # 3. 有効な行をまとめて登録
+    if valid_rows:
+        try:
+            await db.execute(insert(EventModel), valid_rows)
+            await sync_event_qualifications(db, valid_rows, replace=False)
+            await record_event_feed_changes(db, [], {
+                token for values in valid_rows for token in qualification_tokens(values["required_qualifications"])
+            })
+            await apply_calendar_changes(db, calendar_changes(
+                added=[(values["start_date"], values["event_type"]) for values in valid_rows]
+            ))
+            await db.commit()
+        except sqlalchemy.exc.IntegrityError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Database integrity error: {e}"
+            ) from e
+        for image_etag, images in derivatives.items():
+            await save_image_derivatives(image_etag, images)
+        await response_cache.invalidate(*{
+            events_by_date_cache_key(values["start_date"].date()) for values in valid_rows
+        })
+        feed_refresher.notify()
+
+    errors.sort(key=lambda error: error.line)
+    return BulkImportResult(
+        received=received,
+        inserted=len(valid_rows),
+        event_ids=[values["event_id"] for values in valid_rows],
+        errors=errors
+    )
+
+
+async def update_event(
+    db: AsyncSession,
     event_id: uuid.UUID,
     event_data: EventUpdate
 ) -> Optional[EventModel]:
     """Update an existing event."""
-    db_event = get_event_by_id(db, event_id)
+    db_event = await get_event_by_id(db, event_id)
     if not db_event:
         return None
 
@@ -265,18 +927,15 @@ def update_event(
     elif 'image' in update_data and update_data['image'] is None:
         # 明示的に画像を削除する場合
         update_data['image'] = None
+    if 'image' in update_data:
+        update_data['image_etag'] = compute_image_etag(update_data['image'])
+    derivatives = await render_image_derivatives(update_data.get('image'))
 
-    if 'tags' in update_data and update_data['tags']:
-        try:
-            if isinstance(update_data['tags'], str):
-                update_data['tags'] = json.loads(update_data['tags'])
-            else:
-                update_data['tags'] = update_data['tags']
-        except json.JSONDecodeError as e:
-            raise HTTPException(
-                status_code=400,
-                detail="Tags for update must be a valid JSON string"
-            ) from e
+    if 'tags' in update_data:
+        update_data['tags'] = normalize_tags(update_data['tags'])
+
+    if 'required_qualifications' in update_data and isinstance(update_data['required_qualifications'], list):
+        update_data['required_qualifications'] = ", ".join(update_data['required_qualifications']) or None
 
     # event_type の処理を修正
     if 'event_type' in update_data and update_data['event_type']:
@@ -287,37 +946,71 @@ def update_event(
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e)) from e
 
+    # 開始日が変わる場合は変更前の日付のキャッシュも削除する
+    previous_start_date = db_event.start_date
+    previous_event_type = db_event.event_type
     for key, value in update_data.items():
-        setattr(db_event, key, value)
+        setattr(db_event, key, strip_tz(value))
+    if update_data.keys() & {"reward", "location", "required_qualifications"}:
+        # 絞り込み用の列を作り直す
+        facet_values = derive_facet_values(db_event.reward, db_event.location, db_event.required_qualifications)
+        for key, value in facet_values.items():
+            setattr(db_event, key, value)
+    if update_data.keys() & {"reward", "required_qualifications", "start_date"}:
+        # おすすめイベント用の資格の転置インデックスと、順位が変わりうる応募者のフィードを作り直す
+        await sync_event_qualifications(db, [db_event])
+        await record_event_feed_changes(db, [event_id], qualification_tokens(db_event.required_qualifications))
+    if update_data.keys() & {"start_date", "event_type"}:
+        # カレンダーの集計を、変更前の日付・種類から変更後に移す
+        await apply_calendar_changes(db, calendar_changes(
+            added=[(db_event.start_date, db_event.event_type)],
+            removed=[(previous_start_date, previous_event_type)]
+        ))
 
     # updated_at は手動で更新 (onupdateが効かない場合があるため)
-    db_event.updated_at = datetime.now(timezone.utc)
+    db_event.updated_at = utc_now()
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    if 'available_spots' in update_data:
+        # 募集人数が変わった場合は残り枠数を再計算し、増えた分だけキャンセル待ちを繰り上げる
+        await db.flush()
+        await EventAdmission(db).recalculate(event_id)
+    await db.commit()
+    await save_image_derivatives(update_data.get('image_etag'), derivatives)
+    feed_refresher.notify()
+    await db.refresh(db_event)
+    await invalidate_event_cache(event_id, previous_start_date, db_event.start_date)
     return db_event
 
 
-def delete_event(db: Session, event_id: uuid.UUID) -> Optional[EventModel]:
+async def delete_event(db: AsyncSession, event_id: uuid.UUID) -> Optional[EventModel]:
     """Delete an event."""
-    db_event = get_event_by_id(db, event_id)
+    db_event = await get_event_by_id(db, event_id)
     if not db_event:
         return None
-    db.delete(db_event)
-    db.commit()
+    # フィードに残ったイベントは、作り直しで取り除く（取得時は events と結合するため表示されない）
+    await record_event_feed_changes(db, [event_id], [])
+    await apply_calendar_changes(db, calendar_changes(removed=[(db_event.start_date, db_event.event_type)]))
+    await db.delete(db_event)
+    await db.commit()
+    feed_refresher.notify()
+    await invalidate_event_cache(event_id, db_event.start_date)
     return db_event
 
 
 # 応募一覧を取得する関数
-def get_applications(
-    db: Session,
+async def get_applications(
+    db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple[Optional[datetime], uuid.UUID]] = None
 ) -> List[Dict]:
-    """Get a list of applications with event and applicant details."""
+    """
+    Get a list of applications with event and applicant details.
+    (applied_at, application_id) 順に並べ、after を指定した場合はその位置より後ろから取得する
+    """
     # イベント情報と応募者情報を含む応募一覧を取得
-    query = (
-        db.query(
+    stmt = (
+        select(
             ApplicationModel,
             EventModel.title.label("event_title"),
             EventModel.event_type.label("event_type"),
@@ -331,10 +1024,16 @@ def get_applications(
         .join(EventModel, ApplicationModel.event_id == EventModel.event_id)
         .join(ApplicantModel,
               ApplicationModel.user_id == ApplicantModel.user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .order_by(ApplicationModel.applied_at, ApplicationModel.application_id)
     )
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(ApplicationModel.applied_at, ApplicationModel.application_id) > after
+        )
+    else:
+        stmt = stmt.offset(skip)
+    stmt = stmt.limit(limit)
+    query = (await db.execute(stmt)).all()
 
     # 結果をディクショナリのリストに変換
     results = []
@@ -374,17 +1073,13 @@ def get_applications(
 
 
 # 応募ステータスを更新する関数
-def update_application_status(
-    db: Session,
+async def update_application_status(
+    db: AsyncSession,
     application_id: uuid.UUID,
     data: ApplicationUpdate
 ) -> Optional[ApplicationModel]:
     """Update the status of an application."""
-    application = (
-        db.query(ApplicationModel)
-        .filter(ApplicationModel.application_id == application_id)
-        .first()
-    )
+    application = await db.get(ApplicationModel, application_id)
     if not application:
         return None
 
@@ -394,23 +1089,104 @@ def update_application_status(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
+    # 募集枠の確保・返却 (キャンセル待ちや否認からの承認は、枠が空いている場合のみ可能)
+    admission = EventAdmission(db)
+    was_holding = application.status in SPOT_HOLDING_STATUSES
+    will_hold = status_enum in SPOT_HOLDING_STATUSES
+    if will_hold and not was_holding and not await admission.reserve(application.event_id):
+        raise HTTPException(status_code=409, detail="募集枠に空きがありません")
+
+    newly_approved = (
+        status_enum == ApplicationStatusEnum.APPROVED and application.status != ApplicationStatusEnum.APPROVED
+    )
     application.status = status_enum
-    application.processed_at = datetime.now(timezone.utc)
+    application.processed_at = utc_now()
     application.processed_by = data.processed_by
 
     db.add(application)
-    db.commit()
-    db.refresh(application)
+    if was_holding and not will_hold:
+        await db.flush()
+        # キャンセル待ちに変更した場合に、自身が繰り上げられないよう除外する
+        await admission.release(application.event_id, application.application_id)
+    ledger = XpLedger(db)
+    if newly_approved:
+        # 承認された応募者に経験値を付与する（応募の更新と同じトランザクションで履歴に記録する）
+        await ledger.record(
+            application.user_id, XpSourceEnum.APPLICATION_APPROVED, XP_APPLICATION_APPROVED,
+            source_id=application.application_id, company_id=event_company_id(application.event_id)
+        )
+    await db.commit()
+    await invalidate_admission_cache(admission)
+    xp_aggregator.notify(ledger.recorded)
+    await db.refresh(application)
     return application
 
 
+# 参加者のステータスを更新する関数
+async def update_participant_status(
+    db: AsyncSession,
+    participant_id: uuid.UUID,
+    data: ParticipantUpdate
+) -> Optional[ParticipantModel]:
+    """Update the status of a participant (終了にした場合は経験値を付与する)."""
+    participant = await db.get(ParticipantModel, participant_id)
+    if not participant:
+        return None
+
+    try:
+        status_enum = get_participant_status_enum(data.status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    completed = (
+        status_enum == ParticipantStatusEnum.COMPLETED and participant.status != ParticipantStatusEnum.COMPLETED
+    )
+    participant.status = status_enum
+    db.add(participant)
+    ledger = XpLedger(db)
+    if completed:
+        await ledger.record(
+            participant.user_id, XpSourceEnum.EVENT_COMPLETED, XP_PARTICIPATION_COMPLETED,
+            source_id=participant.participant_id, company_id=event_company_id(participant.event_id)
+        )
+    await db.commit()
+    xp_aggregator.notify(ledger.recorded)
+    await db.refresh(participant)
+    return participant
+
+
+# プレイヤーの状態を取得する関数
+async def get_player(db: AsyncSession, user_id: uuid.UUID) -> Optional[PlayerSchema]:
+    """
+    プレイヤーの経験値・レベルを取得する
+    まだ経験値を獲得していない応募者は、レベル1・経験値0の状態を返す（応募者が存在しない場合はNone）
+    経験値は XpAggregator がまとめて反映するため、付与から最大 XP_AGGREGATE_INTERVAL_MS 程度遅れて反映される
+    """
+    player = await db.get(PlayerModel, user_id)
+    if player is None:
+        if await db.get(ApplicantModel, user_id) is None:
+            return None
+        experience, skill_data, item_data, updated_at = 0, {}, [], None
+    else:
+        experience, skill_data, item_data, updated_at = (
+            player.experience, player.skill_data, player.item_data, player.updated_at
+        )
+    level, level_experience, next_level_experience = level_progress(experience)
+    return PlayerSchema(
+        user_id=user_id,
+        level=max(level, player.level) if player is not None else level,
+        experience=experience,
+        level_experience=level_experience,
+        next_level_experience=next_level_experience,
+        skill_data=skill_data or {},
+        item_data=item_data if item_data is not None else [],
+        updated_at=updated_at,
+    )
+
+
 # 応募者を作成する関数
-def create_applicant(
-    db: Session,
-    applicant_data: ApplicantCreate
-) -> ApplicantModel:
-    """Create a new applicant."""
-    # 生年月日の処理
+def parse_birth_date(applicant_data: ApplicantCreate) -> Optional[datetime]:
+    """生年月日の処理 (文字列の場合はISO形式として解析し、タイムゾーンを除去する)"""
     birth_date = None
     if isinstance(applicant_data.birth_date, str):
         try:
@@ -424,6 +1200,15 @@ def create_applicant(
             ) from e
     else:
         birth_date = applicant_data.birth_date
+    return strip_tz(birth_date)
+
+
+async def create_applicant(
+    db: AsyncSession,
+    applicant_data: ApplicantCreate
+) -> ApplicantModel:
+    """Create a new applicant."""
+    birth_date = parse_birth_date(applicant_data)
 
     # 新しいユーザーIDを生成
     new_user_id = uuid.uuid4()
@@ -439,7 +1224,7 @@ def create_applicant(
     )
     
     db.add(db_user)
-    db.flush()  # ユーザーを先にフラッシュしてIDを確定
+    await db.flush()  # ユーザーを先にフラッシュしてIDを確定
 
     # 応募者データを作成
     db_applicant = ApplicantModel(
@@ -454,51 +1239,330 @@ def create_applicant(
     )
 
     db.add(db_applicant)
-    db.commit()
-    db.refresh(db_applicant)
+    # フィードを作成する対象に加える
+    db.add(ApplicantFeedStateModel(user_id=new_user_id, dirty=True))
+    await db.commit()
+    feed_refresher.notify()
+    await db.refresh(db_applicant)
     return db_applicant
 
 
 # 応募者一覧を取得する関数
-def get_applicants(
-    db: Session,
+async def get_applicants(
+    db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[uuid.UUID] = None
 ) -> List[ApplicantModel]:
-    """Get a list of applicants."""
-    return db.query(ApplicantModel).offset(skip).limit(limit).all()
+    """
+    Get a list of applicants.
+    applicantには作成日時がないため主キー (user_id) 順に並べ、after を指定した場合はそれより後ろから取得する
+    """
+    stmt = select(ApplicantModel).order_by(ApplicantModel.user_id)
+    if after is not None:
+        stmt = stmt.where(ApplicantModel.user_id > after)
+    else:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
+    return list(result.scalars().all())
+
+
+async def get_recommended_events(db: AsyncSession, user_id: uuid.UUID, limit: int = 20) -> Optional[Dict[str, Any]]:
+    """
+    応募者の資格 (license) に一致する開催前のイベントを、スコアの高い順に返す（応募者が存在しない場合はNone）
+    :return: RecommendedEvents の形式のdict
+    """
+    applicant = await db.get(ApplicantModel, user_id)
+    if applicant is None:
+        return None
+    tokens = qualification_tokens(applicant.license)[:RECOMMEND_MAX_QUALIFICATIONS]
+    items = []
+    if tokens:
+        result = await db.execute(build_recommendation_query(tokens, user_id, EVENT_COLUMNS, utc_now(), limit))
+        items = [
+            {
+                "event": serialize_event(row),
+                "score": float(row.score),
+                "matched_qualifications": sorted(row.matched_qualifications),
+            }
+            for row in result.all()
+        ]
+    return {"user_id": str(user_id), "qualifications": tokens, "items": items}
+
+
+async def get_applicant_feed(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int = 20,
+    after: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    応募者のフィード (applicant_feed) を順位順に取得する（応募者が存在しない場合はNone）
+    フィードは FeedRefresher がバックグラウンドで作成する。まだ作成されていない場合のみ、その場で作成する。
+    :param after: この順位より後ろから取得する (キーセットページング)
+    :return: ApplicantFeedPage の形式のdict
+    """
+    refreshed_at = await db.scalar(
+        select(ApplicantFeedStateModel.refreshed_at).where(ApplicantFeedStateModel.user_id == user_id)
+    )
+    if refreshed_at is None:
+        if await refresh_feed(db, user_id) is None:
+            return None
+        refreshed_at = await db.scalar(
+            select(ApplicantFeedStateModel.refreshed_at).where(ApplicantFeedStateModel.user_id == user_id)
+        )
+
+    rows = (await db.execute(
+        select(*EVENT_COLUMNS, ApplicantFeedModel.position, ApplicantFeedModel.score)
+        .join(ApplicantFeedModel, ApplicantFeedModel.event_id == EventModel.event_id)
+        .where(ApplicantFeedModel.user_id == user_id, ApplicantFeedModel.position > after)
+        .order_by(ApplicantFeedModel.position)
+        .limit(limit + 1)
+    )).all()
+    rows, next_cursor = build_cursor_page(rows, limit, lambda row: str(row.position))
+    return {
+        "user_id": str(user_id),
+        "refreshed_at": refreshed_at.isoformat(),
+        "items": [
+            {"position": row.position, "score": row.score, "event": serialize_event(row)}
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    }
 
 
 # 応募を作成する関数
-def create_application(
-    db: Session,
+async def create_application(
+    db: AsyncSession,
     application_data: ApplicationCreate
 ) -> ApplicationModel:
     """Create a new application."""
-    # ステータスは未対応（PENDING）に設定
+    # 募集枠を確保できればPENDING、満員の場合はキャンセル待ち（WAITLISTED）
+    admission = EventAdmission(db)
     db_application = ApplicationModel(
         event_id=application_data.event_id,
         user_id=application_data.user_id,
-        status=ApplicationStatusEnum.PENDING,
+        status=await admission.admit(application_data.event_id),
         message=application_data.message,
-        applied_at=datetime.now(timezone.utc)
+        applied_at=utc_now()
     )
 
     db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    # 応募したイベントをフィードから除き、企業・種類の好みを反映する
+    await mark_applicants_dirty(db, [application_data.user_id])
+    try:
+        await db.commit()
+    except sqlalchemy.exc.IntegrityError as e:
+        await db.rollback()
+        if "uq_applications_event_id_user_id" in str(e.orig):
+            raise HTTPException(status_code=409, detail="既にこのイベントに応募しています") from e
+        raise HTTPException(status_code=400, detail=f"Database integrity error: {e}") from e
+    await invalidate_admission_cache(admission)
+    feed_refresher.notify()
+    await db.refresh(db_application)
     return db_application
 
 
+def join_event_request_hash(request: JoinEventRequest) -> str:
+    """冪等キーの再利用チェック用に、リクエスト内容のハッシュを計算する"""
+    return hashlib.sha256(request.model_dump_json().encode("utf-8")).hexdigest()
+
+
+async def get_idempotent_response(
+    db: AsyncSession,
+    idempotency_key: str,
+    request_hash: str
+) -> Optional[Dict[str, Any]]:
+    """
+    冪等キーで保存済みのレスポンスを取得する（未使用のキーの場合はNone）
+    同じキーで異なる内容のリクエストが送られた場合は422
+    """
+    stored = await db.get(IdempotencyKeyModel, idempotency_key)
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key is already used for a different request"
+        )
+    return stored.response
+
+
+# POST /join-event で作成する応募者の user_id の名前空間 (メールアドレスから uuid5 で決める)
+JOIN_EVENT_USER_NAMESPACE = uuid.UUID("6f1d3c52-8a4e-4b7e-9f1a-2c5d7e9b0a13")
+
+
+def normalize_mail_address(mail_address: Optional[str]) -> str:
+    """応募者を同一人物と判定するためのメールアドレス（前後の空白を除いて小文字にする）"""
+    return (mail_address or "").strip().lower()
+
+
+async def find_applicant_by_mail_address(db: AsyncSession, mail_key: str) -> Optional[uuid.UUID]:
+    """normalize_mail_address したメールアドレスの応募者の user_id を返す（いない場合はNone）"""
+    return (await db.execute(
+        select(ApplicantModel.user_id)
+        .where(func.lower(func.trim(ApplicantModel.mail_address)) == mail_key)
+        .order_by(ApplicantModel.user_id)
+        .limit(1)
+    )).scalar()
+
+
+async def create_event_participation(
+    db: AsyncSession,
+    request: JoinEventRequest,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    イベント参加処理 - users・applicant・applications を1つのトランザクションで作成する
+    idempotency_key を指定した場合は最初のレスポンスを保存し、同じキーでの再送にはそれを返す
+    （通信が不安定な端末からの再送で重複登録されないようにするため）。
+    応募者はメールアドレスで特定し、登録済みの場合はその応募者で応募する。未登録の場合の user_id も
+    メールアドレスから決めるため、idempotency_key なしで再送された場合も同じ応募者になり、
+    同じイベントへの2回目の応募は一意制約 (uq_applications_event_id_user_id) により409になる。
+    """
+    request_hash = join_event_request_hash(request)
+    if idempotency_key:
+        stored = await get_idempotent_response(db, idempotency_key, request_hash)
+        if stored is not None:
+            return stored
+
+    frontend_applicant = request.applicant
+    try:
+        event_id = uuid.UUID(request.event_id_model.event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid event_id") from e
+
+    # 名前を姓名に分割（簡単な実装）
+    name_parts = frontend_applicant.name.split(" ", 1)
+    last_name = name_parts[0] if len(name_parts) > 0 else ""
+    first_name = name_parts[1] if len(name_parts) > 1 else ""
+
+    applicant_data = ApplicantCreate(
+        last_name=last_name,
+        first_name=first_name,
+        mail_address=frontend_applicant.email,
+        phone_number=frontend_applicant.phone_num,
+        address=frontend_applicant.address,
+        birth_date=frontend_applicant.birthdate,
+        license=", ".join(frontend_applicant.qualifications) if frontend_applicant.qualifications else None
+    )
+
+    # IDはアプリ側で生成し、flush/refresh を使わずにまとめてINSERTする
+    mail_key = normalize_mail_address(applicant_data.mail_address)
+    user_id = await find_applicant_by_mail_address(db, mail_key) if mail_key else None
+    admission = EventAdmission(db)
+    try:
+        if user_id is None:
+            user_id = uuid.uuid5(JOIN_EVENT_USER_NAMESPACE, mail_key) if mail_key else uuid.uuid4()
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(UserModel).values(
+                        user_id=user_id,
+                        user_type=UserTypeEnum.APPLICANT,
+                        user_name=f"{last_name} {first_name}",
+                        created_at=utc_now()
+                    ))
+                    await db.execute(insert(ApplicantModel).values(
+                        user_id=user_id,
+                        last_name=applicant_data.last_name,
+                        first_name=applicant_data.first_name,
+                        mail_address=applicant_data.mail_address,
+                        phone_number=applicant_data.phone_number,
+                        address=applicant_data.address,
+                        birth_date=parse_birth_date(applicant_data),
+                        license=applicant_data.license
+                    ))
+                    # 新しい応募者のため、フィードを作成する対象に加える
+                    await db.execute(insert(ApplicantFeedStateModel).values(user_id=user_id, dirty=True))
+            except sqlalchemy.exc.IntegrityError:
+                # 同じメールアドレスの応募者が並行して作成された場合は、その応募者で応募する
+                if not mail_key or await db.get(ApplicantModel, user_id) is None:
+                    raise
+        else:
+            # 応募したイベントをフィードの順位付けに反映する
+            await mark_applicants_dirty(db, [user_id])
+        # 募集枠を確保できればPENDING、満員の場合はキャンセル待ち（WAITLISTED）
+        status = await admission.admit(event_id)
+        application_id = (await db.execute(
+            insert(ApplicationModel).values(
+                application_id=uuid.uuid4(),
+                event_id=event_id,
+                user_id=user_id,
+                status=status,
+                message=frontend_applicant.motivation or "参加申請",  # motivationがあればそれを使用、なければデフォルト
+                applied_at=utc_now()
+            ).returning(ApplicationModel.application_id)
+        )).scalar_one()
+
+        response = {
+            "message": "Successfully joined the event",
+            "application_id": str(application_id),
+            "user_id": str(user_id),
+            "status": status.value,
+        }
+        if idempotency_key:
+            await db.execute(insert(IdempotencyKeyModel).values(
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+                response=response
+            ))
+        await db.commit()
+        await invalidate_admission_cache(admission)
+        feed_refresher.notify()
+        return response
+    except sqlalchemy.exc.IntegrityError as e:
+        await db.rollback()
+        if idempotency_key:
+            # 同じキーの並行リクエストが先にコミットした場合は、そのレスポンスを返す
+            stored = await get_idempotent_response(db, idempotency_key, request_hash)
+            if stored is not None:
+                return stored
+        if "uq_applications_event_id_user_id" in str(e.orig):
+            raise HTTPException(status_code=409, detail="既にこのイベントに応募しています") from e
+        # 主にイベントが存在しない場合 (外部キー制約違反)
+        raise HTTPException(status_code=400, detail=f"Could not join the event: {e.orig}") from e
+
+
+def review_xp(rating: float) -> int:
+    """レビューの評価に応じて応募者に付与する経験値"""
+    return max(round(rating * XP_REVIEW_PER_RATING), 0)
+
+
+async def adjust_review_xp(
+    ledger: XpLedger,
+    review_id: uuid.UUID,
+    version: str,
+    before: Tuple[ApplicationModel, float],
+    after: Optional[Tuple[ApplicationModel, float]] = None
+) -> None:
+    """
+    レビューの変更・削除に合わせて、付与済みの経験値との差分を REVIEW_ADJUSTED として記録する
+    補正の source_id はレビューIDと version (更新日時など) から決めるため、同じ版の補正は一度だけ記録される。
+    :param before: 変更前の (応募, 評価)
+    :param after: 変更後の (応募, 評価)。削除の場合はNone
+    """
+    # 応募ID → (応募, 経験値の差分)。レビューの対象の応募が変わった場合は、元の応募者から減らして新しい応募者に加える
+    changes = [(before[0], -review_xp(before[1]))]
+    if after is not None:
+        changes.append((after[0], review_xp(after[1])))
+    deltas: Dict[uuid.UUID, Tuple[ApplicationModel, int]] = {}
+    for application, amount in changes:
+        _, delta = deltas.get(application.application_id, (application, 0))
+        deltas[application.application_id] = (application, delta + amount)
+
+    for application_id, (application, delta) in deltas.items():
+        await ledger.adjust(
+            application.user_id, XpSourceEnum.REVIEW_ADJUSTED, delta,
+            source_id=uuid.uuid5(review_id, f"{version}:{application_id}"),
+            company_id=event_company_id(application.event_id)
+        )
+
+
 # レビューを作成する関数
-def create_review(db: Session, review_data: ReviewCreate) -> ReviewModel:
+async def create_review(db: AsyncSession, review_data: ReviewCreate) -> ReviewModel:
     """Create a new review."""
     # 応募が存在するか確認
-    application = (
-        db.query(ApplicationModel)
-        .filter(ApplicationModel.application_id == review_data.application_id)
-        .first()
-    )
+    application = await db.get(ApplicationModel, review_data.application_id)
     if not application:
         raise HTTPException(status_code=404, detail="指定された応募が見つかりません")
 
@@ -511,21 +1575,36 @@ def create_review(db: Session, review_data: ReviewCreate) -> ReviewModel:
     )
 
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    await db.flush()
+    # レビューを受けた応募者に、評価に応じた経験値を付与する
+    ledger = XpLedger(db)
+    await ledger.record(
+        application.user_id, XpSourceEnum.REVIEW_RATED, review_xp(review_data.rating),
+        source_id=db_review.review_id, company_id=event_company_id(application.event_id)
+    )
+    # 企業からの評価をフィードの順位付けに反映する
+    await mark_applicants_dirty(db, [application.user_id])
+    await db.commit()
+    xp_aggregator.notify(ledger.recorded)
+    feed_refresher.notify()
+    await db.refresh(db_review)
     return db_review
 
 
 # レビュー一覧を取得する関数
-def get_reviews(
-    db: Session,
+async def get_reviews(
+    db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple[Optional[datetime], uuid.UUID]] = None
 ) -> List[Dict]:
-    """Get a list of reviews with application, event, and applicant details."""
+    """
+    Get a list of reviews with application, event, and applicant details.
+    (created_at, review_id) 順に並べ、after を指定した場合はその位置より後ろから取得する
+    """
     # レビュー、応募情報、イベント情報、応募者情報を結合して取得
-    query = (
-        db.query(
+    stmt = (
+        select(
             ReviewModel,
             ApplicationModel.application_id,
             EventModel.title.label("event_title"),
@@ -539,10 +1618,14 @@ def get_reviews(
         .join(
             ApplicantModel,
             ApplicationModel.user_id == ApplicantModel.user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .order_by(ReviewModel.created_at, ReviewModel.review_id)
     )
+    if after is not None:
+        stmt = stmt.where(tuple_(ReviewModel.created_at, ReviewModel.review_id) > after)
+    else:
+        stmt = stmt.offset(skip)
+    stmt = stmt.limit(limit)
+    query = (await db.execute(stmt)).all()
 
     # 結果をディクショナリのリストに変換
     results = []
@@ -568,133 +1651,164 @@ def get_reviews(
 
 
 # レビューを更新する関数
-def update_review(
-    db: Session,
+async def update_review(
+    db: AsyncSession,
     review_id: uuid.UUID,
     review_data: ReviewCreate
 ) -> Optional[ReviewModel]:
     """Update an existing review."""
     # 既存のレビューを取得
-    review = (
-        db.query(ReviewModel)
-        .filter(ReviewModel.review_id == review_id)
-        .first()
-    )
+    review = await db.get(ReviewModel, review_id)
     if not review:
         return None
+    before = (await db.get(ApplicationModel, review.application_id), review.rating)
 
     # 更新対象のフィールドを設定
     for key, value in review_data.model_dump(exclude_unset=True).items():
-        setattr(review, key, value)
+        setattr(review, key, strip_tz(value))
 
     # 更新日時を更新
-    review.updated_at = datetime.now(timezone.utc)
+    review.updated_at = utc_now()
+
+    application = await db.get(ApplicationModel, review.application_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="指定された応募が見つかりません")
 
     db.add(review)
-    db.commit()
-    db.refresh(review)
+    # 評価・対象の応募の変更に合わせて、付与済みの経験値を補正する
+    ledger = XpLedger(db)
+    await adjust_review_xp(
+        ledger, review.review_id, review.updated_at.isoformat(), before, (application, review.rating)
+    )
+    # 企業からの評価をフィードの順位付けに反映する
+    await mark_applicants_dirty(db, [before[0].user_id, application.user_id])
+    await db.commit()
+    xp_aggregator.notify(ledger.recorded)
+    feed_refresher.notify()
+    await db.refresh(review)
     return review
 
 
 # レビューを削除する関数
-def delete_review(db: Session, review_id: uuid.UUID) -> bool:
+async def delete_review(db: AsyncSession, review_id: uuid.UUID) -> bool:
     """Delete a review."""
-    review = (
-        db.query(ReviewModel)
-        .filter(ReviewModel.review_id == review_id)
-        .first()
-    )
+    review = await db.get(ReviewModel, review_id)
     if not review:
         return False
 
-    db.delete(review)
-    db.commit()
+    # 付与済みの経験値を取り消す
+    application = await db.get(ApplicationModel, review.application_id)
+    ledger = XpLedger(db)
+    await adjust_review_xp(ledger, review.review_id, "deleted", (application, review.rating))
+    await mark_applicants_dirty(db, [application.user_id])
+    await db.delete(review)
+    await db.commit()
+    xp_aggregator.notify(ledger.recorded)
+    feed_refresher.notify()
     return True
 
 
 # 応募者を更新する関数
-def update_applicant(
-    db: Session,
+async def update_applicant(
+    db: AsyncSession,
     user_id: uuid.UUID,
     applicant_data: ApplicantCreate
 ) -> Optional[ApplicantModel]:
     """Update an existing applicant."""
     # 既存のユーザーを取得
-    applicant = (
-        db.query(ApplicantModel)
-        .filter(ApplicantModel.user_id == user_id)
-        .first()
-    )
+    applicant = await db.get(ApplicantModel, user_id)
     if not applicant:
         return None
 
     # 更新対象のフィールドを設定
     for key, value in applicant_data.model_dump(exclude_unset=True).items():
-        setattr(applicant, key, value)
+        setattr(applicant, key, strip_tz(value))
 
     # 更新日時を更新
-    applicant.updated_at = datetime.now(timezone.utc)
+    applicant.updated_at = utc_now()
 
     db.add(applicant)
-    db.commit()
-    db.refresh(applicant)
+    if "license" in applicant_data.model_fields_set:
+        # 資格が変わるとフィードの順位が変わる
+        await mark_applicants_dirty(db, [user_id])
+    await db.commit()
+    feed_refresher.notify()
+    await db.refresh(applicant)
     return applicant
 
 
 # 応募者を削除する関数
-def delete_applicant(db: Session, user_id: uuid.UUID) -> bool:
+async def delete_applicant(db: AsyncSession, user_id: uuid.UUID) -> bool:
     """Delete an applicant."""
-    applicant = (
-        db.query(ApplicantModel)
-        .filter(ApplicantModel.user_id == user_id)
-        .first()
-    )
+    applicant = await db.get(ApplicantModel, user_id)
     if not applicant:
         return False
 
-    db.delete(applicant)
-    db.commit()
+    # 応募はDB側でカスケード削除されるため、先に枠を使っていたイベントを取得しておく
+    holding_event_ids = (await db.execute(
+        select(ApplicationModel.event_id).where(
+            ApplicationModel.user_id == user_id,
+            ApplicationModel.status.in_(SPOT_HOLDING_STATUSES)
+        )
+    )).scalars().all()
+
+    await db.delete(applicant)
+    await db.flush()
+    admission = EventAdmission(db)
+    for event_id in holding_event_ids:
+        await admission.release(event_id)
+    await db.commit()
+    await invalidate_admission_cache(admission)
     return True
 
 
 # 応募を更新する関数
-def update_application(
-    db: Session,
+async def update_application(
+    db: AsyncSession,
     application_id: uuid.UUID,
     application_data: ApplicationCreate
 ) -> Optional[ApplicationModel]:
     """Update an existing application."""
     # 既存の応募を取得
-    application = (
-        db.query(ApplicationModel)
-        .filter(ApplicationModel.application_id == application_id)
-        .first()
-    )
+    application = await db.get(ApplicationModel, application_id)
     if not application:
         return None
 
+    previous_event_id = application.event_id
+
     # 更新対象のフィールドを設定
     for key, value in application_data.model_dump(exclude_unset=True).items():
-        setattr(application, key, value)
+        setattr(application, key, strip_tz(value))
 
     db.add(application)
-    db.commit()
-    db.refresh(application)
+    admission = EventAdmission(db)
+    if application.event_id != previous_event_id:
+        # 別のイベントに変更した場合は、変更先で改めて枠を確保し、変更前のイベントの枠を返却する
+        was_holding = application.status in SPOT_HOLDING_STATUSES
+        application.status = await admission.admit(application.event_id)
+        await db.flush()
+        if was_holding:
+            await admission.release(previous_event_id)
+    await db.commit()
+    await invalidate_admission_cache(admission)
+    await db.refresh(application)
     return application
 
 
-def delete_application(db: Session, application_id: uuid.UUID) -> bool:
+async def delete_application(db: AsyncSession, application_id: uuid.UUID) -> bool:
     """Delete an application."""
-    application = (
-        db.query(ApplicationModel)
-        .filter(ApplicationModel.application_id == application_id)
-        .first()
-    )
+    application = await db.get(ApplicationModel, application_id)
     if not application:
         return False
 
-    db.delete(application)
-    db.commit()
+    await db.delete(application)
+    admission = EventAdmission(db)
+    if application.status in SPOT_HOLDING_STATUSES:
+        # 募集枠を返却し、キャンセル待ちがあれば繰り上げる
+        await db.flush()
+        await admission.release(application.event_id)
+    await db.commit()
+    await invalidate_admission_cache(admission)
     return True
 
 
@@ -702,168 +1816,290 @@ def delete_application(db: Session, application_id: uuid.UUID) -> bool:
 @app.post("/event", response_model=EventSchema, status_code=201)
 async def create_event_api(
     event_data: EventCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventSchema:
     """API endpoint to create an event."""
     try:
         # デバッグ用: 受信データを出力
-        print(f"Received event_data: {event_data}")
-        print(
-            f"company_id type: {type(event_data.company_id)}, "
-            f"value: {event_data.company_id}")
-        print(
-            f"event_type type: {type(event_data.event_type)}, "
-            f"value: {event_data.event_type}")
-
-        created_event = create_event(db=db, event_data=event_data)
-        return EventSchema.model_validate(created_event)  # Pydantic v2
+        log_payload("Received event_data", "/event", event_data)
+
+        created_event = await create_event(db=db, event_data=event_data)
+        return JSONResponse(status_code=201, content=serialize_event(created_event))
     except HTTPException as e:  # バリデーションエラー等をキャッチ
         raise e
     except Exception as e:
-        # ここで詳細なエラーロギングを行うと良い
-        print(f"Error creating event: {e}")
+        logger.exception("Error creating event", extra={"route": "/event"})
         raise HTTPException(
             status_code=500,
             detail="Error creating event in database"
         ) from e
 
 
-@app.get("/event", response_model=List[EventSchema])
+@app.post("/events/bulk", response_model=BulkImportResult)
+async def bulk_create_events_api(
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> BulkImportResult:
+    """
+    イベント一括登録エンドポイント
+    リクエストボディに JSON Lines (1行に1イベント) または CSV (ヘッダー行は EventCreate の項目名) を指定する。
+    形式は format クエリ (jsonl / csv) で指定し、省略時は Content-Type から判定する (text/csv 以外は JSON Lines)。
+    検証に失敗した行は登録せず、errors に行番号とともに返す。
+    """
+    data_format = (format or "").lower()
+    if not data_format:
+        data_format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    if data_format not in ("jsonl", "csv"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format} (jsonl or csv)")
+
+    body = await request.body()
+    return await bulk_create_events(db, body, data_format)
+
+
+@app.get("/events/filter", response_model=EventFilterResult)
+async def filter_events_api(
+    event_type: Optional[List[str]] = Query(None),
+    start_from: Optional[date] = None,
+    start_to: Optional[date] = None,
+    reward_min: Optional[int] = None,
+    reward_max: Optional[int] = None,
+    tag: Optional[List[str]] = Query(None),
+    qualification: Optional[List[str]] = Query(None),
+    prefecture: Optional[List[str]] = Query(None),
+    limit: int = 50,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+) -> EventFilterResult:
+    """
+    イベントを条件で絞り込むエンドポイント（開始日時順）
+    event_type・prefecture は指定した値のいずれか、tag・qualification は指定した値をすべて含むイベントに絞り込む
+    （複数指定する場合は ?tag=金属加工&tag=検査 のように繰り返す）。
+    facets には event_type・prefecture・tag・qualification ごとの値と件数を返す。
+    各ファセットの件数は、そのファセット以外の条件で集計する。
+    """
+    try:
+        event_types = [get_event_type_enum(value) for value in event_type or []]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    conditions = build_filter_conditions(
+        event_types=event_types,
+        start_from=start_from,
+        start_to=start_to,
+        reward_min=reward_min,
+        reward_max=reward_max,
+        tags=tag,
+        qualifications=qualification,
+        prefectures=prefecture,
+    )
+    limit = max(min(limit, 100), 1)
+    return JSONResponse(content=await filter_events(db, conditions, limit, max(offset, 0)))
+
+
+@app.get("/events/calendar", response_model=EventCalendarMonth)
+async def get_events_calendar_api(
+    month: str,
+    db: AsyncSession = Depends(get_async_db)
+) -> EventCalendarMonth:
+    """
+    カレンダー表示用に、指定した月 (YYYY-MM) の日ごとのイベント数とイベントの種類を返すエンドポイント
+    イベントの作成・更新・削除時に更新している集計 (event_calendar_days) から取得するため、イベント自体は読み込まない。
+    イベントのない日は含まない。
+    """
+    try:
+        first, following = parse_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="month は YYYY-MM 形式で指定してください") from e
+    rows = (await db.execute(build_month_query(first, following))).all()
+    return JSONResponse(content={"month": first.strftime("%Y-%m"), "days": summarize_month(rows)})
+
+
+@app.get("/events/search", response_model=EventSearchResult)
+async def search_events_api(
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+) -> EventSearchResult:
+    """
+    イベントを検索するエンドポイント
+    q に空白区切りで指定したすべての語を、タイトル・説明・開催場所・タグのいずれかに含むイベントを一致度の高い順に返す。
+    日本語の部分一致 (例: 金属加工、大田区) にも対応する。検索語の位置は highlights の <mark></mark> で示す。
+    """
+    limit = max(min(limit, 100), 1)
+    return JSONResponse(content=await search_events(db, q, limit, max(offset, 0)))
+
+
+@app.get("/event", response_model=Union[List[EventSchema], CursorPage[EventSchema]])
 async def get_events_api(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
-) -> List[EventSchema]:
-    """API endpoint to get a list of events."""
-    db_events = get_events(db, skip=skip, limit=limit)
-    return [EventSchema.model_validate(event) for event in db_events]
+    include_image: bool = False,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[List[EventSchema], CursorPage[EventSchema]]:
+    """
+    API endpoint to get a list of events.
+    画像は image_url から取得する。include_image=true の場合のみBase64の画像を含める（旧クライアント用）。
+    cursor を指定するとカーソルページングになる（最初のページは空文字、以降は next_cursor を指定）。
+    """
+    if cursor is None:
+        db_events = await get_events(db, skip=skip, limit=limit, include_image=include_image)
+        return JSONResponse(content=serialize_events(db_events, include_image))
+
+    db_events = await get_events(
+        db, limit=limit + 1, include_image=include_image,
+        after=decode_cursor(cursor) if cursor else None
+    )
+    db_events, next_cursor = build_cursor_page(
+        db_events, limit, lambda event: encode_cursor(event.created_at, event.event_id)
+    )
+    return JSONResponse(content={
+        "items": serialize_events(db_events, include_image),
+        "next_cursor": next_cursor
+    })
 
 
 @app.get("/event/{event_id}", response_model=EventSchema)
 async def get_event_api(
     event_id: uuid.UUID,
-    db: Session = Depends(get_db)
+    include_image: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventSchema:
-    db_event = get_event_by_id(db, event_id) # get_event_by_id はこのファイルの上部で定義されている想定
+    """
+    API endpoint to get an event.
+    画像を含まないレスポンスはキャッシュする（イベントの更新・削除時に破棄）。
+    """
+    cache_key = event_cache_key(event_id)
+    if not include_image:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(content=cached)
+
+    db_event = await get_event_row(db, event_id, include_image=include_image)
     if db_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
+    content = serialize_event(db_event, include_image)
+    if not include_image:
+        await response_cache.set(cache_key, content)
+    return JSONResponse(content=content)
 
-    # --- データ変換処理 ---
-    # tags: get_events と同様に、DBから取得した値をリストに変換後、JSON文字列にする
-    tags_list: List[str] = []
-    if isinstance(db_event.tags, str) and db_event.tags:
-        try:
-            # DBにJSON文字列として保存されている場合
-            parsed_json_tags = json.loads(db_event.tags)
-            if isinstance(parsed_json_tags, list):
-                tags_list = [str(tag) for tag in parsed_json_tags]
-            else: # JSONだがリストではない場合、単一要素のリストとして扱う
-                tags_list = [str(parsed_json_tags)]
-        except json.JSONDecodeError:
-            # JSONでなければカンマ区切り文字列と仮定
-            tags_list = [t.strip() for t in db_event.tags.split(',') if t.strip()]
-    elif isinstance(db_event.tags, list): # DBがPythonリストを返す場合
-        tags_list = [str(t) for t in db_event.tags]
-    
-    tags_for_schema = json.dumps(tags_list) if tags_list else None
-
-    # image: バイト列ならBase64エンコード、文字列ならそのまま
-    image_str: Optional[str] = None
-    if hasattr(db_event, 'image') and db_event.image:
-        if isinstance(db_event.image, bytes):
-            image_str = base64.b64encode(db_event.image).decode('utf-8')
-        elif isinstance(db_event.image, str):
-            image_str = db_event.image
-
-    # event_type: Enumの場合は .value を使用
-    event_type_value = db_event.event_type
-    if hasattr(db_event.event_type, 'value'):
-        event_type_value = db_event.event_type.value
-
-    # required_qualifications: EventSchemaがリストを期待する場合、文字列からリストに変換
-    # get_eventsでは特に変換していないため、EventSchemaの定義に依存。
-    # ここではフロントエンドの期待に合わせてリストに変換することを試みる。
-    # EventSchema.required_qualifications が List[str] であると仮定。
-    required_qualifications_list: List[str] = []
-    if isinstance(db_event.required_qualifications, str):
-        required_qualifications_list = [q.strip() for q in db_event.required_qualifications.split(',') if q.strip()]
-    elif isinstance(db_event.required_qualifications, list):
-        required_qualifications_list = [str(q) for q in db_event.required_qualifications]
-    elif db_event.required_qualifications is None:
-        required_qualifications_list = []
-
-
-    # EventSchema に渡すペイロードを作成
-    event_payload = {
-        "event_id": db_event.event_id,
-        "company_id": db_event.company_id,
-        "event_type": event_type_value,
-        "title": db_event.title,
-        "description": db_event.description,
-        "start_date": db_event.start_date,
-        "end_date": db_event.end_date,
-        "location": db_event.location,
-        "reward": db_event.reward,
-        "required_qualifications": required_qualifications_list, # リストとして渡す
-        "available_spots": db_event.available_spots,
-        "created_at": db_event.created_at,
-        "updated_at": db_event.updated_at,
-        "tags": tags_for_schema, # JSON文字列として渡す (get_eventsに合わせる)
-        "image": image_str,
-    }
 
-    try:
-        # Pydanticモデルのバリデーションとインスタンス化
-        return EventSchema.model_validate(event_payload)
-    except Exception as e:
-        # エラーログを出力してデバッグしやすくする
-        print(f"Error during EventSchema validation for event_id {event_id}: {str(e)}")
-        print(f"Payload provided for validation: {event_payload}")
-        raise HTTPException(status_code=500, detail=f"Internal server error during event data processing: {str(e)}")
+@app.get("/event/{event_id}/image")
+async def get_event_image_api(
+    event_id: uuid.UUID,
+    request: Request,
+    size: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """
+    イベント画像をバイナリで返すエンドポイント
+    size を指定すると縮小画像 (thumb: 160px, detail: 640px, WebP) を返す
+    If-None-Match がETagと一致する場合は画像を読み込まずに 304 を返す
+    """
+    if size is not None and size not in image_store.sizes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid size: {size} (available: {', '.join(image_store.sizes)})"
+        )
+
+    row = (await db.execute(
+        select(EventModel.image_etag).where(EventModel.event_id == event_id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    headers = {"Cache-Control": f"public, max-age={IMAGE_CACHE_MAX_AGE}"}
+    if row.image_etag:
+        etag = f'"{row.image_etag}-{size}"' if size else f'"{row.image_etag}"'
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+    if size and row.image_etag:
+        # 縮小画像はディスクのキャッシュから返す（ない場合は元画像から作成）
+        derivative = image_store.get(row.image_etag, size)
+        if derivative is None:
+            image = (await db.execute(
+                select(EventModel.image).where(EventModel.event_id == event_id)
+            )).scalar()
+            if not image:
+                raise HTTPException(status_code=404, detail="Image not found")
+            derivative = await run_in_threadpool(
+                image_store.get_or_create, lambda: image, row.image_etag, size
+            )
+        return Response(content=derivative, media_type=image_store.MEDIA_TYPE, headers=headers)
+
+    image = (await db.execute(
+        select(EventModel.image).where(EventModel.event_id == event_id)
+    )).scalar()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    # ETag未計算の既存データ (マイグレーション前) はここで計算する
+    headers["ETag"] = f'"{row.image_etag or compute_image_etag(image)}"'
+    return Response(content=image, media_type=detect_image_media_type(image), headers=headers)
 
 
 @app.put("/event/{event_id}", response_model=EventSchema)
 async def update_event_api(
     event_id: uuid.UUID,
     event_data: EventUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventSchema:
     """API endpoint to update an event."""
-    updated_event = update_event(db, event_id, event_data)
+    updated_event = await update_event(db, event_id, event_data)
     if updated_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    return EventSchema.model_validate(updated_event)
+    return JSONResponse(content=serialize_event(updated_event))
 
 
 @app.delete("/event/{event_id}", status_code=204)
-async def delete_event_api(event_id: uuid.UUID, db: Session = Depends(get_db)):
+async def delete_event_api(event_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
     """API endpoint to delete an event."""
-    deleted_event = delete_event(db, event_id)
+    deleted_event = await delete_event(db, event_id)
     if deleted_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return  # No content
 
 
 # --- 応募関連エンドポイント --- #
-@app.get("/applications", response_model=List[ApplicationDetail])
+@app.get("/applications", response_model=Union[List[ApplicationDetail], CursorPage[ApplicationDetail]])
 async def get_applications_api(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
-) -> List[ApplicationDetail]:
-    """API endpoint to get a list of applications."""
-    applications = get_applications(db, skip=skip, limit=limit)
-    return [ApplicationDetail.model_validate(app) for app in applications]
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[List[ApplicationDetail], CursorPage[ApplicationDetail]]:
+    """
+    API endpoint to get a list of applications.
+    cursor を指定するとカーソルページングになる（最初のページは空文字、以降は next_cursor を指定）。
+    """
+    if cursor is None:
+        applications = await get_applications(db, skip=skip, limit=limit)
+        return [ApplicationDetail.model_validate(app) for app in applications]
+
+    applications = await get_applications(
+        db, limit=limit + 1, after=decode_cursor(cursor) if cursor else None
+    )
+    applications, next_cursor = build_cursor_page(
+        applications, limit,
+        lambda app: encode_cursor(app["applied_at"], app["application_id"])
+    )
+    return CursorPage[ApplicationDetail](
+        items=[ApplicationDetail.model_validate(app) for app in applications],
+        next_cursor=next_cursor
+    )
 
 
 @app.put("/applications/{application_id}", response_model=ApplicationResponse)
 async def update_application_status_api(
     application_id: uuid.UUID,
     application_data: ApplicationUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApplicationResponse:
     """API endpoint to update an application's status."""
-    updated_application = update_application_status(
+    updated_application = await update_application_status(
         db,
         application_id=application_id,
         data=application_data
@@ -873,16 +2109,106 @@ async def update_application_status_api(
     return ApplicationResponse.model_validate(updated_application)
 
 
+@app.put("/participants/{participant_id}", response_model=ParticipantResponse)
+async def update_participant_status_api(
+    participant_id: uuid.UUID,
+    participant_data: ParticipantUpdate,
+    db: AsyncSession = Depends(get_async_db)
+) -> ParticipantResponse:
+    """API endpoint to update a participant's status (終了 にすると経験値を付与する)."""
+    participant = await update_participant_status(db, participant_id=participant_id, data=participant_data)
+    if participant is None:
+        raise HTTPException(status_code=404, detail="Participant not found")
+    return ParticipantResponse.model_validate(participant)
+
+
+@app.get("/player/{user_id}", response_model=PlayerSchema)
+async def get_player_api(
+    user_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db)
+) -> PlayerSchema:
+    """プレイヤーの経験値・レベルと、次のレベルまでの進み具合を返すエンドポイント"""
+    player = await get_player(db, user_id)
+    if player is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return player
+
+
+def resolve_leaderboard(scope: str, company_id: Optional[uuid.UUID], period: Optional[str]) -> str:
+    """ランキングの種類 (scope) からボード名を求める"""
+    if scope == "global":
+        return GLOBAL_BOARD
+    if scope == "company":
+        if company_id is None:
+            raise HTTPException(status_code=400, detail="scope=company の場合は company_id を指定してください")
+        return company_board(company_id)
+    if scope == "monthly":
+        try:
+            at = datetime.strptime(period, "%Y-%m") if period else utc_now()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="period は YYYY-MM 形式で指定してください") from e
+        return monthly_board(at)
+    raise HTTPException(status_code=400, detail=f"Invalid scope: {scope} (global / company / monthly)")
+
+
+@app.get("/leaderboard", response_model=LeaderboardPage)
+async def get_leaderboard_api(
+    scope: str = "global",
+    company_id: Optional[uuid.UUID] = None,
+    period: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+) -> LeaderboardPage:
+    """
+    経験値のランキングを返すエンドポイント
+    scope: global (累計経験値) / company (company_id の企業のイベントで獲得した経験値) / monthly (period の月に獲得した経験値。省略時は今月)
+    """
+    board = resolve_leaderboard(scope, company_id, period)
+    limit = max(min(limit, 1000), 0)
+    entries = await leaderboard.top(board, limit, max(offset, 0))
+
+    # 応募者名は表示する分だけまとめて取得する
+    names = {}
+    if entries:
+        user_ids = [uuid.UUID(entry["user_id"]) for entry in entries]
+        result = await db.execute(
+            select(ApplicantModel.user_id, ApplicantModel.last_name, ApplicantModel.first_name)
+            .where(ApplicantModel.user_id.in_(user_ids))
+        )
+        names = {str(row.user_id): f"{row.last_name} {row.first_name}" for row in result}
+    return LeaderboardPage(
+        board=board,
+        total=await leaderboard.backend.size(board),
+        items=[LeaderboardEntry(**entry, name=names.get(entry["user_id"])) for entry in entries],
+    )
+
+
+@app.get("/leaderboard/rank/{user_id}", response_model=LeaderboardRank)
+async def get_leaderboard_rank_api(
+    user_id: uuid.UUID,
+    scope: str = "global",
+    company_id: Optional[uuid.UUID] = None,
+    period: Optional[str] = None
+) -> LeaderboardRank:
+    """プレイヤーの順位を返すエンドポイント（scope などは GET /leaderboard と同じ）"""
+    board = resolve_leaderboard(scope, company_id, period)
+    rank = await leaderboard.rank(board, user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Player not found in leaderboard")
+    return LeaderboardRank(board=board, **rank)
+
+
 # --- 応募者関連エンドポイント --- #
 @app.post("/applicant", response_model=ApplicantSchema, status_code=201)
 async def create_applicant_api(
     applicant_data: ApplicantCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApplicantSchema:
     """API endpoint to create an applicant."""
     try:
-        print(f"Received applicant data: {applicant_data}")
-        created_applicant = create_applicant(
+        log_payload("Received applicant data", "/applicant", applicant_data)
+        created_applicant = await create_applicant(
             db=db,
             applicant_data=applicant_data
         )
@@ -890,30 +2216,84 @@ async def create_applicant_api(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error creating applicant: {e}")
+        logger.exception("Error creating applicant", extra={"route": "/applicant"})
         raise HTTPException(
             status_code=500,
             detail=f"Error creating applicant: {str(e)}"
         ) from e
 
 
-@app.get("/applicants", response_model=List[ApplicantSchema])
+@app.get("/applicants", response_model=Union[List[ApplicantSchema], CursorPage[ApplicantSchema]])
 async def get_applicants_api(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
-) -> List[ApplicantSchema]:
-    """API endpoint to get a list of applicants."""
-    db_applicants = get_applicants(db, skip=skip, limit=limit)
-    return [ApplicantSchema.model_validate(applicant)
-            for applicant in db_applicants]
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[List[ApplicantSchema], CursorPage[ApplicantSchema]]:
+    """
+    API endpoint to get a list of applicants.
+    cursor を指定するとカーソルページングになる（最初のページは空文字、以降は next_cursor を指定）。
+    """
+    if cursor is None:
+        db_applicants = await get_applicants(db, skip=skip, limit=limit)
+        return [ApplicantSchema.model_validate(applicant)
+                for applicant in db_applicants]
+
+    db_applicants = await get_applicants(
+        db, limit=limit + 1, after=decode_cursor(cursor)[1] if cursor else None
+    )
+    db_applicants, next_cursor = build_cursor_page(
+        db_applicants, limit, lambda applicant: encode_cursor(None, applicant.user_id)
+    )
+    return CursorPage[ApplicantSchema](
+        items=[ApplicantSchema.model_validate(applicant) for applicant in db_applicants],
+        next_cursor=next_cursor
+    )
+
+@app.get("/applicant/{user_id}/recommended-events", response_model=RecommendedEvents)
+async def get_recommended_events_api(
+    user_id: uuid.UUID,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db)
+) -> RecommendedEvents:
+    """
+    応募者におすすめのイベントを取得するエンドポイント
+    応募者の資格 (license) とイベントの必要資格の一致率・開催日の近さ・報酬からスコアを計算し、
+    応募済みのものを除いた開催前のイベントをスコアの高い順に返す。
+    """
+    recommended = await get_recommended_events(db, user_id, max(min(limit, 100), 1))
+    if recommended is None:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    return JSONResponse(content=recommended)
+
+
+@app.get("/applicant/{user_id}/feed", response_model=ApplicantFeedPage)
+async def get_applicant_feed_api(
+    user_id: uuid.UUID,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> ApplicantFeedPage:
+    """
+    応募者ごとのおすすめイベントのフィードを取得するエンドポイント
+    資格・応募履歴・企業からの評価・レベルから順位付けしたイベントを、バックグラウンドで作成しておいたものを返す。
+    cursor に next_cursor を指定すると続きを取得できる。
+    """
+    try:
+        after = int(cursor) if cursor else 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    feed = await get_applicant_feed(db, user_id, max(min(limit, 100), 1), after)
+    if feed is None:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    return JSONResponse(content=feed)
 
 # プレフィックス付きユーザーAPI routes
 @api_router.get("/users", response_model=List[ApplicantSchema])
 async def get_api_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[ApplicantSchema]:
     """API endpoint to get a list of users with API prefix."""
     return await get_applicants_api(skip=skip, limit=limit, db=db)
@@ -922,12 +2302,12 @@ async def get_api_users(
 @app.post("/application", response_model=ApplicationResponse, status_code=201)
 async def create_application_api(
     application_data: ApplicationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApplicationResponse:
     """API endpoint to create an application."""
     try:
-        print(f"Received application data: {application_data}")
-        created_application = create_application(
+        log_payload("Received application data", "/application", application_data)
+        created_application = await create_application(
             db=db,
             application_data=application_data
         )
@@ -935,7 +2315,7 @@ async def create_application_api(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error creating application: {e}")
+        logger.exception("Error creating application", extra={"route": "/application"})
         raise HTTPException(
             status_code=500,
             detail=f"Error creating application: {str(e)}"
@@ -946,39 +2326,55 @@ async def create_application_api(
 @app.post("/review", response_model=ReviewSchema, status_code=201)
 async def create_review_api(
     review_data: ReviewCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ReviewSchema:
     """API endpoint to create a review."""
     try:
-        print(f"Received review data: {review_data}")
-        created_review = create_review(db=db, review_data=review_data)
+        log_payload("Received review data", "/review", review_data)
+        created_review = await create_review(db=db, review_data=review_data)
         return ReviewSchema.model_validate(created_review)
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error creating review: {e}")
+        logger.exception("Error creating review", extra={"route": "/review"})
         raise HTTPException(
             status_code=500,
             detail=f"Error creating review: {str(e)}"
         ) from e
 
 
-@app.get("/reviews", response_model=List[ReviewDetail])
+@app.get("/reviews", response_model=Union[List[ReviewDetail], CursorPage[ReviewDetail]])
 async def get_reviews_api(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
-) -> List[ReviewDetail]:
-    """API endpoint to get a list of reviews."""
-    reviews = get_reviews(db, skip=skip, limit=limit)
-    return [ReviewDetail.model_validate(review) for review in reviews]
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[List[ReviewDetail], CursorPage[ReviewDetail]]:
+    """
+    API endpoint to get a list of reviews.
+    cursor を指定するとカーソルページングになる（最初のページは空文字、以降は next_cursor を指定）。
+    """
+    if cursor is None:
+        reviews = await get_reviews(db, skip=skip, limit=limit)
+        return [ReviewDetail.model_validate(review) for review in reviews]
+
+    reviews = await get_reviews(
+        db, limit=limit + 1, after=decode_cursor(cursor) if cursor else None
+    )
+    reviews, next_cursor = build_cursor_page(
+        reviews, limit, lambda review: encode_cursor(review["created_at"], review["review_id"])
+    )
+    return CursorPage[ReviewDetail](
+        items=[ReviewDetail.model_validate(review) for review in reviews],
+        next_cursor=next_cursor
+    )
 
 # プレフィックス付きAPI routes
 @api_router.get("/reviews", response_model=List[ReviewDetail])
 async def get_api_reviews(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[ReviewDetail]:
     """API endpoint to get a list of reviews with API prefix."""
     return await get_reviews_api(skip=skip, limit=limit, db=db)
@@ -988,10 +2384,10 @@ async def get_api_reviews(
 async def update_applicant_api(
     user_id: uuid.UUID,
     applicant_data: ApplicantCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApplicantSchema:
     """API endpoint to update an applicant."""
-    updated_applicant = update_applicant(
+    updated_applicant = await update_applicant(
         db,
         user_id=user_id,
         applicant_data=applicant_data
@@ -1004,10 +2400,10 @@ async def update_applicant_api(
 @app.delete("/applicant/{user_id}", status_code=204)
 async def delete_applicant_api(
     user_id: uuid.UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to delete an applicant."""
-    success = delete_applicant(db, user_id=user_id)
+    success = await delete_applicant(db, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Applicant not found")
     return
@@ -1017,10 +2413,10 @@ async def delete_applicant_api(
 async def update_application_api(
     application_id: uuid.UUID,
     application_data: ApplicationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApplicationResponse:
     """API endpoint to update an application."""
-    updated_application = update_application(
+    updated_application = await update_application(
         db,
         application_id=application_id,
         application_data=application_data
@@ -1033,10 +2429,10 @@ async def update_application_api(
 @app.delete("/application/{application_id}", status_code=204)
 async def delete_application_api(
     application_id: uuid.UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to delete an application."""
-    success = delete_application(db, application_id=application_id)
+    success = await delete_application(db, application_id=application_id)
     if not success:
         raise HTTPException(status_code=404, detail="Application not found")
     return
@@ -1046,10 +2442,10 @@ async def delete_application_api(
 async def update_review_api(
     review_id: uuid.UUID,
     review_data: ReviewCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ReviewSchema:
     """API endpoint to update a review."""
-    updated_review = update_review(
+    updated_review = await update_review(
         db,
         review_id=review_id,
         review_data=review_data
@@ -1062,10 +2458,10 @@ async def update_review_api(
 @app.delete("/review/{review_id}", status_code=204)
 async def delete_review_api(
     review_id: uuid.UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to delete a review."""
-    success = delete_review(db, review_id)
+    success = await delete_review(db, review_id)
     if not success:
         raise HTTPException(status_code=404, detail="Review not found")
     return
@@ -1082,127 +2478,64 @@ async def demo_get_event(target_date: DateModel) -> List[EventSchema]:
         raise HTTPException(status_code=404, detail="Events not found")
     return generate_event_data
 
+
 @app.post("/get-events")
-async def get_event(target_date: DateModel) -> List[EventSchema]:
+async def get_event(
+    target_date: DateModel,
+    include_image: bool = False,
+    db_connector: DBConnector = Depends(get_db_connector)
+) -> List[EventSchema]:
     """
     イベント取得エンドポイント - 指定された日付のイベントリストをデータベースから取得します
     """
     # リクエストデータをログ出力
-    print("Received request for /get-events")
-    print("Raw target_date object:", target_date)
-    print("target_date.target_date:", target_date.target_date)
-    print("target_date type:", type(target_date.target_date))
-    
-    database_url = os.getenv("DATABASE_URL")
-    db_connector = DBConnector(
-        db_url = database_url,  # 環境変数からデータベースURLを取得
-        debug = False           # デバッグモードを有効にする
-    )
+    log_payload("Received request for /get-events", "/get-events", target_date)
 
     search_date = target_date.target_date  # DateModelオブジェクトからdateを取得
+    # 画像を含まないレスポンスは日付ごとにキャッシュする（その日のイベントの作成・更新・削除時に破棄）
+    cache_key = events_by_date_cache_key(search_date)
+    if not include_image:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(content=cached)
+
     try:
         # データベースから指定された日付のイベントを取得
-        events = db_connector.select_events_by_date(search_date)
-        if not events:
-            # イベントが見つからない場合は空のリストを返す
-            return []
-
+        # DBConnectorは同期APIのため、イベントループを塞がないようスレッドプールで実行
+        events = await run_in_threadpool(
+            db_connector.select_events_by_date, search_date, include_image=include_image
+        )
     except Exception as e:
-        print(f"データベースからイベントを取得中にエラーが発生しました: {str(e)}")
+        logger.exception("データベースからイベントを取得中にエラーが発生しました", extra={"route": "/get-events"})
         raise HTTPException(status_code=500, detail="Internal Server Error") from e
 
-    # イベントデータをPydanticモデルに変換
-    event_list = []
-    for event in events:
-        # tagsをJSON文字列からタグオブジェクト（color, label）のリストに変換
-        tags_data = []
-        if isinstance(event.tags, str) and event.tags:
-            try:
-                # JSONから変換を試みる
-                parsed_tags = json.loads(event.tags)
-                
-                if isinstance(parsed_tags, list):
-                    for tag in parsed_tags:
-                        if isinstance(tag, str):
-                            # 文字列タグからcolorとlabelを持つオブジェクトを生成
-                            hash_val = sum(ord(c) for c in tag) % 360
-                            tags_data.append({"color": f"hsl({hash_val}, 70%, 60%)", "label": tag})
-                        elif isinstance(tag, dict) and "label" in tag:
-                            # すでにオブジェクトの場合はそのまま追加（colorがなければ生成）
-                            if "color" not in tag:
-                                hash_val = sum(ord(c) for c in tag["label"]) % 360
-                                tag["color"] = f"hsl({hash_val}, 70%, 60%)"
-                            tags_data.append(tag)
-                else:
-                    # 単一の値の場合
-                    if isinstance(parsed_tags, str):
-                        hash_val = sum(ord(c) for c in parsed_tags) % 360
-                        tags_data.append({"color": f"hsl({hash_val}, 70%, 60%)", "label": parsed_tags})
-                    elif isinstance(parsed_tags, dict) and "label" in parsed_tags:
-                        if "color" not in parsed_tags:
-                            hash_val = sum(ord(c) for c in parsed_tags["label"]) % 360
-                            parsed_tags["color"] = f"hsl({hash_val}, 70%, 60%)"
-                        tags_data.append(parsed_tags)
-            except json.JSONDecodeError:
-                # JSONでない場合はカンマで分割してリスト化を試みる
-                for tag in [t.strip() for t in event.tags.split(',') if t.strip()]:
-                    hash_val = sum(ord(c) for c in tag) % 360
-                    tags_data.append({"color": f"hsl({hash_val}, 70%, 60%)", "label": tag})
-        elif isinstance(event.tags, list):
-            # リストの場合は各要素を適切に変換
-            for tag in event.tags:
-                if isinstance(tag, str):
-                    hash_val = sum(ord(c) for c in tag) % 360
-                    tags_data.append({"color": f"hsl({hash_val}, 70%, 60%)", "label": tag})
-                elif isinstance(tag, dict) and "label" in tag:
-                    if "color" not in tag:
-                        hash_val = sum(ord(c) for c in tag["label"]) % 360
-                        tag["color"] = f"hsl({hash_val}, 70%, 60%)"
-                    tags_data.append(tag)
-        # tagsに元のデータを保持（デバッグ用）
-        tags = tags_data
-
-        # 画像データをBase64エンコードされた文字列に変換
-        image_str = None
-        if hasattr(event, 'image') and event.image:
-            if isinstance(event.image, bytes):
-                image_str = base64.b64encode(event.image).decode('utf-8')
-            else:
-                # すでに文字列の場合はそのまま使用 (またはエラー処理)
-                image_str = event.image
-        else:
-            image_str = None
-
-        # required_qualifications を文字列からリストに変換
-        required_qualifications_list = []
-        if isinstance(event.required_qualifications, str) and event.required_qualifications:
-            # カンマ区切りの文字列をリストに変換
-            required_qualifications_list = [q.strip() for q in event.required_qualifications.split(',') if q.strip()]
-        elif isinstance(event.required_qualifications, list):
-            required_qualifications_list = [str(q) for q in event.required_qualifications]
-        elif event.required_qualifications is None:
-            required_qualifications_list = []
-
-        # データ型を適切に変換してEventSchemaオブジェクトを作成
-        event_data = EventSchema(
-            event_id=event.event_id,  # UUIDをそのまま使用
-            company_id=event.company_id,  # UUIDをそのまま使用
-            event_type=event.event_type,
-            title=event.title,
-            description=event.description,
-            start_date=event.start_date,
-            end_date=event.end_date,
-            location=event.location,
-            reward=event.reward,
-            required_qualifications=required_qualifications_list,  # リストとして渡す
-            available_spots=event.available_spots,
-            created_at=event.created_at,
-            updated_at=event.updated_at,
-            tags=tags,  # タグオブジェクトの配列をそのまま渡す
-            image=image_str # 修正：Base64エンコードされた画像文字列
+    # イベントが見つからない場合は空のリストを返す（空の結果もキャッシュする）
+    content = serialize_events(events, include_image)
+    if not include_image:
+        await response_cache.set(cache_key, content)
+    return JSONResponse(content=content)
+
+
+@app.post("/get-events-range")
+async def get_events_range(
+    date_range: DateRangeModel,
+    include_image: bool = False,
+    db_connector: DBConnector = Depends(get_db_connector)
+) -> List[EventSchema]:
+    """
+    期間指定イベント取得エンドポイント - [start_date, end_date) に開始するイベントを1回のクエリで取得します
+    カレンダーの月表示で日ごとに /get-events を呼び出さずに済むようにするためのものです
+    """
+    try:
+        events = await run_in_threadpool(
+            db_connector.select_events_between,
+            date_range.start_date, date_range.end_date, include_image=include_image
         )
-        event_list.append(event_data)
-    return event_list
+    except Exception as e:
+        logger.exception("データベースからイベントを取得中にエラーが発生しました", extra={"route": "/get-events-range"})
+        raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+    return JSONResponse(content=serialize_events(events, include_image))
 
 
 # APIルーターをアプリケーションに追加
@@ -1218,103 +2551,45 @@ async def join_event(applicant: FrontendApplicant, event_id_model: EventIdModel)
     # ここではサンプルの成功メッセージを返す
 
     # 申請者情報をログに出力（デバッグ用）
-    print(f"Applicant: {applicant.json()}")
-    print(f"Event ID: {event_id_model.event_id}")
+    log_payload("Received demo join-event", "/demo/join-event", {
+        "applicant": applicant.model_dump(mode="json"),
+        "event_id": event_id_model.event_id,
+    })
 
     return {"message": "Successfully joined the event"}
 
 @app.post("/join-event")
 async def join_event_api(
     request: JoinEventRequest,
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, str]:
     """
     イベント参加エンドポイント - 申請者が指定されたイベントに参加する処理を行います
+    Idempotency-Key ヘッダーを付けると、同じキーでの再送は登録済みの結果を返します（安全に再試行可能）。
+    ヘッダーがない場合も、同じメールアドレスで同じイベントへの再送は409になり、重複して登録されません。
     """
-    import traceback
-    print(f"DEBUG: Received request: {request}")
-    print(f"DEBUG: Request type: {type(request)}")
-    
-    try:
-        # フロントエンドのデータ構造をApplicantCreateに変換
-        frontend_applicant = request.applicant
-        print(f"DEBUG: Frontend applicant: {frontend_applicant}")
-        
-        # 名前を姓名に分割（簡単な実装）
-        name_parts = frontend_applicant.name.split(" ", 1)
-        last_name = name_parts[0] if len(name_parts) > 0 else ""
-        first_name = name_parts[1] if len(name_parts) > 1 else ""
-        
-        print(f"DEBUG: Split name - last: {last_name}, first: {first_name}")
-    except Exception as e:
-        print(f"DEBUG: Error in initial processing: {e}")
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Initial processing error: {str(e)}")
-    
-    # フロントエンドのデータ構造をApplicantCreateに変換
-    frontend_applicant = request.applicant
-    
-    # 名前を姓名に分割（簡単な実装）
-    name_parts = frontend_applicant.name.split(" ", 1)
-    last_name = name_parts[0] if len(name_parts) > 0 else ""
-    first_name = name_parts[1] if len(name_parts) > 1 else ""
-    
-    # ApplicantCreateオブジェクトを作成
-    applicant_data = ApplicantCreate(
-        last_name=last_name,
-        first_name=first_name,
-        mail_address=frontend_applicant.email,
-        phone_number=frontend_applicant.phone_num,
-        address=frontend_applicant.address,
-        birth_date=frontend_applicant.birthdate,
-        license=", ".join(frontend_applicant.qualifications) if frontend_applicant.qualifications else None
-    )
-    
-    # 応募者をデータベースに保存
+    log_payload("Received join-event request", "/join-event", request)
     try:
-        created_applicant = create_applicant(db=db, applicant_data=applicant_data)
-        print(f"Created applicant: {created_applicant}")
-    except HTTPException as e:
-        raise e
+        return await create_event_participation(db, request, idempotency_key)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error creating applicant: {e}")
+        logger.exception("Error joining event", extra={"route": "/join-event"})
         raise HTTPException(
             status_code=500,
-            detail=f"Error creating applicant: {str(e)}"
+            detail=f"Error joining event: {str(e)}"
         ) from e
 
-    # 応募を作成
-    application_data = ApplicationCreate(
-        event_id=uuid.UUID(request.event_id_model.event_id),
-        user_id=created_applicant.user_id,  # 作成した応募者のIDを使用
-        message=frontend_applicant.motivation or "参加申請"  # motivationがあればそれを使用、なければデフォルト
-    )
-    try:
-        created_application = create_application(db=db, application_data=application_data)
-        print(f"Created application: {created_application}")
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        print(f"Error creating application: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error creating application: {str(e)}"
-        ) from e
-    return {"message": "Successfully joined the event"}
-
 @app.post("/debug/error-report")
 async def debug_error_report(debug_data: DebugModel):
     """
     デバッグ用エラーレポートエンドポイント - エラーを受取り、ロギング処理を行います
     """
-    print(f"DEBUG: Received debug data: {debug_data}")
+    logger.info("Client error report", extra={"route": "/debug/error-report", "debug_data": debug_data.model_dump(mode="json")})
     return {"debug_data": debug_data.model_dump()}
 
 # スクリプトとして直接実行された場合、Uvicornサーバーを起動
+# SERVER_MODE=production の場合は複数ワーカー・自動リロードなしで起動する (src/server.py)
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=3000,
-        reload=True
-    )
\ No newline at end of file
+    uvicorn.run("main:app", **server_options())
\ No newline at end of file
@@ -0,0 +1,172 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Application as ApplicationModel, ApplicationStatusEnum, Event as EventModel
+
+# 募集枠を使用する（定員に数える）応募ステータス
+SPOT_HOLDING_STATUSES = (ApplicationStatusEnum.PENDING, ApplicationStatusEnum.APPROVED)
+
+
+class EventAdmission:
+    """
+    イベントの募集枠 (available_spots) を管理するクラス
+
+    events.remaining_spots を残り枠数のカウンターとして使い、
+    UPDATE ... WHERE remaining_spots > 0 RETURNING で1文で枠を確保するため、
+    同時に多数の応募があっても定員を超えることはない。
+    枠がない場合の応募はキャンセル待ち (WAITLISTED) とし、枠が空いたときに応募順に繰り上げる。
+    remaining_spots が NULL のイベント (募集人数が未設定) は定員なしとして扱う。
+    キャンセル待ちにする判断 (admit) と枠の返却 (release) はイベント行をロックして行うため、
+    返却と同時にキャンセル待ちになった応募が、空いた枠があるのにキャンセル待ちのまま残ることはない。
+
+    どのメソッドもコミットしないため、呼び出し側のトランザクション内で応募の作成・更新と一緒にコミットすること。
+    残り枠数が変わったイベントは changed_events に記録されるので、コミット後にレスポンスキャッシュを破棄すること。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # 残り枠数が変わったイベント (イベントID → 開始日時)
+        self.changed_events: Dict[uuid.UUID, datetime] = {}
+
+    async def reserve(self, event_id: uuid.UUID) -> bool:
+        """
+        募集枠を1つ確保するメソッド
+        :param event_id: イベントID
+        :return: 確保できた (または定員なしの) 場合はTrue、満員またはイベントが存在しない場合はFalse
+        """
+        result = await self.db.execute(
+            update(EventModel)
+            .where(
+                EventModel.event_id == event_id,
+                (EventModel.remaining_spots.is_(None)) | (EventModel.remaining_spots > 0)
+            )
+            .values(remaining_spots=EventModel.remaining_spots - 1)
+            .returning(EventModel.remaining_spots, EventModel.start_date)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            return False
+        if row.remaining_spots is not None:
+            self.changed_events[event_id] = row.start_date
+        return True
+
+    async def admit(self, event_id: uuid.UUID) -> ApplicationStatusEnum:
+        """
+        新しい応募のステータスを決めるメソッド（枠を確保できればPENDING、満員ならWAITLISTED）
+        :param event_id: イベントID
+        :return: 応募に設定するステータス
+        """
+        if await self.reserve(event_id):
+            return ApplicationStatusEnum.PENDING
+        # 満員の場合は、コミットまでイベント行をロックしてからキャンセル待ちにする
+        # （並行する release はこのトランザクションのコミットを待ち、このキャンセル待ちを繰り上げ対象に含める）
+        # ロックを待つ間に枠が返却された場合は、その枠を確保する
+        if await self._lock_event(event_id) and await self.reserve(event_id):
+            return ApplicationStatusEnum.PENDING
+        return ApplicationStatusEnum.WAITLISTED
+
+    async def release(
+        self,
+        event_id: uuid.UUID,
+        application_id: Optional[uuid.UUID] = None
+    ) -> Optional[uuid.UUID]:
+        """
+        募集枠を1つ返却するメソッド（枠を使っていた応募の否認・削除時に呼び出す）
+        キャンセル待ちの応募があれば最も古いものを繰り上げて枠を引き継ぎ、なければ残り枠数を戻す。
+        :param event_id: イベントID
+        :param application_id: 枠を返却する応募のID（キャンセル待ちに変更した場合に、その応募自身を繰り上げないようにする）
+        :return: 繰り上げた応募のID（繰り上げがない場合はNone）
+        """
+        # 並行して満員と判断された応募 (admit) のキャンセル待ちがコミットされるまで待つ
+        await self._lock_event(event_id)
+        promoted_id = await self._promote_next(event_id, exclude=application_id)
+        if promoted_id is None:
+            start_date = (await self.db.execute(
+                update(EventModel)
+                .where(EventModel.event_id == event_id, EventModel.remaining_spots.is_not(None))
+                .values(remaining_spots=EventModel.remaining_spots + 1)
+                .returning(EventModel.start_date)
+                .execution_options(synchronize_session=False)
+            )).scalar_one_or_none()
+            if start_date is not None:
+                self.changed_events[event_id] = start_date
+        return promoted_id
+
+    async def recalculate(self, event_id: uuid.UUID) -> None:
+        """
+        募集人数の変更後に残り枠数を再計算し、空いた枠の分だけキャンセル待ちを繰り上げるメソッド
+        （募集人数を減らして定員を超えた場合も、既存の応募は取り消さず残り枠数を0にする）
+        :param event_id: イベントID
+        """
+        # 変更後の募集人数を読み込み、並行する応募が終わるまでイベント行をロックする（変更はflush済みであること）
+        event = (await self.db.execute(
+            select(EventModel.available_spots, EventModel.start_date)
+            .where(EventModel.event_id == event_id)
+            .with_for_update()
+        )).first()
+        if event is None:
+            return
+        self.changed_events[event_id] = event.start_date
+
+        remaining = None
+        if event.available_spots is not None:
+            holding = (await self.db.execute(
+                select(func.count())
+                .select_from(ApplicationModel)
+                .where(
+                    ApplicationModel.event_id == event_id,
+                    ApplicationModel.status.in_(SPOT_HOLDING_STATUSES)
+                )
+            )).scalar_one()
+            remaining = max(event.available_spots - holding, 0)
+            while remaining > 0 and await self._promote_next(event_id) is not None:
+                remaining -= 1
+        await self.db.execute(
+            update(EventModel)
+            .where(EventModel.event_id == event_id)
+            .values(remaining_spots=remaining)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _lock_event(self, event_id: uuid.UUID) -> bool:
+        """イベント行をコミットまでロックする（イベントが存在しない場合はFalse）"""
+        return (await self.db.execute(
+            select(EventModel.event_id).where(EventModel.event_id == event_id).with_for_update()
+        )).first() is not None
+
+    async def _promote_next(
+        self,
+        event_id: uuid.UUID,
+        exclude: Optional[uuid.UUID] = None
+    ) -> Optional[uuid.UUID]:
+        """
+        最も古いキャンセル待ちの応募をPENDINGに繰り上げる（他のトランザクションが処理中の行は飛ばす）
+        :param exclude: 繰り上げない応募のID（このトランザクションでロック済みの行は SKIP LOCKED で飛ばされないため）
+        """
+        conditions = [
+            ApplicationModel.event_id == event_id,
+            ApplicationModel.status == ApplicationStatusEnum.WAITLISTED,
+        ]
+        if exclude is not None:
+            conditions.append(ApplicationModel.application_id != exclude)
+        application_id = (await self.db.execute(
+            select(ApplicationModel.application_id)
+            .where(*conditions)
+            .order_by(ApplicationModel.applied_at, ApplicationModel.application_id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )).scalar_one_or_none()
+        if application_id is None:
+            return None
+        await self.db.execute(
+            update(ApplicationModel)
+            .where(ApplicationModel.application_id == application_id)
+            .values(status=ApplicationStatusEnum.PENDING)
+            .execution_options(synchronize_session=False)
+        )
+        return application_id
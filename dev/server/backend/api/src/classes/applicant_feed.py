@@ -0,0 +1,456 @@
+import asyncio
+import os
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.classes.event_matching import (
+    RECOMMEND_DATE_SCALE_DAYS, RECOMMEND_REWARD_SCALE, RECOMMEND_WEIGHT_DATE, RECOMMEND_WEIGHT_OVERLAP,
+    RECOMMEND_WEIGHT_REWARD, qualification_tokens
+)
+from src.logger import get_logger
+from src.models import (
+    Applicant as ApplicantModel, ApplicantFeed as ApplicantFeedModel, ApplicantFeedOutbox as ApplicantFeedOutboxModel,
+    ApplicantFeedState as ApplicantFeedStateModel,
+    Application as ApplicationModel, Event as EventModel, EventQualification as EventQualificationModel,
+    EventTypeEnum, Player as PlayerModel, Review as ReviewModel
+)
+
+logger = get_logger("applicant_feed")
+
+# フィードの設定
+FEED_SIZE = int(os.getenv("FEED_SIZE", "100"))                  # 応募者ごとに保存するイベントの数
+FEED_CANDIDATES = int(os.getenv("FEED_CANDIDATES", "500"))      # 種類ごと (資格・応募した企業・資格不要) の候補の最大数
+FEED_REFRESH_BATCH_SIZE = int(os.getenv("FEED_REFRESH_BATCH_SIZE", "100"))
+FEED_REFRESH_INTERVAL_MS = int(os.getenv("FEED_REFRESH_INTERVAL_MS", "1000"))
+# 作り直しの対象がない間は、確認の間隔を FEED_REFRESH_MAX_INTERVAL_MS まで倍々に延ばす（notify() で元に戻す）
+FEED_REFRESH_MAX_INTERVAL_MS = int(os.getenv("FEED_REFRESH_MAX_INTERVAL_MS", "30000"))
+# 変更がなくても、この時間が経ったフィードは作り直す（開催日の近さが変わり、終わったイベントが残るため）
+FEED_MAX_AGE_HOURS = float(os.getenv("FEED_MAX_AGE_HOURS", "6"))
+# スコア = おすすめイベントのスコア (event_matching.py) + 企業との関係 × COMPANY + イベントの種類の好み × TYPE
+FEED_WEIGHT_COMPANY = float(os.getenv("FEED_WEIGHT_COMPANY", "0.2"))
+FEED_WEIGHT_TYPE = float(os.getenv("FEED_WEIGHT_TYPE", "0.1"))
+FEED_LEVEL_SCALE = int(os.getenv("FEED_LEVEL_SCALE", "10"))     # このレベル以上はインターンシップを最も優先する
+MAX_RATING = 5.0
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def mark_applicants_dirty(db: AsyncSession, user_ids: Iterable[uuid.UUID]) -> None:
+    """
+    応募者のフィードを作り直す対象にする（フィードがまだない応募者は、フィードを作成する対象に加える）
+    コミットしないため、呼び出し側のトランザクション内で応募者・応募の更新などと一緒にコミットすること。
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    marked = set((await db.execute(
+        update(ApplicantFeedStateModel)
+        .where(ApplicantFeedStateModel.user_id.in_(user_ids))
+        .values(dirty=True)
+        .returning(ApplicantFeedStateModel.user_id)
+        .execution_options(synchronize_session=False)
+    )).scalars())
+    for user_id in sorted(user_ids - marked):
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(ApplicantFeedStateModel).values(user_id=user_id, dirty=True))
+        except IntegrityError:
+            # 同時に作成された（または応募者が存在しない）
+            pass
+
+
+async def record_event_feed_changes(db: AsyncSession, event_ids: Iterable[uuid.UUID], tokens: Iterable[str]) -> None:
+    """
+    イベントの作成・更新・削除で順位が変わりうるフィードを applicant_feed_outbox に記録する
+    対象の応募者は多数になりうるため、リクエストでは1行追加するだけにし、FeedRefresher が作り直しの対象に展開する。
+    コミットしないため、呼び出し側のトランザクション内でイベントの更新などと一緒にコミットすること。
+    :param tokens: イベントの必要資格 (qualification_tokens で正規化したもの)
+    """
+    event_ids = sorted(set(event_ids))
+    tokens = sorted(set(tokens))
+    if not event_ids and not tokens:
+        return
+    await db.execute(insert(ApplicantFeedOutboxModel).values(event_ids=event_ids or None, qualifications=tokens or None))
+
+
+async def fan_out_event_feed_changes(db: AsyncSession, limit: int) -> int:
+    """
+    applicant_feed_outbox の記録を古い順に最大 limit 件まとめて作り直しの対象に展開し、削除してコミットする
+    複数のワーカーが同時に実行しても同じ記録を二重に展開しないよう、行ロックを取得できた記録のみ展開する。
+    :return: 展開した記録の数
+    """
+    outbox = ApplicantFeedOutboxModel
+    rows = (await db.execute(
+        select(outbox.outbox_id, outbox.event_ids, outbox.qualifications)
+        .order_by(outbox.outbox_id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        await db.commit()
+        return 0
+    await mark_event_feeds_dirty(
+        db,
+        {event_id for row in rows for event_id in row.event_ids or ()},
+        {token for row in rows for token in row.qualifications or ()}
+    )
+    await db.execute(
+        delete(outbox)
+        .where(outbox.outbox_id.in_([row.outbox_id for row in rows]))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return len(rows)
+
+
+async def mark_event_feeds_dirty(db: AsyncSession, event_ids: Iterable[uuid.UUID], tokens: Iterable[str]) -> None:
+    """
+    イベントの作成・更新・削除で順位が変わりうる応募者のフィードを、作り直す対象にする
+    (fan_out_event_feed_changes から呼び出す。リクエストの処理中は record_event_feed_changes で記録する)
+    対象は、イベントの必要資格のいずれかを持つ応募者と、フィードにそのイベントが含まれている応募者。
+    資格不要のイベントはすべての応募者が対象になるため印を付けず、FEED_MAX_AGE_HOURS ごとの作り直しで反映する。
+    :param tokens: イベントの必要資格 (qualification_tokens で正規化したもの)
+    """
+    event_ids = list(event_ids)
+    tokens = list(tokens)
+    conditions = []
+    if tokens:
+        conditions.append(ApplicantFeedStateModel.qualifications.overlap(tokens))
+    if event_ids:
+        conditions.append(ApplicantFeedStateModel.user_id.in_(
+            select(ApplicantFeedModel.user_id).where(ApplicantFeedModel.event_id.in_(event_ids))
+        ))
+    if not conditions:
+        return
+    await db.execute(
+        update(ApplicantFeedStateModel)
+        .where(~ApplicantFeedStateModel.dirty, or_(*conditions))
+        .values(dirty=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def load_signals(db: AsyncSession, user_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    """
+    フィードの順位付けに使う応募者の情報を取得する（応募者が存在しない場合はNone）
+    :return: tokens (資格), level, applied (応募済みのイベントID), companies (企業ID → 関係の強さ 0〜1),
+             type_share (イベントの種類 → 応募に占める割合)
+    """
+    applicant = await db.get(ApplicantModel, user_id)
+    if applicant is None:
+        return None
+    level = await db.scalar(select(PlayerModel.level).where(PlayerModel.user_id == user_id))
+
+    applications = (await db.execute(
+        select(ApplicationModel.event_id, EventModel.company_id, EventModel.event_type)
+        .join(EventModel, EventModel.event_id == ApplicationModel.event_id)
+        .where(ApplicationModel.user_id == user_id)
+    )).all()
+    # 応募したことのある企業は 0.5、レビューされた企業は平均評価 / 5 (高い方を使う)
+    companies: Dict[uuid.UUID, float] = {row.company_id: 0.5 for row in applications}
+    ratings = (await db.execute(
+        select(EventModel.company_id, func.avg(ReviewModel.rating))
+        .join(ApplicationModel, ApplicationModel.application_id == ReviewModel.application_id)
+        .join(EventModel, EventModel.event_id == ApplicationModel.event_id)
+        .where(ApplicationModel.user_id == user_id)
+        .group_by(EventModel.company_id)
+    )).all()
+    for company_id, rating in ratings:
+        companies[company_id] = max(companies.get(company_id, 0.0), min(float(rating) / MAX_RATING, 1.0))
+
+    type_counts = Counter(row.event_type for row in applications)
+    return {
+        "tokens": qualification_tokens(applicant.license),
+        "level": level or 1,
+        "applied": {row.event_id for row in applications},
+        "companies": companies,
+        "type_share": {event_type: count / len(applications) for event_type, count in type_counts.items()},
+    }
+
+
+async def load_candidates(db: AsyncSession, signals: Dict[str, Any], now: datetime) -> List[Dict[str, Any]]:
+    """
+    フィードの候補（開催前・未応募のイベント）を取得する
+    資格が一致するもの・応募したことのある企業のもの・資格不要のものを、それぞれ最大 FEED_CANDIDATES 件ずつ集める。
+    """
+    applied = signals["applied"]
+    matched: Dict[uuid.UUID, Tuple[int, int]] = {}
+    if signals["tokens"]:
+        eq = EventQualificationModel
+        rows = (await db.execute(
+            select(eq.event_id, func.count().label("matched"), eq.required_count)
+            .where(eq.qualification.in_(signals["tokens"]), eq.start_date >= now)
+            .group_by(eq.event_id, eq.required_count)
+            .order_by(func.count().desc(), func.min(eq.start_date))
+            .limit(FEED_CANDIDATES + len(applied))
+        )).all()
+        matched = {row.event_id: (row.matched, row.required_count) for row in rows}
+
+    upcoming = [EventModel.start_date >= now]
+    if applied:
+        upcoming.append(EventModel.event_id.not_in(applied))
+    event_ids = set(matched) - applied
+    if signals["companies"]:
+        event_ids.update((await db.execute(
+            select(EventModel.event_id)
+            .where(EventModel.company_id.in_(signals["companies"]), *upcoming)
+            .order_by(EventModel.start_date)
+            .limit(FEED_CANDIDATES)
+        )).scalars())
+    event_ids.update((await db.execute(
+        select(EventModel.event_id)
+        .where(EventModel.qualifications.is_(None), *upcoming)
+        .order_by(EventModel.start_date)
+        .limit(FEED_CANDIDATES)
+    )).scalars())
+    if not event_ids:
+        return []
+
+    rows = (await db.execute(
+        select(
+            EventModel.event_id, EventModel.company_id, EventModel.event_type,
+            EventModel.start_date, EventModel.reward_amount
+        ).where(EventModel.event_id.in_(event_ids))
+    )).all()
+    candidates = []
+    for row in rows:
+        count, required_count = matched.get(row.event_id, (0, 0))
+        candidates.append({
+            "event_id": row.event_id,
+            "company_id": row.company_id,
+            "event_type": row.event_type,
+            "start_date": row.start_date,
+            "reward_amount": row.reward_amount,
+            "overlap": count / max(required_count, 1),
+        })
+    return candidates
+
+
+def score_candidate(candidate: Dict[str, Any], signals: Dict[str, Any], now: datetime) -> float:
+    """
+    候補のスコアを計算する
+    資格の一致率・開催日の近さ・報酬 (build_recommendation_query と同じ) に、
+    企業との関係（応募・レビューの評価）と、イベントの種類の好み（応募の傾向とレベル）を加える。
+    レベルが低いうちは説明会、高くなるほどインターンシップを優先する。
+    """
+    days_until = max((candidate["start_date"] - now).total_seconds() / 86400, 0.0)
+    proximity = 1 / (1 + days_until / RECOMMEND_DATE_SCALE_DAYS)
+    reward = min((candidate["reward_amount"] or 0) / RECOMMEND_REWARD_SCALE, 1.0)
+    level_factor = min(signals["level"] / FEED_LEVEL_SCALE, 1.0)
+    level_preference = level_factor if candidate["event_type"] == EventTypeEnum.INTERNSHIP else 1 - level_factor
+    type_preference = (signals["type_share"].get(candidate["event_type"], 0.0) + level_preference) / 2
+    return (
+        RECOMMEND_WEIGHT_OVERLAP * candidate["overlap"]
+        + RECOMMEND_WEIGHT_DATE * proximity
+        + RECOMMEND_WEIGHT_REWARD * reward
+        + FEED_WEIGHT_COMPANY * signals["companies"].get(candidate["company_id"], 0.0)
+        + FEED_WEIGHT_TYPE * type_preference
+    )
+
+
+async def rank_feed(db: AsyncSession, user_id: uuid.UUID, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    応募者のフィード（スコアの高い順の上位 FEED_SIZE 件）を計算する（応募者が存在しない場合はNone）
+    :return: {"tokens": 応募者の資格, "items": (イベントID, スコア) のリスト}
+    """
+    now = now or _utc_now()
+    signals = await load_signals(db, user_id)
+    if signals is None:
+        return None
+    scored = [
+        (candidate["event_id"], score_candidate(candidate, signals, now), candidate["start_date"])
+        for candidate in await load_candidates(db, signals, now)
+    ]
+    scored.sort(key=lambda item: (-item[1], item[2], item[0]))
+    return {"tokens": signals["tokens"], "items": [(event_id, score) for event_id, score, _ in scored[:FEED_SIZE]]}
+
+
+async def refresh_feed(db: AsyncSession, user_id: uuid.UUID, now: Optional[datetime] = None) -> Optional[int]:
+    """
+    応募者のフィードを作り直し、コミットする
+    :return: フィードのイベント数（応募者が存在しない場合はNone）
+    """
+    now = now or _utc_now()
+    ranked = await rank_feed(db, user_id, now)
+    if ranked is None:
+        return None
+    await db.execute(
+        delete(ApplicantFeedModel)
+        .where(ApplicantFeedModel.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if ranked["items"]:
+        await db.execute(insert(ApplicantFeedModel), [
+            {"user_id": user_id, "position": position, "event_id": event_id, "score": score}
+            for position, (event_id, score) in enumerate(ranked["items"], start=1)
+        ])
+    state = {"qualifications": ranked["tokens"] or None, "refreshed_at": now}
+    result = await db.execute(
+        update(ApplicantFeedStateModel)
+        .where(ApplicantFeedStateModel.user_id == user_id)
+        .values(**state)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(ApplicantFeedStateModel).values(user_id=user_id, dirty=False, **state))
+    await db.commit()
+    return len(ranked["items"])
+
+
+async def claim_refresh_targets(db: AsyncSession, limit: int, now: Optional[datetime] = None) -> List[uuid.UUID]:
+    """
+    作り直すフィード（変更のあったもの、次に FEED_MAX_AGE_HOURS より古いもの）を最大 limit 件取得し、作り直し済みにしてコミットする
+    作り直しの間は行ロックを保持しないため、その間に変更があった場合は再び対象になる。
+    """
+    now = now or _utc_now()
+    state = ApplicantFeedStateModel
+    targets = list((await db.execute(
+        select(state.user_id)
+        .where(state.dirty)
+        .order_by(state.user_id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )).scalars())
+    if len(targets) < limit:
+        targets += (await db.execute(
+            select(state.user_id)
+            .where(~state.dirty, state.refreshed_at < now - timedelta(hours=FEED_MAX_AGE_HOURS))
+            .order_by(state.refreshed_at)
+            .limit(limit - len(targets))
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+    if targets:
+        await db.execute(
+            update(state)
+            .where(state.user_id.in_(targets))
+            .values(dirty=False, refreshed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    return targets
+
+
+class FeedRefresher:
+    """
+    applicant_feed_state で作り直しの対象になった応募者のフィードを、バックグラウンドで作り直すクラス
+
+    FEED_REFRESH_INTERVAL_MS ミリ秒ごと、または notify() で通知された時点で、最大 batch_size 人ずつ作り直す。
+    作り直しの前に、applicant_feed_outbox に記録されたイベントの変更を作り直しの対象に展開する。
+    対象がない間は確認の間隔を max_interval_ms まで延ばす（他のワーカーで記録された変更は、そのワーカーが通知を受けて処理する）。
+    mark() で渡した応募者（レベルが上がった応募者など、リクエストのトランザクション外で変わったもの）は、
+    次回の実行時に作り直しの対象にする。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = FEED_REFRESH_BATCH_SIZE,
+        interval_ms: int = FEED_REFRESH_INTERVAL_MS,
+        max_interval_ms: int = FEED_REFRESH_MAX_INTERVAL_MS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.max_interval = max(max_interval_ms, interval_ms) / 1000
+        self._marked: Set[uuid.UUID] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """作り直しの対象ができたことを通知する（コミット後に呼び出す）"""
+        self._wakeup.set()
+
+    def mark(self, user_ids: Iterable[uuid.UUID]) -> None:
+        """応募者を次回の実行時に作り直しの対象にする"""
+        self._marked.update(user_ids)
+        if self._marked:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def flush(self) -> int:
+        """作り直しの対象がなくなるまで作り直す"""
+        total = 0
+        while True:
+            count = await self.run_once()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    async def run_once(self) -> int:
+        """最大 batch_size 人のフィードを作り直す"""
+        while True:
+            async with self.session_factory() as db:
+                if await fan_out_event_feed_changes(db, self.batch_size) < self.batch_size:
+                    break
+        if self._marked:
+            marked, self._marked = self._marked, set()
+            async with self.session_factory() as db:
+                await mark_applicants_dirty(db, marked)
+                await db.commit()
+        async with self.session_factory() as db:
+            targets = await claim_refresh_targets(db, self.batch_size)
+        for user_id in targets:
+            async with self.session_factory() as db:
+                try:
+                    await refresh_feed(db, user_id)
+                except Exception as e:
+                    await db.rollback()
+                    logger.warning("フィードの作成に失敗しました", extra={"user_id": str(user_id), "error": str(e)})
+                    self._marked.add(user_id)
+        return len(targets)
+
+    async def _run(self) -> None:
+        interval = self.interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+                interval = self.interval
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                count = await self.flush()
+            except Exception as e:
+                logger.warning("フィードの作り直しに失敗しました（次回再試行します）", extra={"error": str(e)})
+                continue
+            interval = self.interval if count else min(interval * 2, self.max_interval)
+
+
+async def _rebuild() -> None:
+    from src.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(select(ApplicantModel.user_id))).scalars().all()
+        await mark_applicants_dirty(db, user_ids)
+        await db.commit()
+    count = await FeedRefresher(lambda: AsyncSessionLocal()).flush()
+    print(f"{count}人の応募者のフィードを作成しました。")
+
+
+if __name__ == "__main__":
+    # python -m src.classes.applicant_feed rebuild : すべての応募者のフィードを作り直す
+    if sys.argv[1:] != ["rebuild"]:
+        print("使い方: python -m src.classes.applicant_feed rebuild")
+        sys.exit(1)
+    asyncio.run(_rebuild())
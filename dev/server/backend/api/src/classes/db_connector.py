@@ -1,30 +1,49 @@
-from sqlalchemy import create_engine, inspect, select, Date
+from sqlalchemy import create_engine, inspect, select
 from sqlalchemy import MetaData, text
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, defer
 from sqlalchemy.ext.automap import automap_base
 
 # 型
-import uuid                     # UUID
-from datetime import datetime   # 日時
+import uuid                                         # UUID
+from datetime import date, datetime, time, timedelta  # 日時
 
 class DBConnector:
     """
     PostgreSQLデータベースにSQLAlchemyを用いて接続するためのクラス
+
+    engineを渡した場合はそのエンジン（コネクションプール）を共有し、
+    渡さない場合はdb_urlから新しくエンジンを作成する。
     """
-    def __init__(self, db_url: str, debug: bool = False):
-        self.db_url = db_url                                # PostgreSQLの接続文字列
-        
-        try:
-            self.engine = create_engine(
-                self.db_url,    # データベース接続URL
-                echo = debug,   # デバッグモードの設定：TrueならSQLの実行ログを出力
-                future = True,  # 非同期操作をサポートするための設定
-                connect_args={
-                    "connect_timeout": 10,  # 接続タイムアウトの設定（秒単位）
-                }
-            )
-        except Exception as e:
-            raise Exception(f"データベース接続に失敗しました: {str(e)}")
+    def __init__(
+        self,
+        db_url: str = None,
+        debug: bool = False,
+        engine: Engine = None,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_recycle: int = 1800,
+    ):
+        if engine is not None:
+            self.engine = engine                            # 共有エンジンを再利用
+            self.db_url = str(engine.url)
+        else:
+            self.db_url = db_url                            # PostgreSQLの接続文字列
+            try:
+                self.engine = create_engine(
+                    self.db_url,    # データベース接続URL
+                    echo = debug,   # デバッグモードの設定：TrueならSQLの実行ログを出力
+                    future = True,  # 非同期操作をサポートするための設定
+                    pool_size = pool_size,          # 常時保持する接続数
+                    max_overflow = max_overflow,    # 一時的に追加できる接続数
+                    pool_recycle = pool_recycle,    # 接続を再作成するまでの秒数
+                    pool_pre_ping = True,           # 切断済みの接続を使わないように事前に確認
+                    connect_args={
+                        "connect_timeout": 10,  # 接続タイムアウトの設定（秒単位）
+                    }
+                )
+            except Exception as e:
+                raise Exception(f"データベース接続に失敗しました: {str(e)}")
         
         self.metadata = MetaData()                          # メタデータオブジェクトの作成
         self.base = automap_base(metadata=self.metadata)    # 自動マッピングベースの作成
@@ -77,16 +96,43 @@ class DBConnector:
             session.commit()
             return new_record
 
-    def select_events_by_date(self, target_date: Date, table_name: str = "events"):
+    def select_events_by_date(self, target_date: date, table_name: str = "events", include_image: bool = False):
         """
         指定された日付のイベントを取得するメソッド
+        start_dateのインデックスが使えるように [target_date, target_date+1日) の範囲で検索する
         :param table_name: テーブル名
         :param target_date: 対象の日付
+        :param include_image: Trueの場合は画像バイナリも読み込む
         :return: イベントのリスト
         """
+        day_start = datetime.combine(target_date, time.min)
+        return self.select_events_between(
+            day_start, day_start + timedelta(days=1), table_name, include_image=include_image
+        )
+
+    def select_events_between(self, start: datetime, end: datetime, table_name: str = "events", include_image: bool = False):
+        """
+        指定された期間 [start, end) に開始するイベントを開始日時順に取得するメソッド
+        カレンダーの月表示などで、日ごとに検索せず1回のクエリで取得するために使用する
+        :param start: 期間の開始（この日時を含む）。dateの場合はその日の0時
+        :param end: 期間の終了（この日時を含まない）。dateの場合はその日の0時
+        :param table_name: テーブル名
+        :param include_image: Trueの場合は画像バイナリも読み込む（通常は画像URLを使うため読み込まない）
+        :return: イベントのリスト
+        """
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, time.min)
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, time.min)
         with Session(self.engine) as session:
             table = self.base.classes[table_name]
-            stmt = select(table).where(table.start_date.cast(Date) == target_date)
+            stmt = (
+                select(table)
+                .where(table.start_date >= start, table.start_date < end)
+                .order_by(table.start_date)
+            )
+            if not include_image and hasattr(table, "image"):
+                stmt = stmt.options(defer(table.image))
             result = session.execute(stmt)
             return result.scalars().all()
 
@@ -0,0 +1,126 @@
+import asyncio
+import sys
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Event as EventModel, EventCalendarDay as EventCalendarDayModel, EventTypeEnum
+
+CalendarKey = Tuple[date, EventTypeEnum]
+
+
+def calendar_changes(
+    added: Iterable[Tuple[Optional[datetime], Optional[EventTypeEnum]]] = (),
+    removed: Iterable[Tuple[Optional[datetime], Optional[EventTypeEnum]]] = ()
+) -> Counter:
+    """
+    イベントの作成・更新・削除による (日付, イベントの種類) ごとの件数の増減を作成する
+    :param added: 追加されたイベントの (開始日時, イベントの種類)
+    :param removed: 削除された（または更新前の）イベントの (開始日時, イベントの種類)
+    """
+    changes: Counter = Counter()
+    for start_date, event_type in added:
+        if start_date is not None and event_type is not None:
+            changes[(start_date.date(), event_type)] += 1
+    for start_date, event_type in removed:
+        if start_date is not None and event_type is not None:
+            changes[(start_date.date(), event_type)] -= 1
+    return changes
+
+
+async def apply_calendar_changes(db: AsyncSession, changes: Dict[CalendarKey, int]) -> None:
+    """
+    event_calendar_days の件数を増減する
+    コミットしないため、呼び出し側のトランザクション内でイベントの作成・更新・削除と一緒にコミットすること。
+    """
+    # 同時に更新するトランザクション間でデッドロックしないよう、常に同じ順に更新する
+    for key in sorted((key for key, delta in changes.items() if delta != 0), key=lambda key: (key[0], key[1].name)):
+        if await _add(db, key, changes[key]) or changes[key] < 0:
+            continue
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(EventCalendarDayModel).values(
+                    day=key[0], event_type=key[1], event_count=changes[key]
+                ))
+        except IntegrityError:
+            # 同時に作成された場合は、作成された行に加算する
+            await _add(db, key, changes[key])
+
+
+async def _add(db: AsyncSession, key: CalendarKey, delta: int) -> bool:
+    result = await db.execute(
+        update(EventCalendarDayModel)
+        .where(EventCalendarDayModel.day == key[0], EventCalendarDayModel.event_type == key[1])
+        .values(event_count=EventCalendarDayModel.event_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def parse_month(month: str) -> Tuple[date, date]:
+    """
+    YYYY-MM 形式の月から、その月の初日と翌月の初日を返す
+    :raises ValueError: 形式が正しくない場合
+    """
+    first = datetime.strptime(month, "%Y-%m").date()
+    following = date(first.year + 1, 1, 1) if first.month == 12 else date(first.year, first.month + 1, 1)
+    return first, following
+
+
+def build_month_query(first: date, following: date):
+    """月の (日付, イベントの種類, 件数) を日付順に返すSELECT文を作成する（イベントのない日は含まない）"""
+    day = EventCalendarDayModel
+    return (
+        select(day.day, day.event_type, day.event_count)
+        .where(day.day >= first, day.day < following, day.event_count > 0)
+        .order_by(day.day, day.event_type)
+    )
+
+
+def summarize_month(rows) -> List[Dict[str, Any]]:
+    """build_month_query の結果を、日ごとの {date, count, types} のリストにする"""
+    days: Dict[date, Dict[str, Any]] = {}
+    for row in rows:
+        summary = days.setdefault(row.day, {"date": row.day.isoformat(), "count": 0, "types": []})
+        summary["count"] += row.event_count
+        summary["types"].append(row.event_type.value)
+    return list(days.values())
+
+
+async def rebuild_calendar(db: AsyncSession) -> int:
+    """
+    event_calendar_days を events から作り直し、コミットする
+    :return: 作成した行数
+    """
+    rows = (await db.execute(
+        select(
+            cast(func.date_trunc("day", EventModel.start_date), Date).label("day"),
+            EventModel.event_type,
+            func.count().label("event_count"),
+        ).group_by("day", EventModel.event_type)
+    )).all()
+    await db.execute(delete(EventCalendarDayModel).execution_options(synchronize_session=False))
+    if rows:
+        await db.execute(insert(EventCalendarDayModel), [row._asdict() for row in rows])
+    await db.commit()
+    return len(rows)
+
+
+async def _rebuild() -> None:
+    from src.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        count = await rebuild_calendar(db)
+    print(f"event_calendar_days を作り直しました。({count}行)")
+
+
+if __name__ == "__main__":
+    # python -m src.classes.event_calendar rebuild : カレンダーの集計を events から作り直す
+    if sys.argv[1:] != ["rebuild"]:
+        print("使い方: python -m src.classes.event_calendar rebuild")
+        sys.exit(1)
+    asyncio.run(_rebuild())
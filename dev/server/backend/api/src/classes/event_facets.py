@@ -0,0 +1,154 @@
+import os
+import re
+import unicodedata
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import ColumnElement, and_, case, func, select
+
+from src.models import Event as EventModel, EventTypeEnum
+
+# 集計結果 (ファセット) に返す値の最大数（件数の多い順）
+FACET_LIMIT = int(os.getenv("FACET_LIMIT", "20"))
+
+PREFECTURES = (
+    "北海道", "青森県", "岩手県", "宮城県", "秋田県", "山形県", "福島県",
+    "茨城県", "栃木県", "群馬県", "埼玉県", "千葉県", "東京都", "神奈川県",
+    "新潟県", "富山県", "石川県", "福井県", "山梨県", "長野県", "岐阜県", "静岡県", "愛知県",
+    "三重県", "滋賀県", "京都府", "大阪府", "兵庫県", "奈良県", "和歌山県",
+    "鳥取県", "島根県", "岡山県", "広島県", "山口県",
+    "徳島県", "香川県", "愛媛県", "高知県",
+    "福岡県", "佐賀県", "長崎県", "熊本県", "大分県", "宮崎県", "鹿児島県", "沖縄県",
+)
+_PREFECTURE_PATTERN = re.compile("|".join(PREFECTURES))
+# 「5000円」「5,000円」「1万円」「1.5万円」「時給1200円」などの最初の金額
+_REWARD_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(万|千)?")
+_REWARD_UNITS = {"万": 10000, "千": 1000, None: 1}
+
+
+def parse_reward(value: Optional[str]) -> Optional[int]:
+    """報酬の文字列 (例: 5000円, 1万円) から金額（円）を求める（金額が書かれていない場合はNone）"""
+    if not value:
+        return None
+    text = unicodedata.normalize("NFKC", value).replace(",", "")
+    match = _REWARD_PATTERN.search(text)
+    if match is None:
+        return None
+    return int(float(match.group(1)) * _REWARD_UNITS[match.group(2)])
+
+
+def parse_prefecture(location: Optional[str]) -> Optional[str]:
+    """開催場所 (例: 東京都 大田区 〇〇工業) から都道府県を求める（含まれない場合はNone）"""
+    if not location:
+        return None
+    match = _PREFECTURE_PATTERN.search(location)
+    return match.group() if match else None
+
+
+def parse_qualifications(value: Any) -> List[str]:
+    """必要資格（カンマ区切りの文字列またはリスト）を、重複を除いたリストにする"""
+    if isinstance(value, str):
+        items = value.split(",")
+    elif isinstance(value, list):
+        items = [str(item) for item in value]
+    else:
+        return []
+    qualifications: List[str] = []
+    for item in items:
+        item = item.strip()
+        if item and item not in qualifications:
+            qualifications.append(item)
+    return qualifications
+
+
+def derive_facet_values(reward: Optional[str], location: Optional[str], required_qualifications: Any) -> Dict[str, Any]:
+    """
+    絞り込み用の列 (reward_amount, prefecture, qualifications) の値を作成する
+    イベントの作成・更新時と db_migration.py の migrate_events_facets で使う。
+    """
+    return {
+        "reward_amount": parse_reward(reward),
+        "prefecture": parse_prefecture(location),
+        "qualifications": parse_qualifications(required_qualifications) or None,
+    }
+
+
+def build_filter_conditions(
+    event_types: Optional[List[EventTypeEnum]] = None,
+    start_from: Optional[date] = None,
+    start_to: Optional[date] = None,
+    reward_min: Optional[int] = None,
+    reward_max: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    qualifications: Optional[List[str]] = None,
+    prefectures: Optional[List[str]] = None
+) -> Dict[str, ColumnElement]:
+    """
+    絞り込み条件を、ファセットの名前 → 条件 のdictで返す（指定されていない条件は含めない）
+    ファセットの件数は、そのファセット自身の条件を除いて集計するため、条件を分けて返す。
+    event_type・prefecture は いずれかに一致、tag・qualification は すべてを含む イベントに絞り込む。
+    """
+    conditions: Dict[str, ColumnElement] = {}
+    if event_types:
+        conditions["event_type"] = EventModel.event_type.in_(event_types)
+    date_conditions = []
+    if start_from is not None:
+        date_conditions.append(EventModel.start_date >= datetime.combine(start_from, time.min))
+    if start_to is not None:
+        date_conditions.append(EventModel.start_date < datetime.combine(start_to + timedelta(days=1), time.min))
+    if date_conditions:
+        conditions["start_date"] = and_(*date_conditions)
+    reward_conditions = []
+    if reward_min is not None:
+        reward_conditions.append(EventModel.reward_amount >= reward_min)
+    if reward_max is not None:
+        reward_conditions.append(EventModel.reward_amount <= reward_max)
+    if reward_conditions:
+        conditions["reward"] = and_(*reward_conditions)
+    if tags:
+        # tags @> '[{"label": ...}]' (GINインデックス idx_events_tags を使う)
+        conditions["tag"] = EventModel.tags.contains([{"label": tag} for tag in tags])
+    if qualifications:
+        conditions["qualification"] = EventModel.qualifications.contains(qualifications)
+    if prefectures:
+        conditions["prefecture"] = EventModel.prefecture.in_(prefectures)
+    return conditions
+
+
+def _where(conditions: Dict[str, ColumnElement], exclude: Optional[str] = None) -> List[ColumnElement]:
+    return [condition for name, condition in conditions.items() if name != exclude]
+
+
+def build_facet_queries(conditions: Dict[str, ColumnElement], limit: int = FACET_LIMIT):
+    """
+    ファセットの名前 → (値, 件数) を件数の多い順に返すSELECT文 のdictを返す
+    各ファセットは、そのファセット自身の条件を除いた条件で集計する（選択中の値以外の件数も分かるように）。
+    """
+    count = func.count().label("count")
+    # 配列以外の tags (正規化前の形式) があってもエラーにならないよう、配列の場合のみ展開する
+    tag = func.jsonb_array_elements(
+        case((func.jsonb_typeof(EventModel.tags) == "array", EventModel.tags))
+    ).column_valued("tag")
+    tag_label = tag.op("->>")("label")
+    qualification = func.unnest(EventModel.qualifications).column_valued("qualification")
+
+    queries = {
+        "event_type": select(EventModel.event_type.label("value"), count)
+            .where(*_where(conditions, "event_type"))
+            .group_by(EventModel.event_type),
+        "prefecture": select(EventModel.prefecture.label("value"), count)
+            .where(EventModel.prefecture.isnot(None), *_where(conditions, "prefecture"))
+            .group_by(EventModel.prefecture),
+        "tag": select(tag_label.label("value"), count)
+            .select_from(EventModel)  # jsonb_array_elements より先に events を置く (LATERAL で参照するため)
+            .where(tag_label.isnot(None), *_where(conditions, "tag"))
+            .group_by("value"),
+        "qualification": select(qualification.label("value"), count)
+            .select_from(EventModel)
+            .where(*_where(conditions, "qualification"))
+            .group_by("value"),
+    }
+    return {
+        name: query.order_by(count.desc(), "value").limit(limit)
+        for name, query in queries.items()
+    }
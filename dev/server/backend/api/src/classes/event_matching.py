@@ -0,0 +1,128 @@
+import os
+import unicodedata
+import uuid
+from datetime import datetime
+from typing import Any, Iterable, List
+
+from sqlalchemy import Float, Select, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.classes.event_facets import parse_qualifications
+from src.models import (
+    Application as ApplicationModel, Event as EventModel, EventQualification as EventQualificationModel
+)
+
+# おすすめイベントの設定
+RECOMMEND_MAX_QUALIFICATIONS = int(os.getenv("RECOMMEND_MAX_QUALIFICATIONS", "20"))  # 照合に使う応募者の資格の最大数
+# スコア = 一致率 × OVERLAP + 開催日の近さ × DATE + 報酬 × REWARD（それぞれ 0〜1 に正規化してから重み付けする）
+RECOMMEND_WEIGHT_OVERLAP = float(os.getenv("RECOMMEND_WEIGHT_OVERLAP", "0.6"))
+RECOMMEND_WEIGHT_DATE = float(os.getenv("RECOMMEND_WEIGHT_DATE", "0.25"))
+RECOMMEND_WEIGHT_REWARD = float(os.getenv("RECOMMEND_WEIGHT_REWARD", "0.15"))
+RECOMMEND_DATE_SCALE_DAYS = float(os.getenv("RECOMMEND_DATE_SCALE_DAYS", "14"))  # この日数後のイベントは開催日の近さが 0.5
+RECOMMEND_REWARD_SCALE = float(os.getenv("RECOMMEND_REWARD_SCALE", "10000"))      # この金額（円）以上の報酬は 1
+
+QUALIFICATION_MAX_LENGTH = 100
+
+
+def normalize_qualification(value: str) -> str:
+    """資格名を照合用に正規化する（全角英数字を半角に、英字を小文字にし、空白を除く）"""
+    text = unicodedata.normalize("NFKC", value).casefold()
+    return "".join(text.split())[:QUALIFICATION_MAX_LENGTH]
+
+
+def qualification_tokens(value: Any) -> List[str]:
+    """必要資格・保有資格（カンマ区切りの文字列またはリスト）を、正規化した資格名のリストにする（重複は除く）"""
+    tokens: List[str] = []
+    for qualification in parse_qualifications(value):
+        token = normalize_qualification(qualification)
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def _get(event: Any, key: str) -> Any:
+    return event[key] if isinstance(event, dict) else getattr(event, key)
+
+
+async def sync_event_qualifications(db: AsyncSession, events: Iterable[Any], replace: bool = True) -> int:
+    """
+    イベントの必要資格を event_qualifications に登録する
+    コミットしないため、呼び出し側のトランザクション内でイベントの登録・更新と一緒にコミットすること。
+    :param events: event_id・required_qualifications・start_date・reward_amount を持つ EventModel または dict
+    :param replace: 登録済みの資格を削除してから登録する（イベントの更新時）
+    :return: 登録した行数
+    """
+    events = list(events)
+    if not events:
+        return 0
+    if replace:
+        await db.execute(
+            delete(EventQualificationModel)
+            .where(EventQualificationModel.event_id.in_([_get(event, "event_id") for event in events]))
+            .execution_options(synchronize_session=False)
+        )
+    rows = []
+    for event in events:
+        tokens = qualification_tokens(_get(event, "required_qualifications"))
+        rows.extend(
+            {
+                "qualification": token,
+                "event_id": _get(event, "event_id"),
+                "start_date": _get(event, "start_date"),
+                "reward_amount": _get(event, "reward_amount"),
+                "required_count": len(tokens),
+            }
+            for token in tokens
+        )
+    if rows:
+        await db.execute(insert(EventQualificationModel), rows)
+    return len(rows)
+
+
+def build_recommendation_query(
+    tokens: List[str],
+    user_id: uuid.UUID,
+    columns,
+    now: datetime,
+    limit: int
+) -> Select:
+    """
+    応募者の資格 (tokens) に一致する、開催前のイベントをスコアの高い順に返すSELECT文を作成する
+    資格ごとの開催前のイベントを event_qualifications のインデックスだけで集計してスコアを計算し、
+    上位 limit 件のみ events から読み込む。応募済みのイベントは除く。
+    スコアは 一致率（一致した資格の数 / イベントの必要資格の数）・開催日の近さ・報酬 の重み付きの和。
+    :param tokens: qualification_tokens で正規化した応募者の資格
+    :param columns: 取得する列 (EVENT_COLUMNS)
+    :param now: この日時以降に開始するイベントを対象にする
+    """
+    eq = EventQualificationModel
+    matched = func.count()
+    overlap = cast(matched, Float) / func.greatest(eq.required_count, 1)
+    days_until = func.extract("epoch", eq.start_date - now) / 86400
+    proximity = 1 / (1 + days_until / RECOMMEND_DATE_SCALE_DAYS)
+    reward = func.least(cast(func.coalesce(eq.reward_amount, 0), Float) / RECOMMEND_REWARD_SCALE, 1)
+    score = (
+        RECOMMEND_WEIGHT_OVERLAP * overlap
+        + RECOMMEND_WEIGHT_DATE * proximity
+        + RECOMMEND_WEIGHT_REWARD * reward
+    ).label("score")
+
+    applied = select(ApplicationModel.event_id).where(ApplicationModel.user_id == user_id)
+    candidates = (
+        select(
+            eq.event_id,
+            func.array_agg(eq.qualification).label("matched_qualifications"),
+            score,
+        )
+        .where(eq.qualification.in_(tokens), eq.start_date >= now, eq.event_id.not_in(applied))
+        # event_id ごとに start_date 以降の列は同じ値（スコアの計算に使うため GROUP BY に含める）
+        .group_by(eq.event_id, eq.start_date, eq.reward_amount, eq.required_count)
+        .order_by(score.desc(), eq.start_date, eq.event_id)
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select(*columns, candidates.c.matched_qualifications, candidates.c.score)
+        .join(candidates, candidates.c.event_id == EventModel.event_id)
+        .order_by(candidates.c.score.desc(), EventModel.start_date, EventModel.event_id)
+    )
@@ -0,0 +1,108 @@
+import html
+import os
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select, and_, func, literal_column, or_, select
+
+from src.models import Event as EventModel
+
+# 検索の設定
+SEARCH_MAX_TERMS = int(os.getenv("SEARCH_MAX_TERMS", "8"))                # 検索語の最大数（それ以降は無視する）
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "2000"))  # ページングできる検索結果の最大数（一致度の高い順）
+SEARCH_SNIPPET_LENGTH = int(os.getenv("SEARCH_SNIPPET_LENGTH", "80"))    # ハイライトの前後を含めた最大文字数
+
+# db_migration.py の migrate_events_search で作成する生成列（モデルには定義しない）
+#   search_vector: title (A)・location / タグ (B)・description (C) の tsvector (GINインデックス)
+#   search_text:   title・description・location・タグを小文字にして連結した文字列 (pg_trgm の GINインデックス)
+SEARCH_VECTOR = literal_column("events.search_vector")
+SEARCH_TEXT = literal_column("events.search_text")
+
+# ハイライトの対象 (レスポンスのキー, 行の属性名)
+HIGHLIGHT_FIELDS = (("title", "title"), ("description", "description"), ("location", "location"))
+
+
+def parse_terms(q: str) -> List[str]:
+    """検索文字列を空白（全角スペースを含む）で区切り、小文字にした検索語のリストを返す（重複は除く）"""
+    terms: List[str] = []
+    for term in q.lower().split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:SEARCH_MAX_TERMS]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(terms: List[str], columns, limit: int, offset: int = 0) -> Select:
+    """
+    イベント検索のSELECT文を作成する
+    単語単位の全文検索 (search_vector @@ tsquery) と、すべての検索語を部分文字列として含む行 (pg_trgm で LIKE) の
+    どちらかに一致するイベントを、一致度の高い順に返す。
+    日本語は空白で区切られないため全文検索では単語に分かれず、「金属加工」「大田区」のような部分一致は pg_trgm で検索する
+    （3文字未満の検索語はトライグラムのインデックスを使えないため、他の検索語と組み合わせると速い）。
+    :param terms: parse_terms で作成した検索語
+    :param columns: 取得する列 (EVENT_COLUMNS)
+    """
+    tsquery = func.plainto_tsquery("simple", " ".join(terms))
+    contains_all = and_(*[SEARCH_TEXT.like(f"%{_escape_like(term)}%", escape="\\") for term in terms])
+
+    # 全文検索の一致度 + タイトルとの類似度（タイトルに含まれるイベントを上位にする）
+    score = (
+        func.ts_rank_cd(SEARCH_VECTOR, tsquery)
+        + func.word_similarity(" ".join(terms), func.lower(EventModel.title))
+    ).label("score")
+    # 一致するイベントを一致度順に並べ、上位 SEARCH_MAX_CANDIDATES 件だけを取り出してから詳細な列を取得する
+    # （一致度の計算は search_vector と title のみで行い、画像や説明などの列は返す件数分だけ読む）
+    candidates = (
+        select(EventModel.event_id, score)
+        .where(or_(SEARCH_VECTOR.op("@@")(tsquery), contains_all))
+        .order_by(score.desc(), EventModel.start_date, EventModel.event_id)
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery()
+    )
+    return (
+        select(*columns, candidates.c.score)
+        .join(candidates, candidates.c.event_id == EventModel.event_id)
+        .order_by(candidates.c.score.desc(), EventModel.start_date, EventModel.event_id)
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def highlight(text: Optional[str], terms: List[str], length: int = SEARCH_SNIPPET_LENGTH) -> Optional[str]:
+    """
+    検索語を <mark></mark> で囲んだ抜粋を返す（検索語を含まない場合はNone）
+    最初に一致した位置を中心に length 文字程度を切り出す。HTMLとして表示できるよう、それ以外の文字はエスケープする。
+    """
+    if not text or not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return None
+
+    start = max(first.start() - (length - (first.end() - first.start())) // 2, 0)
+    end = min(start + length, len(text))
+    start = max(end - length, 0)
+    snippet = text[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(snippet[position:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def highlight_event(row, terms: List[str]) -> Dict[str, str]:
+    """イベントのタイトル・説明・開催場所のうち、検索語を含むものの抜粋を返す"""
+    highlights = {}
+    for key, attr in HIGHLIGHT_FIELDS:
+        snippet = highlight(getattr(row, attr), terms)
+        if snippet is not None:
+            highlights[key] = snippet
+    return highlights
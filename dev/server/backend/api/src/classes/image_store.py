@@ -0,0 +1,157 @@
+import io
+import os
+import tempfile
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+
+class ImageDerivativeStore:
+    """
+    イベント画像の縮小版（派生画像）を作成し、ディスク上にキャッシュするクラス
+
+    派生画像は元画像のETag（SHA-256）とサイズ名をキーに保存するため、
+    同じ画像は何度アップロードされても一度だけ作成され、無効化も不要になる。
+    """
+    # サイズ名 → 長辺の最大ピクセル数
+    SIZES: Dict[str, int] = {
+        "thumb": 160,   # 一覧表示用のサムネイル
+        "detail": 640,  # 詳細画面用
+    }
+    FORMAT = "WEBP"
+    MEDIA_TYPE = "image/webp"
+
+    def __init__(self, base_dir: str, sizes: Optional[Dict[str, int]] = None, quality: int = 80):
+        """
+        :param base_dir: 派生画像を保存するディレクトリ
+        :param sizes: サイズ名と長辺のピクセル数の辞書（省略時はSIZES）
+        :param quality: WebPの品質 (0-100)
+        """
+        self.base_dir = base_dir
+        self.sizes = sizes or dict(self.SIZES)
+        self.quality = quality
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def path_for(self, etag: str, size: str) -> str:
+        """
+        派生画像の保存先パスを返すメソッド
+        :param etag: 元画像のETag
+        :param size: サイズ名
+        :return: ファイルパス
+        """
+        # ディレクトリあたりのファイル数を抑えるため、ETagの先頭2文字でディレクトリを分ける
+        return os.path.join(self.base_dir, etag[:2], f"{etag}_{size}.webp")
+
+    def get(self, etag: str, size: str) -> Optional[bytes]:
+        """
+        キャッシュ済みの派生画像を取得するメソッド
+        :param etag: 元画像のETag
+        :param size: サイズ名
+        :return: 派生画像のバイナリ（未作成の場合はNone）
+        """
+        try:
+            with open(self.path_for(etag, size), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def create(self, image: bytes, etag: str) -> Dict[str, bytes]:
+        """
+        すべてのサイズの派生画像を作成して保存するメソッド
+        :param image: 元画像のバイナリ
+        :param etag: 元画像のETag
+        :return: サイズ名と派生画像のバイナリの辞書
+        :raises PIL.UnidentifiedImageError: 画像として読み込めない場合
+        """
+        derivatives = self.render(image)
+        self.save(etag, derivatives)
+        return derivatives
+
+    def render(self, image: bytes) -> Dict[str, bytes]:
+        """
+        すべてのサイズの派生画像を作成するメソッド（ディスクには保存しない）
+        画像のアップロード時は、DBへのコミット前に render() で画像を検証し、コミット後に save() で保存する。
+        :param image: 元画像のバイナリ
+        :return: サイズ名と派生画像のバイナリの辞書
+        :raises PIL.UnidentifiedImageError: 画像として読み込めない場合
+        """
+        source = self._open(image)
+        return {size: self._encode(source, size) for size in self.sizes}
+
+    def save(self, etag: str, derivatives: Dict[str, bytes]) -> None:
+        """
+        render() で作成した派生画像を保存するメソッド（途中で失敗した場合は保存済みのファイルを削除する）
+        :param etag: 元画像のETag
+        :param derivatives: サイズ名と派生画像のバイナリの辞書
+        """
+        try:
+            for size, data in derivatives.items():
+                self._write(etag, size, data)
+        except Exception:
+            self.delete(etag)
+            raise
+
+    def delete(self, etag: str) -> None:
+        """
+        元画像のETagに対応するすべてのサイズの派生画像を削除するメソッド
+        :param etag: 元画像のETag
+        """
+        for size in self.sizes:
+            try:
+                os.remove(self.path_for(etag, size))
+            except FileNotFoundError:
+                pass
+
+    def get_or_create(self, image_loader, etag: str, size: str) -> bytes:
+        """
+        派生画像を取得し、未作成の場合は元画像から作成するメソッド
+        （アップロード時に作成されていない既存データや、別ホストで作成された場合に使用）
+        :param image_loader: 元画像のバイナリを返す関数（キャッシュにない場合のみ呼び出す）
+        :param etag: 元画像のETag
+        :param size: サイズ名
+        :return: 派生画像のバイナリ
+        """
+        cached = self.get(etag, size)
+        if cached is not None:
+            return cached
+        return self._save(self._open(image_loader()), etag, size)
+
+    def _open(self, image: bytes) -> Image.Image:
+        """画像を読み込み、EXIFの向きを反映する"""
+        source = Image.open(io.BytesIO(image))
+        source.load()
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in source.getbands() or "transparency" in source.info
+            source = source.convert("RGBA" if has_alpha else "RGB")
+        return source
+
+    def _save(self, source: Image.Image, etag: str, size: str) -> bytes:
+        """指定サイズに縮小してWebPで保存し、そのバイナリを返す"""
+        data = self._encode(source, size)
+        self._write(etag, size, data)
+        return data
+
+    def _encode(self, source: Image.Image, size: str) -> bytes:
+        """指定サイズに縮小してWebPに変換する"""
+        max_side = self.sizes[size]
+        resized = source.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)  # 縦横比を維持し、拡大はしない
+
+        buffer = io.BytesIO()
+        resized.save(buffer, self.FORMAT, quality=self.quality, method=4)
+        return buffer.getvalue()
+
+    def _write(self, etag: str, size: str, data: bytes) -> None:
+        # 書き込み途中のファイルを読まれないよう、一時ファイルに書いてから置き換える
+        path = self.path_for(etag, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,469 @@
+import random
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import (
+    LeaderboardSnapshot as LeaderboardSnapshotModel,
+    Player as PlayerModel,
+    XpEvent as XpEventModel,
+    XpSourceEnum,
+)
+
+# 全体のランキング（累計経験値）
+GLOBAL_BOARD = "global"
+# スナップショットの保存中に取得するアドバイザリロックのキー（同じランキングを共有するワーカーが同時に保存しないように）
+SNAPSHOT_LOCK_KEY = 0x4C454144  # "LEAD"
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def company_board(company_id: Any) -> str:
+    """企業ごとのランキング（その企業のイベントで獲得した経験値）のボード名"""
+    return f"company:{company_id}"
+
+
+def monthly_board(at: Optional[datetime] = None) -> str:
+    """月ごとのランキング（その月 (UTC) に獲得した経験値）のボード名 (例: monthly:2025-05)"""
+    at = at or _utc_now()
+    return f"monthly:{at.strftime('%Y-%m')}"
+
+
+class _SkipListNode:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.forward: List[Optional["_SkipListNode"]] = [None] * level
+        # forward[i] までに進む要素数（順位の計算に使う）
+        self.span: List[int] = [0] * level
+
+
+class IndexableSkipList:
+    """
+    順位で参照できるスキップリスト (Redis の sorted set と同じ構造)
+    追加・削除・順位の取得・n番目の要素の取得がすべて平均 O(log n) で行える。
+    キーは比較可能な値（昇順に並ぶ）とし、同じキーは1つまで。
+    """
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self.head = _SkipListNode(None, self.MAX_LEVEL)
+        self.level = 1
+        self.length = 0
+        self._random = random.Random()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def insert(self, key) -> None:
+        update: List[_SkipListNode] = [self.head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = rank[i + 1] if i + 1 < self.level else 0
+            while x.forward[i] is not None and x.forward[i].key < key:
+                rank[i] += x.span[i]
+                x = x.forward[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.span[i] = self.length
+            self.level = level
+
+        node = _SkipListNode(key, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+        self.length += 1
+
+    def remove(self, key) -> bool:
+        update: List[_SkipListNode] = [self.head] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                x = x.forward[i]
+            update[i] = x
+        x = x.forward[0]
+        if x is None or x.key != key:
+            return False
+
+        for i in range(self.level):
+            if update[i].forward[i] is x:
+                update[i].span[i] += x.span[i] - 1
+                update[i].forward[i] = x.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.length -= 1
+        return True
+
+    def rank(self, key) -> Optional[int]:
+        """キーの順位 (0始まり) を返す（存在しない場合はNone）"""
+        x = self.head
+        traversed = 0
+        for i in reversed(range(self.level)):
+            while x.forward[i] is not None and x.forward[i].key <= key:
+                traversed += x.span[i]
+                x = x.forward[i]
+            if x is not self.head and x.key == key:
+                return traversed - 1
+        return None
+
+    def iter_from(self, index: int) -> Iterator:
+        """index 番目 (0始まり) 以降のキーを順に返す"""
+        if index < 0 or index >= self.length:
+            return
+        x = self.head
+        traversed = 0
+        for i in reversed(range(self.level)):
+            while x.forward[i] is not None and traversed + x.span[i] <= index + 1:
+                traversed += x.span[i]
+                x = x.forward[i]
+            if traversed == index + 1:
+                break
+        while x is not None:
+            yield x.key
+            x = x.forward[0]
+
+
+class LeaderboardBackend:
+    """
+    Leaderboard の保存先のインターフェース
+    ボードごとに メンバー(ユーザーIDの文字列) → スコア を保持し、スコアの高い順に並べる。
+    """
+    # 全ワーカーで同じランキングを共有するか（False の場合はプロセスごとのランキング）
+    shared = False
+
+    async def add(self, board: str, member: str, delta: float) -> float:
+        """スコアを加算し、加算後のスコアを返す"""
+        raise NotImplementedError
+
+    async def set(self, board: str, member: str, score: float) -> None:
+        raise NotImplementedError
+
+    async def top(self, board: str, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        """スコアの高い順に offset 番目から limit 件の (メンバー, スコア) を返す"""
+        raise NotImplementedError
+
+    async def rank(self, board: str, member: str) -> Optional[Tuple[int, float]]:
+        """(順位 (0始まり), スコア) を返す（ボードにいない場合はNone）"""
+        raise NotImplementedError
+
+    async def size(self, board: str) -> int:
+        raise NotImplementedError
+
+    async def boards(self) -> List[str]:
+        raise NotImplementedError
+
+    async def members(self, board: str) -> List[Tuple[str, float]]:
+        """スナップショット用に、ボードの全メンバーをスコアの高い順に返す"""
+        return await self.top(board, await self.size(board))
+
+
+class InMemoryLeaderboardBackend(LeaderboardBackend):
+    """
+    プロセス内のスキップリストで保持するランキング
+    ワーカーごとに別のランキングになるため、複数ワーカーで起動する場合は RedisLeaderboardBackend を使う。
+    """
+
+    def __init__(self):
+        # ボード → (メンバー → スコア, (-スコア, メンバー) のスキップリスト)
+        self._boards: Dict[str, Tuple[Dict[str, float], IndexableSkipList]] = {}
+        self._lock = threading.Lock()
+
+    def _board(self, board: str) -> Tuple[Dict[str, float], IndexableSkipList]:
+        if board not in self._boards:
+            self._boards[board] = ({}, IndexableSkipList())
+        return self._boards[board]
+
+    def _set(self, board: str, member: str, score: float) -> None:
+        scores, ranking = self._board(board)
+        previous = scores.get(member)
+        if previous is not None:
+            ranking.remove((-previous, member))
+        scores[member] = score
+        ranking.insert((-score, member))
+
+    async def add(self, board: str, member: str, delta: float) -> float:
+        with self._lock:
+            score = self._board(board)[0].get(member, 0) + delta
+            self._set(board, member, score)
+            return score
+
+    async def set(self, board: str, member: str, score: float) -> None:
+        with self._lock:
+            self._set(board, member, score)
+
+    async def top(self, board: str, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            if board not in self._boards:
+                return []
+            result = []
+            for negative_score, member in self._boards[board][1].iter_from(offset):
+                if len(result) >= limit:
+                    break
+                result.append((member, -negative_score))
+            return result
+
+    async def rank(self, board: str, member: str) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            if board not in self._boards:
+                return None
+            scores, ranking = self._boards[board]
+            score = scores.get(member)
+            if score is None:
+                return None
+            return ranking.rank((-score, member)), score
+
+    async def size(self, board: str) -> int:
+        with self._lock:
+            return len(self._boards[board][0]) if board in self._boards else 0
+
+    async def boards(self) -> List[str]:
+        with self._lock:
+            return list(self._boards)
+
+
+class RedisLeaderboardBackend(LeaderboardBackend):
+    """
+    Redis の sorted set で保持するランキング。複数ワーカー・複数ホストで共有できる。
+    イベントループを塞がないよう redis.asyncio のクライアントを使う。
+    """
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "leaderboard:"):
+        """
+        :param url: Redisの接続URL (例: redis://localhost:6379/0)
+        :param prefix: このアプリのキーに付ける接頭辞
+        """
+        from redis import asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    async def add(self, board: str, member: str, delta: float) -> float:
+        return await self._client.zincrby(self.prefix + board, delta, member)
+
+    async def set(self, board: str, member: str, score: float) -> None:
+        await self._client.zadd(self.prefix + board, {member: score})
+
+    async def top(self, board: str, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        if limit <= 0:
+            return []
+        return await self._client.zrevrange(self.prefix + board, offset, offset + limit - 1, withscores=True)
+
+    async def rank(self, board: str, member: str) -> Optional[Tuple[int, float]]:
+        async with self._client.pipeline() as pipe:
+            pipe.zrevrank(self.prefix + board, member)
+            pipe.zscore(self.prefix + board, member)
+            rank, score = await pipe.execute()
+        return (rank, score) if rank is not None else None
+
+    async def size(self, board: str) -> int:
+        return await self._client.zcard(self.prefix + board)
+
+    async def boards(self) -> List[str]:
+        return [key[len(self.prefix):] async for key in self._client.scan_iter(match=self.prefix + "*")]
+
+
+class Leaderboard:
+    """
+    ランキング（全体・企業ごと・月ごと）を管理するクラス
+
+    経験値の付与時 (XpAggregator で player に反映した後) に record() でスコアを差分更新するため、
+    ランキングの取得時に player テーブル全体を並べ替えることはない。
+    起動時に load() で player と xp_events から復元する。
+    snapshot() で leaderboard_snapshot テーブルに保存できるが、復元には使わない
+    （プロセスごとのランキングは他のワーカーが反映した経験値を含まないため）。
+    """
+
+    def __init__(self, backend: LeaderboardBackend):
+        self.backend = backend
+        # reload() の実行中に record() した経験値 (作り直したランキングに反映するまで保持する)
+        self._pending: Optional[List[Tuple[Optional[int], tuple]]] = None
+
+    async def record(
+        self,
+        user_id: uuid.UUID,
+        experience: int,
+        xp: int,
+        company_id: Optional[uuid.UUID] = None,
+        at: Optional[datetime] = None,
+        xp_event_id: Optional[int] = None
+    ) -> None:
+        """
+        経験値の付与をランキングに反映する
+        :param user_id: ユーザーID
+        :param experience: 付与後の累計経験値（全体のランキングのスコア）
+        :param xp: 付与した経験値（企業ごと・月ごとのランキングに加算する）
+        :param company_id: 経験値を獲得したイベントの企業ID
+        :param at: 付与した日時（月ごとのランキングの判定に使う）
+        :param xp_event_id: 経験値の獲得履歴のID（reload() の実行中に、作り直したランキングへ二重に加算しないために使う）
+        """
+        args = (user_id, experience, xp, company_id, at)
+        if self._pending is not None:
+            self._pending.append((xp_event_id, args))
+        await self._record(self.backend, *args)
+
+    @staticmethod
+    async def _record(
+        backend: LeaderboardBackend,
+        user_id: uuid.UUID,
+        experience: int,
+        xp: int,
+        company_id: Optional[uuid.UUID],
+        at: Optional[datetime]
+    ) -> None:
+        member = str(user_id)
+        await backend.set(GLOBAL_BOARD, member, experience)
+        await backend.add(monthly_board(at), member, xp)
+        if company_id is not None:
+            await backend.add(company_board(company_id), member, xp)
+
+    async def top(self, board: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """上位のプレイヤーを返す（順位は1始まり）"""
+        return [
+            {"rank": offset + i + 1, "user_id": member, "score": int(score)}
+            for i, (member, score) in enumerate(await self.backend.top(board, limit, offset))
+        ]
+
+    async def rank(self, board: str, user_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """プレイヤーの順位を返す（ボードにいない場合はNone）"""
+        result = await self.backend.rank(board, str(user_id))
+        if result is None:
+            return None
+        rank, score = result
+        return {
+            "rank": rank + 1, "user_id": str(user_id), "score": int(score), "total": await self.backend.size(board)
+        }
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        起動時にランキングを復元する（既にデータがあるボード (Redisなど) は復元しない）
+        全体のランキングは player テーブルから、企業ごと・月ごとのランキングは player に反映済みの xp_events から作成する。
+        """
+        await self._load_into(self.backend, db)
+
+    async def reload(self, db: AsyncSession) -> None:
+        """
+        プロセス内のランキングを player と xp_events から作り直して置き換える
+        複数ワーカーで InMemoryLeaderboardBackend を使う場合に、他のワーカーが反映した経験値を取り込むために定期的に呼び出す。
+        作り直している間に record() した経験値は、読み取った時点のDBに含まれていなかったものだけを反映してから置き換える。
+        """
+        self._pending = []
+        try:
+            # すべてのクエリと、反映済みかの確認を同じスナップショットで読み取る
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            backend = InMemoryLeaderboardBackend()
+            await self._load_into(backend, db)
+
+            # 読み取りの途中に record() した経験値は、既にDBから読み取った可能性がある（確認中に record() したものも確認する）
+            loaded = set()
+            checked = 0
+            while checked < len(self._pending):
+                event_ids = [xp_event_id for xp_event_id, _ in self._pending[checked:] if xp_event_id is not None]
+                checked = len(self._pending)
+                if event_ids:
+                    loaded.update((await db.execute(
+                        select(XpEventModel.xp_event_id)
+                        .where(XpEventModel.xp_event_id.in_(event_ids), XpEventModel.applied_at.isnot(None))
+                    )).scalars())
+            # ここから置き換えまでは待機しない (InMemoryLeaderboardBackend) ため、record() が割り込むことはない
+            for xp_event_id, args in self._pending:
+                if xp_event_id not in loaded:
+                    await self._record(backend, *args)
+            self.backend = backend
+        finally:
+            self._pending = None
+            await db.rollback()
+
+    @staticmethod
+    async def _load_into(backend: LeaderboardBackend, db: AsyncSession) -> None:
+        if await backend.size(GLOBAL_BOARD) == 0:
+            result = await db.stream(select(PlayerModel.user_id, PlayerModel.experience))
+            async for user_id, experience in result:
+                await backend.set(GLOBAL_BOARD, str(user_id), experience)
+
+        applied = XpEventModel.applied_at.isnot(None)
+        company = (
+            select(XpEventModel.company_id, XpEventModel.user_id, func.sum(XpEventModel.amount))
+            .where(applied, XpEventModel.company_id.isnot(None))
+            .group_by(XpEventModel.company_id, XpEventModel.user_id)
+        )
+        await Leaderboard._fill_boards(backend, db, company, company_board)
+
+        # 移行した経験値 (MIGRATED) は xp_events 導入前の累計のため、月ごとのランキングには含めない
+        month = func.date_trunc("month", XpEventModel.created_at)
+        monthly = (
+            select(month, XpEventModel.user_id, func.sum(XpEventModel.amount))
+            .where(applied, XpEventModel.source != XpSourceEnum.MIGRATED)
+            .group_by(month, XpEventModel.user_id)
+        )
+        await Leaderboard._fill_boards(backend, db, monthly, monthly_board)
+
+    @staticmethod
+    async def _fill_boards(backend: LeaderboardBackend, db: AsyncSession, query, board_name) -> None:
+        """(ボードのキー, ユーザーID, スコア) を返すクエリの結果をボードに設定する（既にデータがあるボードは除く）"""
+        checked: Dict[str, bool] = {}
+        result = await db.stream(query)
+        async for key, user_id, score in result:
+            board = board_name(key)
+            if board not in checked:
+                checked[board] = await backend.size(board) == 0
+            if checked[board]:
+                await backend.set(board, str(user_id), int(score))
+
+    async def snapshot(self, db: AsyncSession) -> int:
+        """
+        全ボードを leaderboard_snapshot テーブルに保存する（ボードごとに最新の状態で置き換える）
+        Redis のランキングは全ワーカーで共有するため、他のワーカーが保存中の場合は保存しない。
+        :return: 保存した行数
+        """
+        # トランザクションの終了時に解放されるロック。同じ行の削除・追加が競合して主キー違反になるのを防ぐ
+        locked = (await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SNAPSHOT_LOCK_KEY})).scalar()
+        if not locked:
+            await db.rollback()
+            return 0
+
+        snapshot_at = _utc_now()
+        count = 0
+        for board in await self.backend.boards():
+            members = await self.backend.members(board)
+            await db.execute(delete(LeaderboardSnapshotModel).where(LeaderboardSnapshotModel.board == board))
+            if members:
+                await db.execute(insert(LeaderboardSnapshotModel), [
+                    {
+                        "board": board,
+                        "user_id": uuid.UUID(member),
+                        "score": int(score),
+                        "rank": rank + 1,
+                        "snapshot_at": snapshot_at,
+                    }
+                    for rank, (member, score) in enumerate(members)
+                ])
+            count += len(members)
+        await db.commit()
+        return count
@@ -0,0 +1,344 @@
+"""
+Prometheus形式のメトリクスを収集・出力するモジュール
+
+外部ライブラリを使わない簡易的な実装で、Counter / Gauge / Histogram をプロセス内で集計し、
+render() で Prometheus のテキスト形式 (version 0.0.4) に変換する。
+値はワーカープロセスごとに集計されるため、複数ワーカーで起動した場合は Prometheus 側で合算すること。
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# レイテンシ用のバケット (秒)。Prometheusクライアントのデフォルトと同じ
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# レスポンスサイズ用のバケット (バイト)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# /metrics のContent-Type (Prometheusのテキスト形式)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """メトリクスの基底クラス（ラベルの組み合わせごとに値を保持する）"""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """増加のみするカウンター"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """増減する値"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """値の分布（バケットごとの件数・合計・件数）を集計する"""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベル → (バケットごとの件数, 合計, 件数)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """メトリクスの一覧と、出力直前に値を更新するコールバックを管理するクラス"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """render() の直前に呼び出す関数を登録する（コネクションプールの状態などのGauge更新用）"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式に変換する"""
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- HTTP ---
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Total number of HTTP requests.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route")
+))
+# ルートはリクエストの処理後にしか分からないため、処理中の件数はメソッドごとに集計する
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "Number of HTTP requests in progress.", ("method",)
+))
+http_response_size_bytes = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size in bytes.", ("method", "route"), SIZE_BUCKETS
+))
+
+# --- DB ---
+db_pool_checkout_wait_seconds = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the pool.", ("pool",)
+))
+db_statement_duration_seconds = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time in seconds.", ("engine", "operation")
+))
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Connections in the pool by state.", ("pool", "state")
+))
+
+# どのルートにも一致しないリクエスト（404など）のラベル。パスをそのまま使うとラベルの種類が増え続けるため
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def resolve_route(scope, endpoint_paths: Dict[Callable, str]) -> str:
+    """
+    処理済みのリクエストのルートのテンプレート (/event/{event_id} など) を返す
+    ルーターが scope に設定した route (FastAPIのルート) を使い、ない場合は endpoint からテンプレートを引く。
+    :param endpoint_paths: エンドポイントの関数 → テンプレートのキャッシュ
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if endpoint not in endpoint_paths:
+        routes = getattr(getattr(scope.get("app"), "router", None), "routes", ())
+        endpoint_paths.update(
+            (route.endpoint, route.path) for route in routes if getattr(route, "endpoint", None) is not None
+        )
+    return endpoint_paths.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    ルートのテンプレートごとにリクエスト数・レイテンシ・処理中の件数・レスポンスサイズを記録するASGIミドルウェア
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._endpoint_paths: Dict[Callable, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        size = {"bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                size["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method=method)
+            # ルーティングの結果は scope に書き込まれるため、ルートの一覧を走査せずに済む
+            route = resolve_route(scope, self._endpoint_paths)
+            http_requests_total.inc(method=method, route=route, status=str(status["code"]))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            http_response_size_bytes.observe(size["bytes"], method=method, route=route)
+
+
+class _TimedPoolMixin:
+    """
+    コネクションプールから接続を取得するまでの待ち時間を記録する
+    waiting には接続の取得中（空き接続待ちを含む）の件数が入る。
+    """
+    metrics_name = "default"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def connect(self):
+        start = time.perf_counter()
+        with self._waiting_lock:
+            self.waiting += 1
+        try:
+            return super().connect()
+        finally:
+            with self._waiting_lock:
+                self.waiting -= 1
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start, pool=self.metrics_name)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """接続の取得待ち時間を記録する QueuePool (同期エンジン用)"""
+    metrics_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """接続の取得待ち時間を記録する AsyncAdaptedQueuePool (非同期エンジン用)"""
+    metrics_name = "async"
+
+
+def _statement_operation(statement: str) -> str:
+    """SQL文の種類 (SELECT / INSERT など) を返す。ラベルの種類を抑えるため文そのものは使わない"""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    エンジンにSQL文の実行時間の計測と、コネクションプールの状態の出力を追加する
+    :param engine: 同期エンジン (AsyncEngineの場合は sync_engine を渡す)
+    :param name: メトリクスのラベルに使う名前
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_metrics_start")
+        if starts:
+            db_statement_duration_seconds.observe(
+                time.perf_counter() - starts.pop(), engine=name, operation=_statement_operation(statement)
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # エラー時は after_cursor_execute が呼ばれないため、開始時刻を破棄する
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_metrics_start"):
+            conn.info["_metrics_start"].pop()
+
+    def _collect_pool_status():
+        # dispose() でプールが作り直されるため、毎回エンジンから取得する
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return
+        db_pool_connections.set(pool.checkedout(), pool=name, state="checked_out")
+        db_pool_connections.set(pool.checkedin(), pool=name, state="checked_in")
+        db_pool_connections.set(max(pool.overflow(), 0), pool=name, state="overflow")
+        db_pool_connections.set(getattr(pool, "waiting", 0), pool=name, state="waiting")
+
+    registry.add_collector(_collect_pool_status)
@@ -0,0 +1,135 @@
+import bisect
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Player as PlayerModel
+
+# 経験値テーブルの設定: レベル n に必要な累計経験値 = PLAYER_XP_BASE * (n - 1) ^ PLAYER_XP_EXPONENT
+PLAYER_MAX_LEVEL = int(os.getenv("PLAYER_MAX_LEVEL", "99"))
+PLAYER_XP_BASE = int(os.getenv("PLAYER_XP_BASE", "100"))
+PLAYER_XP_EXPONENT = float(os.getenv("PLAYER_XP_EXPONENT", "1.5"))
+
+# 獲得できる経験値
+XP_APPLICATION_APPROVED = int(os.getenv("XP_APPLICATION_APPROVED", "100"))      # 応募が承認された
+XP_PARTICIPATION_COMPLETED = int(os.getenv("XP_PARTICIPATION_COMPLETED", "300"))  # イベントへの参加を終えた
+XP_REVIEW_PER_RATING = int(os.getenv("XP_REVIEW_PER_RATING", "20"))              # 受けたレビューの評価1点あたり
+
+
+def build_level_table(
+    max_level: int = PLAYER_MAX_LEVEL,
+    base: int = PLAYER_XP_BASE,
+    exponent: float = PLAYER_XP_EXPONENT
+) -> List[int]:
+    """
+    経験値テーブルを作成する関数
+    :return: index が「レベル - 1」、値がそのレベルに必要な累計経験値のリスト（単調増加）
+    """
+    table = [0]
+    for level in range(2, max_level + 1):
+        table.append(max(round(base * (level - 1) ** exponent), table[-1] + 1))
+    return table
+
+
+# 起動時に一度だけ作成する経験値テーブル
+LEVEL_TABLE = build_level_table()
+
+
+def level_for_experience(experience: int) -> int:
+    """累計経験値からレベルを求める（経験値テーブルを二分探索する）"""
+    return max(bisect.bisect_right(LEVEL_TABLE, experience), 1)
+
+
+def level_progress(experience: int) -> Tuple[int, int, Optional[int]]:
+    """
+    累計経験値から (レベル, 現在のレベルに必要な累計経験値, 次のレベルに必要な累計経験値) を返す
+    最大レベルの場合、次のレベルに必要な累計経験値は None
+    """
+    level = level_for_experience(experience)
+    next_experience = LEVEL_TABLE[level] if level < len(LEVEL_TABLE) else None
+    return level, LEVEL_TABLE[level - 1], next_experience
+
+
+class PlayerProgression:
+    """
+    プレイヤー (player テーブル) の経験値とレベルを管理するクラス
+
+    経験値は UPDATE ... SET experience = experience + :xp RETURNING の1文で加算するため、
+    同じプレイヤーに同時に経験値を付与しても加算が失われることはない。
+    レベルは加算後の経験値から経験値テーブルで求め、現在より高い場合のみ上げる（下がることはない）。
+    プレイヤーの行がない場合は、最初の経験値の付与時に作成する。
+
+    経験値の付与は xp_events に記録し、XpAggregator (src/classes/xp_ledger.py) がまとめてこのクラスで反映する。
+    どのメソッドもコミットしないため、呼び出し側のトランザクション内でコミットすること。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # 経験値を付与したプレイヤー (ユーザーID → 付与後の状態)
+        self.awarded: Dict[uuid.UUID, Dict[str, Any]] = {}
+
+    async def award(self, user_id: uuid.UUID, xp: int) -> Optional[Dict[str, Any]]:
+        """
+        プレイヤーに経験値を付与するメソッド
+        :param user_id: ユーザーID (applicant.user_id)
+        :param xp: 付与する経験値
+        :return: 付与後の状態 (xp, experience, level, leveled_up)。応募者が存在しない場合はNone
+        """
+        row = await self._add_experience(user_id, xp)
+        if row is None:
+            row = await self._create(user_id, xp)
+        if row is None:
+            return None
+
+        experience, level = row
+        new_level = level_for_experience(experience)
+        if new_level > level:
+            # 同時に付与された場合も、高い方のレベルが残るようにする
+            await self.db.execute(
+                update(PlayerModel)
+                .where(PlayerModel.user_id == user_id, PlayerModel.level < new_level)
+                .values(level=new_level)
+                .execution_options(synchronize_session=False)
+            )
+        elif new_level < level and xp < 0:
+            # 経験値を減らした場合（レビューの評価の取り消しなど）は、rebuild_players と同じくレベルも下げる
+            # （経験値の更新で行ロックを取得済みのため、他の付与と競合しない）
+            await self.db.execute(
+                update(PlayerModel)
+                .where(PlayerModel.user_id == user_id)
+                .values(level=new_level)
+                .execution_options(synchronize_session=False)
+            )
+            level = new_level
+        result = {"xp": xp, "experience": experience, "level": max(level, new_level), "leveled_up": new_level > level}
+        self.awarded[user_id] = result
+        return result
+
+    async def _add_experience(self, user_id: uuid.UUID, xp: int) -> Optional[Tuple[int, int]]:
+        row = (await self.db.execute(
+            update(PlayerModel)
+            .where(PlayerModel.user_id == user_id)
+            .values(experience=PlayerModel.experience + xp, updated_at=func.now())
+            .returning(PlayerModel.experience, PlayerModel.level)
+            .execution_options(synchronize_session=False)
+        )).first()
+        return (row.experience, row.level) if row is not None else None
+
+    async def _create(self, user_id: uuid.UUID, xp: int) -> Optional[Tuple[int, int]]:
+        """プレイヤーの行を作成する（同時に作成された場合は、作成された行に加算する）"""
+        level = level_for_experience(xp)
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(
+                    insert(PlayerModel).values(
+                        user_id=user_id, level=level, experience=xp, skill_data={}, item_data=[]
+                    )
+                )
+        except IntegrityError:
+            # 他のトランザクションが先に作成した場合（応募者が存在しない場合はここでもNone）
+            return await self._add_experience(user_id, xp)
+        return xp, level
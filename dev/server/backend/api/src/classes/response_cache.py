@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger("response_cache")
+
+
+class CacheBackend:
+    """
+    ResponseCache の保存先のインターフェース
+    値はJSONに変換できるデータ (dict / list など) とする。
+    リクエストの処理中に呼び出すため、ネットワーク越しの保存先でもイベントループを塞がないよう非同期メソッドにする。
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def size(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    プロセス内のTTL付きLRUキャッシュ
+    ワーカーごとに別のキャッシュになるため、複数ワーカーで共有する場合は RedisCacheBackend を使う。
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: 保持する最大件数（超えた場合は最も古く使われたものから削除）
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis (または互換サーバー) を使うキャッシュ。複数ワーカー・複数ホストで共有できる。
+    イベントループを塞がないよう redis.asyncio のクライアントを使う。
+    """
+
+    def __init__(self, url: str, prefix: str = "api-cache:"):
+        """
+        :param url: Redisの接続URL (例: redis://localhost:6379/0)
+        :param prefix: このアプリのキーに付ける接頭辞
+        """
+        from redis import asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self._client.delete(*keys)
+
+    async def size(self) -> int:
+        return len([key async for key in self._client.scan_iter(match=self.prefix + "*")])
+
+
+class ResponseCache:
+    """
+    読み出しの多いエンドポイントのレスポンスをキャッシュするクラス
+    書き込み時 (イベントの作成・更新・削除) に該当するキーを削除して整合性を保つ。
+    保存先 (Redisなど) に接続できない場合もリクエストは失敗させず、キャッシュなしとして処理する。
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 30.0):
+        """
+        :param backend: 保存先（Noneの場合はキャッシュを無効にする）
+        :param ttl: キャッシュの有効期間（秒）
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """キャッシュされた値を返す（ない場合はNone）"""
+        if self.backend is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self._error("get", e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                self._error("set", e)
+
+    async def invalidate(self, *keys: str) -> None:
+        """指定したキーのキャッシュを削除する"""
+        if self.backend is not None and keys:
+            try:
+                await self.backend.delete(*keys)
+            except Exception as e:
+                # 削除できなかったキーは、TTLが切れるまで古い値が返される
+                self._error("invalidate", e)
+                return
+            self.invalidations += len(keys)
+
+    async def clear(self) -> None:
+        if self.backend is not None:
+            await self.backend.clear()
+
+    def _error(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("レスポンスキャッシュの操作に失敗しました", extra={"operation": operation, "error": str(error)})
+
+    async def stats(self) -> Dict[str, Any]:
+        """ヒット数・ミス数などの統計情報を返す"""
+        lookups = self.hits + self.misses
+        entries = 0
+        if self.backend is not None:
+            try:
+                entries = await self.backend.size()
+            except Exception as e:
+                self._error("size", e)
+                entries = None
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "ttl": self.ttl,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
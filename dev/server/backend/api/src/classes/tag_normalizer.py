@@ -0,0 +1,69 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# ラベル→色のメモの最大件数（タグの種類は限られるため小さめで十分）
+TAG_COLOR_CACHE_SIZE = int(os.getenv("TAG_COLOR_CACHE_SIZE", "1024"))
+
+
+@lru_cache(maxsize=TAG_COLOR_CACHE_SIZE)
+def tag_color(label: str) -> str:
+    """
+    タグのラベルから表示色 (HSL) を決める関数
+    同じラベルは常に同じ色になる。結果はラベルごとにメモしておく。
+    :param label: タグのラベル
+    :return: "hsl(<hue>, 70%, 60%)" 形式の文字列
+    """
+    hue = sum(ord(c) for c in label) % 360
+    return f"hsl({hue}, 70%, 60%)"
+
+
+def _normalize_tag(tag: Any) -> Optional[Dict[str, str]]:
+    """タグ1件を {"label", "color"} の形に揃える（変換できない場合はNone）"""
+    if isinstance(tag, str):
+        label = tag.strip()
+        return {"label": label, "color": tag_color(label)} if label else None
+    if isinstance(tag, dict) and tag.get("label"):
+        label = str(tag["label"])
+        return {"label": label, "color": tag.get("color") or tag_color(label)}
+    # pydanticモデル (TagData) の場合
+    label = getattr(tag, "label", None)
+    if label:
+        return {"label": label, "color": getattr(tag, "color", None) or tag_color(label)}
+    return None
+
+
+def normalize_tags(tags: Any) -> Optional[List[Dict[str, str]]]:
+    """
+    さまざまな形式のタグを正規形 [{"label": ..., "color": ...}] に変換する関数
+    イベントの作成・更新時に一度だけ呼び出し、DBには正規形で保存する。
+    （正規形で保存されていない既存データの読み出し時にも使用する）
+
+    受け付ける形式:
+    - JSON文字列（リスト・単一の文字列・単一のオブジェクト）
+    - カンマ区切りの文字列
+    - 文字列・dict・TagDataのリスト、または単一のdict
+
+    :param tags: タグデータ
+    :return: 正規形のタグのリスト（tagsがNoneまたは空の場合はNone）
+    """
+    if tags is None or tags == "" or tags == []:
+        return None
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except json.JSONDecodeError:
+            # JSONでない場合はカンマ区切りとして扱う
+            tags = tags.split(",")
+    if not isinstance(tags, list):
+        tags = [tags]
+    normalized = [_normalize_tag(tag) for tag in tags]
+    return [tag for tag in normalized if tag is not None]
+
+
+def is_normalized(tags: Any) -> bool:
+    """タグが既に正規形で保存されているかを判定する関数（読み出し時の高速パス用）"""
+    return isinstance(tags, list) and all(
+        isinstance(tag, dict) and "label" in tag and "color" in tag for tag in tags
+    )
@@ -0,0 +1,255 @@
+import asyncio
+import os
+import sys
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.classes.progression import PlayerProgression, level_for_experience
+from src.logger import get_logger
+from src.models import Player as PlayerModel, XpEvent as XpEventModel, XpSourceEnum
+
+logger = get_logger("xp_ledger")
+
+# 集計の設定: 未集計の履歴が XP_AGGREGATE_BATCH_SIZE 件たまるか、XP_AGGREGATE_INTERVAL_MS ミリ秒ごとに player へ反映する
+XP_AGGREGATE_BATCH_SIZE = int(os.getenv("XP_AGGREGATE_BATCH_SIZE", "500"))
+XP_AGGREGATE_INTERVAL_MS = int(os.getenv("XP_AGGREGATE_INTERVAL_MS", "500"))
+
+
+class XpLedger:
+    """
+    経験値の獲得履歴 (xp_events) に記録するクラス
+
+    リクエストの処理中は履歴を1行追加するだけで、player の経験値・レベルは XpAggregator がまとめて更新する。
+    同じ (ユーザー, 獲得理由, 獲得理由のID) の経験値は一度だけ記録する（再承認などで二重に付与しない）。
+    コミットしないため、呼び出し側のトランザクション内で応募の更新などと一緒にコミットすること。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # 記録した件数 (コミット後に XpAggregator.notify に渡す)
+        self.recorded = 0
+
+    async def record(
+        self,
+        user_id: uuid.UUID,
+        source: XpSourceEnum,
+        amount: int,
+        source_id: Optional[uuid.UUID] = None,
+        company_id: Optional[uuid.UUID] = None
+    ) -> bool:
+        """
+        経験値の獲得を記録するメソッド
+        :param user_id: ユーザーID (applicant.user_id)
+        :param source: 獲得理由
+        :param amount: 経験値
+        :param source_id: 獲得理由のID（応募ID・参加者ID・レビューIDなど）
+        :param company_id: 経験値を獲得したイベントの企業ID
+        :return: 記録した場合はTrue（記録済みの場合はFalse）
+        """
+        if amount <= 0:
+            return False
+        return await self._insert(user_id, source, amount, source_id, company_id)
+
+    async def adjust(
+        self,
+        user_id: uuid.UUID,
+        source: XpSourceEnum,
+        amount: int,
+        source_id: uuid.UUID,
+        company_id: Optional[uuid.UUID] = None
+    ) -> bool:
+        """
+        付与済みの経験値を補正するメソッド（レビューの評価の変更・削除など。減らす場合は負の値）
+        同じ source_id の補正は一度だけ記録するため、補正ごとに異なる source_id を渡すこと。
+        :return: 記録した場合はTrue（記録済みの場合はFalse）
+        """
+        if amount == 0:
+            return False
+        return await self._insert(user_id, source, amount, source_id, company_id)
+
+    async def _insert(
+        self,
+        user_id: uuid.UUID,
+        source: XpSourceEnum,
+        amount: int,
+        source_id: Optional[uuid.UUID],
+        company_id: Optional[uuid.UUID]
+    ) -> bool:
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(
+                    insert(XpEventModel).values(
+                        user_id=user_id, source=source, source_id=source_id, company_id=company_id, amount=amount
+                    )
+                )
+        except IntegrityError:
+            # 記録済み（または応募者が存在しない）
+            return False
+        self.recorded += 1
+        return True
+
+
+async def apply_pending(db: AsyncSession, limit: int) -> Dict[str, Any]:
+    """
+    未集計の履歴を古い順に limit 件まで player に反映し、コミットする
+    複数のワーカーが同時に実行しても同じ履歴を二重に集計しないよう、行ロックを取得できた履歴のみ集計する。
+    :return: {"events": 反映した履歴, "players": ユーザーID → 反映後の状態 (PlayerProgression.award の戻り値)}
+    """
+    events = (await db.execute(
+        select(XpEventModel)
+        .where(XpEventModel.applied_at.is_(None))
+        .order_by(XpEventModel.xp_event_id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )).scalars().all()
+    if not events:
+        return {"events": [], "players": {}}
+
+    totals: Dict[uuid.UUID, int] = defaultdict(int)
+    for event in events:
+        totals[event.user_id] += event.amount
+
+    progression = PlayerProgression(db)
+    # ワーカー間でデッドロックしないよう、プレイヤーは常に同じ順に更新する
+    for user_id in sorted(totals):
+        await progression.award(user_id, totals[user_id])
+    await db.execute(
+        update(XpEventModel)
+        .where(XpEventModel.xp_event_id.in_([event.xp_event_id for event in events]))
+        .values(applied_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return {"events": events, "players": progression.awarded}
+
+
+async def rebuild_players(db: AsyncSession) -> int:
+    """
+    player の経験値・レベルを xp_events の合計から再計算し、コミットする（すべての履歴を集計済みにする）
+    同じ履歴からは常に同じ結果になる。
+    :return: 経験値を持つプレイヤーの数
+    """
+    await db.execute(
+        update(XpEventModel)
+        .where(XpEventModel.applied_at.is_(None))
+        .values(applied_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    totals = (await db.execute(
+        select(XpEventModel.user_id, func.sum(XpEventModel.amount)).group_by(XpEventModel.user_id)
+    )).all()
+
+    await db.execute(
+        update(PlayerModel).values(experience=0, level=1).execution_options(synchronize_session=False)
+    )
+    for user_id, experience in totals:
+        experience = int(experience)
+        values = {"experience": experience, "level": level_for_experience(experience)}
+        result = await db.execute(
+            update(PlayerModel)
+            .where(PlayerModel.user_id == user_id)
+            .values(**values, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(PlayerModel).values(user_id=user_id, skill_data={}, item_data=[], **values))
+    await db.commit()
+    return len(totals)
+
+
+class XpAggregator:
+    """
+    xp_events の未集計の履歴を、バックグラウンドでまとめて player に反映するクラス
+
+    XP_AGGREGATE_INTERVAL_MS ミリ秒ごと、または notify() で通知された件数が XP_AGGREGATE_BATCH_SIZE に達した時点で、
+    最大 XP_AGGREGATE_BATCH_SIZE 件ずつ apply_pending を実行する。
+    on_applied には反映結果 (apply_pending の戻り値) が渡される（ランキングの更新用）。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = XP_AGGREGATE_BATCH_SIZE,
+        interval_ms: int = XP_AGGREGATE_INTERVAL_MS,
+        on_applied: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.on_applied = on_applied
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self, count: int = 1) -> None:
+        """履歴を記録したことを通知する（コミット後に呼び出す）"""
+        self._pending += count
+        if self._pending >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """集計のタスクを止め、残っている履歴を反映する"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """未集計の履歴がなくなるまで反映する"""
+        total = 0
+        while True:
+            count = await self.run_once()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    async def run_once(self) -> int:
+        """最大 batch_size 件を反映する"""
+        async with self.session_factory() as db:
+            applied = await apply_pending(db, self.batch_size)
+        if applied["events"] and self.on_applied is not None:
+            await self.on_applied(applied)
+        return len(applied["events"])
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._pending = 0
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("経験値の集計に失敗しました（次回再試行します）", extra={"error": str(e)})
+
+
+async def _rebuild() -> None:
+    from src.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        count = await rebuild_players(db)
+    print(f"{count}人のプレイヤーの経験値を xp_events から再計算しました。")
+
+
+if __name__ == "__main__":
+    # python -m src.classes.xp_ledger rebuild : player の経験値を xp_events から再計算する
+    # （実行中のAPIサーバーのランキングには反映されないため、実行後に再起動する）
+    if sys.argv[1:] != ["rebuild"]:
+        print("使い方: python -m src.classes.xp_ledger rebuild")
+        sys.exit(1)
+    asyncio.run(_rebuild())
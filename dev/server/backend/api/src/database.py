@@ -1,9 +1,17 @@
+import asyncio
 import os
-from sqlalchemy import create_engine
+import threading
+from typing import Any, Dict
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from src.classes.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+from src.logger import get_logger
+
 # .envファイルから環境変数を読み込む (存在する場合)
 load_dotenv()
 
@@ -21,14 +29,69 @@ else:
     # SQLAlchemyのDB URL
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-print(f"Connecting to database: {DATABASE_URL}")
+logger = get_logger("database")
+# パスワードはログに出力しない
+logger.info("Connecting to database", extra={"url": make_url(DATABASE_URL).render_as_string(hide_password=True)})
+
+# コネクションプールの設定 (環境変数で調整可能)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))              # 常時保持する接続数
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))       # pool_sizeを超えて一時的に作成できる接続数
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))     # 接続を再作成するまでの秒数
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))       # 空き接続を待つ最大秒数
+# 同期エンジンのプール (未指定の場合は DB_POOL_SIZE / DB_MAX_OVERFLOW と同じ。DB_MAX_CONNECTIONS 指定時は src/server.py で設定する)
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE") or DB_POOL_SIZE)
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW") or DB_MAX_OVERFLOW)
 
-# データベースエンジンの作成
-engine = create_engine(DATABASE_URL)
+# データベースエンジンの作成 (プロセス全体で1つだけ作成し、全リクエストで共有する)
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_SYNC_POOL_SIZE,
+    max_overflow=DB_SYNC_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,  # 切断済みの接続を使わないように事前に確認
+    poolclass=TimedQueuePool,  # 接続の取得待ち時間を /metrics に出力する
+)
+# SQL文の実行時間とプールの状態を /metrics に出力する
+instrument_engine(engine, "sync")
 
 # セッションの作成
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期モードの切り替え
+# APIサーバーは asyncpg + AsyncSession を使用し、db_migration.py などのスクリプトは同期エンジンを使用する
+# DB_ASYNC=false の場合は非同期エンジンを作成しない (asyncpgが不要になる)
+DB_ASYNC = os.getenv("DB_ASYNC", "true").lower() in ("1", "true", "yes")
+
+# 非同期用のDB URL (未指定の場合はDATABASE_URLのドライバをasyncpgに置き換える)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(
+    drivername="postgresql+asyncpg"
+).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    # 非同期データベースエンジンの作成
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        poolclass=TimedAsyncAdaptedQueuePool,
+    )
+    # イベントは同期エンジン側に登録する
+    instrument_engine(async_engine.sync_engine, "async")
+    # 非同期セッションの作成
+    # commit後に属性へアクセスしても遅延ロード (I/O) が発生しないよう expire_on_commit=False にする
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 # ベースクラスの作成
 Base = declarative_base()
 
@@ -40,13 +103,90 @@ def get_db():
     finally:
         db.close()
 
+# 依存性注入用の関数 (非同期)
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("非同期DBが無効です。DB_ASYNC=true を設定してください。")
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # エンジンを取得する関数（外部から呼び出し可能）
 def get_engine():
     return engine
 
+# /readyz の設定
+READINESS_DB_TIMEOUT = float(os.getenv("READINESS_DB_TIMEOUT", "2"))  # SELECT 1 の最大待ち秒数
+READINESS_MAX_WAITING = int(os.getenv("READINESS_MAX_WAITING", "0"))  # 全接続が使用中のときに許容する接続待ちの件数
+
+def get_pool_status() -> Dict[str, Any]:
+    """
+    APIサーバーが使うエンジン（DB_ASYNC=true の場合は非同期エンジン）のコネクションプールの状態を返す
+    """
+    pool = (async_engine if async_engine is not None else engine).pool
+    return {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW if async_engine is not None else DB_SYNC_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "waiting": getattr(pool, "waiting", 0),
+    }
+
+def is_pool_saturated(status: Dict[str, Any]) -> bool:
+    """全ての接続が使用中で、READINESS_MAX_WAITING を超える件数が接続を待っているか"""
+    return (
+        status["checked_out"] >= status["size"] + status["max_overflow"]
+        and status["waiting"] > READINESS_MAX_WAITING
+    )
+
+async def check_database(timeout: float = READINESS_DB_TIMEOUT) -> None:
+    """
+    SELECT 1 を実行してDBに接続できるか確認する
+    接続の取得も含めて timeout 秒を超えた場合は asyncio.TimeoutError、接続できない場合はDBのエラーを送出する
+    """
+    async def ping():
+        if async_engine is not None:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            def sync_ping():
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            await asyncio.to_thread(sync_ping)
+
+    await asyncio.wait_for(ping(), timeout)
+
+# 共有DBConnector (スキーマのリフレクションはプロセスごとに一度だけ行う)
+_db_connector = None
+_db_connector_lock = threading.Lock()
+
+def init_db_connector():
+    """
+    共有エンジンを使うDBConnectorを初期化する
+    起動時 (lifespan) に呼び出し、失敗した場合は最初のリクエスト時に再試行される
+    """
+    global _db_connector
+    if _db_connector is None:
+        with _db_connector_lock:
+            if _db_connector is None:
+                from .classes.db_connector import DBConnector
+                _db_connector = DBConnector(engine=engine)
+    return _db_connector
+
+# 依存性注入用の関数 (DBConnector)
+def get_db_connector():
+    return init_db_connector()
+
+# エンジンを破棄してコネクションプールを解放する関数 (シャットダウン時に使用)
+async def dispose_engine():
+    global _db_connector
+    _db_connector = None
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
 # テーブルをリセットする関数
 def reset_reviews_table():
-    from sqlalchemy import text
     with engine.connect() as conn:
         # reviewsテーブルが存在すれば削除
         conn.execute(text("DROP TABLE IF EXISTS public.reviews CASCADE"))
@@ -1,6 +1,15 @@
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
+import json
 import os
+import sys
+
+# `python src/db_migration.py` として実行した場合も src パッケージを読み込めるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.event_facets import derive_facet_values
+from src.classes.event_matching import qualification_tokens
+from src.classes.tag_normalizer import is_normalized, normalize_tags
 
 # 環境変数の読み込み
 load_dotenv()
@@ -72,9 +81,542 @@ def migrate_reviews_table():
             
             print("reviewsテーブルの構造が正常に変更されました。")
 
+def migrate_events_indexes():
+    """
+    eventsテーブルに日付範囲検索用のインデックスを追加するマイグレーション
+    - start_date の B-tree インデックス
+    - (start_date, event_type) の複合インデックス
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_start_date
+                ON public.events (start_date)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_start_date_event_type
+                ON public.events (start_date, event_type)
+            """))
+            # 新しいインデックスをプランナーが使えるよう統計情報を更新
+            conn.execute(text("ANALYZE public.events"))
+
+            print("eventsテーブルのインデックスが正常に作成されました。")
+
+def migrate_events_image_etag():
+    """
+    eventsテーブルに画像のETag用カラムを追加するマイグレーション
+    - image_etag カラムを追加
+    - 既存の画像からSHA-256を計算して埋める
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            ALTER TABLE public.events ADD COLUMN IF NOT EXISTS image_etag VARCHAR(64)
+            """))
+            conn.execute(text("""
+            UPDATE public.events
+               SET image_etag = encode(sha256(image), 'hex')
+             WHERE image IS NOT NULL AND image_etag IS NULL
+            """))
+
+            print("eventsテーブルにimage_etagカラムが正常に追加されました。")
+
+def migrate_pagination_indexes():
+    """
+    カーソルページング用の複合インデックスを追加するマイグレーション
+    - events (created_at, event_id)
+    - applications (applied_at, application_id)
+    - reviews (created_at, review_id)
+    ※ applicant は主キー (user_id) でページングするため追加のインデックスは不要
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_created_at_event_id
+                ON public.events (created_at, event_id)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applications_applied_at_application_id
+                ON public.applications (applied_at, application_id)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_reviews_created_at_review_id
+                ON public.reviews (created_at, review_id)
+            """))
+
+            print("カーソルページング用のインデックスが正常に作成されました。")
+
+def migrate_events_tags():
+    """
+    eventsテーブルのtagsを正規形 [{"label": ..., "color": ...}] に変換するマイグレーション
+    - 文字列・カンマ区切り・色なしのタグなど、以前の形式で保存された行が対象
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            rows = conn.execute(text(
+                "SELECT event_id, tags FROM public.events WHERE tags IS NOT NULL"
+            )).fetchall()
+            updated = 0
+            for event_id, tags in rows:
+                if is_normalized(tags):
+                    continue
+                conn.execute(
+                    text("UPDATE public.events SET tags = :tags WHERE event_id = :event_id"),
+                    {"tags": json.dumps(normalize_tags(tags), ensure_ascii=False), "event_id": event_id}
+                )
+                updated += 1
+
+            print(f"eventsテーブルのtagsを正規化しました。({updated}件)")
+
+def migrate_join_event_idempotency():
+    """
+    イベント参加 (POST /join-event) の重複登録を防ぐためのマイグレーション
+    - applications に (event_id, user_id) の一意制約を追加
+      ※ 既に重複した応募がある場合は失敗するため、先に重複を解消しておくこと
+    - idempotency_keys テーブルを作成
+    - 応募者をメールアドレスで探す用インデックスを追加
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint WHERE conname = 'uq_applications_event_id_user_id'
+                ) THEN
+                    ALTER TABLE public.applications
+                        ADD CONSTRAINT uq_applications_event_id_user_id UNIQUE (event_id, user_id);
+                END IF;
+            END $$
+            """))
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+                idempotency_key VARCHAR(255) PRIMARY KEY,
+                request_hash CHAR(64) NOT NULL,
+                response JSON NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """))
+
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applicant_mail_address
+                ON public.applicant (lower(trim(mail_address)))
+            """))
+
+            print("applicationsの一意制約とidempotency_keysテーブルが正常に作成されました。")
+
+def migrate_event_admission():
+    """
+    募集枠の管理（定員チェックとキャンセル待ち）のためのマイグレーション
+    - application_status に WAITLISTED を追加
+    - events に remaining_spots カラムを追加し、募集人数と現在の応募数から残り枠数を計算
+    - キャンセル待ちの繰り上げ用インデックスを追加
+    """
+    # ENUMへの値の追加はトランザクション外で実行する
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ALTER TYPE application_status ADD VALUE IF NOT EXISTS 'WAITLISTED'"))
+
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            ALTER TABLE public.events
+                ADD COLUMN IF NOT EXISTS remaining_spots INTEGER CHECK (remaining_spots >= 0)
+            """))
+            conn.execute(text("""
+            UPDATE public.events e
+               SET remaining_spots = GREATEST(e.available_spots - (
+                       SELECT count(*) FROM public.applications a
+                        WHERE a.event_id = e.event_id AND a.status IN ('PENDING', 'APPROVED')
+                   ), 0)
+             WHERE e.available_spots IS NOT NULL
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applications_event_id_status_applied_at
+                ON public.applications (event_id, status, applied_at)
+            """))
+
+            print("募集枠管理用のカラムとインデックスが正常に作成されました。")
+
+def migrate_leaderboard_snapshot():
+    """
+    ランキングのスナップショット用のマイグレーション
+    - leaderboard_snapshot テーブルを作成
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.leaderboard_snapshot (
+                board VARCHAR(100) NOT NULL,
+                user_id UUID NOT NULL,
+                score INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                snapshot_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (board, user_id),
+                FOREIGN KEY (user_id) REFERENCES public.applicant(user_id) ON DELETE CASCADE
+            )
+            """))
+
+            print("leaderboard_snapshotテーブルが正常に作成されました。")
+
+def migrate_xp_events():
+    """
+    経験値の獲得履歴 (xp_events) のマイグレーション
+    - xp_source ENUM と xp_events テーブルを作成
+    - 既存の player の経験値を MIGRATED として記録（履歴から経験値を再計算しても同じ値になるように）
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            DO $$ BEGIN
+                CREATE TYPE xp_source AS ENUM ('APPLICATION_APPROVED', 'EVENT_COMPLETED', 'REVIEW_RATED', 'MIGRATED');
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+            """))
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.xp_events (
+                xp_event_id BIGSERIAL PRIMARY KEY,
+                user_id UUID NOT NULL,
+                source xp_source NOT NULL,
+                source_id UUID,
+                company_id UUID,
+                amount INTEGER NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                applied_at TIMESTAMP,
+                CONSTRAINT uq_xp_events_user_id_source_source_id UNIQUE (user_id, source, source_id),
+                FOREIGN KEY (user_id) REFERENCES public.applicant(user_id) ON DELETE CASCADE
+            )
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_xp_events_unapplied
+                ON public.xp_events (xp_event_id) WHERE applied_at IS NULL
+            """))
+            conn.execute(text("""
+            INSERT INTO public.xp_events (user_id, source, amount, created_at, applied_at)
+            SELECT p.user_id, 'MIGRATED', p.experience, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+              FROM public.player p
+             WHERE p.experience > 0
+               AND NOT EXISTS (SELECT 1 FROM public.xp_events x WHERE x.user_id = p.user_id)
+            """))
+
+            print("xp_eventsテーブルが正常に作成されました。")
+
+# イベント検索用の生成列 (migrate_events_search で追加。migrate_events_facets で tags の型を変える際に作り直す)
+EVENTS_SEARCH_COLUMNS = """
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(location, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(jsonb_path_query_array(tags::jsonb, '$[*].label'), '[]'::jsonb)), 'B')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+        lower(
+            title || ' ' || coalesce(location, '') || ' '
+            || coalesce(jsonb_path_query_array(tags::jsonb, '$[*].label')::text, '') || ' '
+            || coalesce(description, ''))
+    ) STORED
+"""
+
+def add_events_search_columns(conn):
+    """events にイベント検索用の生成列とGINインデックスを追加する"""
+    conn.execute(text("ALTER TABLE public.events" + EVENTS_SEARCH_COLUMNS))
+    conn.execute(text("""
+    CREATE INDEX IF NOT EXISTS idx_events_search_vector
+        ON public.events USING GIN (search_vector)
+    """))
+    conn.execute(text("""
+    CREATE INDEX IF NOT EXISTS idx_events_search_text_trgm
+        ON public.events USING GIN (search_text gin_trgm_ops)
+    """))
+
+def migrate_events_search():
+    """
+    イベント検索 (GET /events/search) のためのマイグレーション
+    - pg_trgm 拡張機能を有効化
+    - events に全文検索用の search_vector、部分一致検索用の search_text の生成列を追加
+      ※ 既存の行をすべて書き換えるため、イベント数が多い場合は時間がかかる
+    - それぞれのGINインデックスを追加
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            add_events_search_columns(conn)
+            conn.execute(text("ANALYZE public.events"))
+
+            print("イベント検索用の列とインデックスが正常に作成されました。")
+
+def migrate_events_facets(batch_size: int = 1000):
+    """
+    イベントの絞り込み・ファセット (GET /events/filter) のためのマイグレーション
+    - events に reward_amount (報酬の金額)・prefecture (都道府県)・qualifications (必要資格の配列) を追加し、
+      既存の reward・location・required_qualifications から値を埋める
+    - tags を JSON から JSONB に変更（検索用の生成列が tags を参照しているため、一度削除して作り直す）
+    - 絞り込み用のインデックスを追加
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            ALTER TABLE public.events
+                ADD COLUMN IF NOT EXISTS reward_amount INTEGER,
+                ADD COLUMN IF NOT EXISTS prefecture VARCHAR(10),
+                ADD COLUMN IF NOT EXISTS qualifications TEXT[]
+            """))
+
+            tags_type = conn.execute(text("""
+            SELECT data_type FROM information_schema.columns
+             WHERE table_schema = 'public' AND table_name = 'events' AND column_name = 'tags'
+            """)).scalar()
+            if tags_type == "json":
+                has_search_columns = conn.execute(text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                     WHERE table_schema = 'public' AND table_name = 'events' AND column_name = 'search_vector'
+                )
+                """)).scalar()
+                conn.execute(text("""
+                ALTER TABLE public.events
+                    DROP COLUMN IF EXISTS search_vector,
+                    DROP COLUMN IF EXISTS search_text
+                """))
+                conn.execute(text("ALTER TABLE public.events ALTER COLUMN tags TYPE JSONB USING tags::jsonb"))
+                if has_search_columns:
+                    add_events_search_columns(conn)
+
+            rows = conn.execute(text("""
+            SELECT event_id, reward, location, required_qualifications FROM public.events
+             WHERE reward_amount IS NULL AND prefecture IS NULL AND qualifications IS NULL
+            """)).fetchall()
+            updates = []
+            for event_id, reward, location, required_qualifications in rows:
+                values = derive_facet_values(reward, location, required_qualifications)
+                if any(value is not None for value in values.values()):
+                    updates.append({"event_id": event_id, **values})
+            for i in range(0, len(updates), batch_size):
+                conn.execute(text("""
+                UPDATE public.events
+                   SET reward_amount = :reward_amount, prefecture = :prefecture, qualifications = :qualifications
+                 WHERE event_id = :event_id
+                """), updates[i:i + batch_size])
+
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_tags
+                ON public.events USING GIN (tags jsonb_path_ops)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_qualifications
+                ON public.events USING GIN (qualifications)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_reward_amount
+                ON public.events (reward_amount)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_prefecture_start_date
+                ON public.events (prefecture, start_date)
+            """))
+            conn.execute(text("ANALYZE public.events"))
+
+            print(f"イベントの絞り込み用の列とインデックスが正常に作成されました。({len(updates)}件)")
+
+def migrate_event_qualifications(batch_size: int = 1000):
+    """
+    おすすめイベント (GET /applicant/{user_id}/recommended-events) のためのマイグレーション
+    - 資格 → イベント の転置インデックス event_qualifications テーブルを作成
+    - 既存のイベントの required_qualifications から行を作成（events_facets の後に実行する。reward_amount を複製するため）
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.event_qualifications (
+                qualification VARCHAR(100) NOT NULL,
+                event_id UUID NOT NULL,
+                start_date TIMESTAMP NOT NULL,
+                reward_amount INTEGER,
+                required_count INTEGER NOT NULL,
+                PRIMARY KEY (qualification, event_id),
+                FOREIGN KEY (event_id) REFERENCES public.events(event_id) ON DELETE CASCADE
+            )
+            """))
+
+            rows = conn.execute(text("""
+            SELECT e.event_id, e.required_qualifications, e.start_date, e.reward_amount FROM public.events e
+             WHERE e.required_qualifications IS NOT NULL
+               AND NOT EXISTS (SELECT 1 FROM public.event_qualifications q WHERE q.event_id = e.event_id)
+            """)).fetchall()
+            inserts = []
+            for event_id, required_qualifications, start_date, reward_amount in rows:
+                tokens = qualification_tokens(required_qualifications)
+                inserts.extend(
+                    {
+                        "qualification": token, "event_id": event_id, "start_date": start_date,
+                        "reward_amount": reward_amount, "required_count": len(tokens),
+                    }
+                    for token in tokens
+                )
+            for i in range(0, len(inserts), batch_size):
+                conn.execute(text("""
+                INSERT INTO public.event_qualifications
+                    (qualification, event_id, start_date, reward_amount, required_count)
+                VALUES (:qualification, :event_id, :start_date, :reward_amount, :required_count)
+                ON CONFLICT DO NOTHING
+                """), inserts[i:i + batch_size])
+
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_event_qualifications_qualification_start_date
+                ON public.event_qualifications (qualification, start_date)
+                INCLUDE (event_id, reward_amount, required_count)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_event_qualifications_event_id
+                ON public.event_qualifications (event_id)
+            """))
+            conn.execute(text("ANALYZE public.event_qualifications"))
+
+            print(f"event_qualificationsテーブルが正常に作成されました。({len(inserts)}件)")
+
+def migrate_applicant_feed():
+    """
+    応募者ごとのフィード (GET /applicant/{user_id}/feed) のためのマイグレーション
+    - applicant_feed・applicant_feed_state テーブルを作成
+    - すべての応募者を作り直しの対象にする（APIサーバーの FeedRefresher が順に作成する。
+      すぐに作成する場合は python -m src.classes.applicant_feed rebuild を実行する）
+    - 応募したことのある企業のイベントを取得する用のインデックスを追加
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.applicant_feed (
+                user_id UUID NOT NULL,
+                position INTEGER NOT NULL,
+                event_id UUID NOT NULL,
+                score DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (user_id, position),
+                FOREIGN KEY (user_id) REFERENCES public.applicant(user_id) ON DELETE CASCADE,
+                FOREIGN KEY (event_id) REFERENCES public.events(event_id) ON DELETE CASCADE
+            )
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applicant_feed_event_id
+                ON public.applicant_feed (event_id)
+            """))
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.applicant_feed_state (
+                user_id UUID PRIMARY KEY,
+                dirty BOOLEAN NOT NULL DEFAULT TRUE,
+                qualifications TEXT[],
+                refreshed_at TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES public.applicant(user_id) ON DELETE CASCADE
+            )
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applicant_feed_state_dirty
+                ON public.applicant_feed_state (user_id) WHERE dirty
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applicant_feed_state_refreshed_at
+                ON public.applicant_feed_state (refreshed_at)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_applicant_feed_state_qualifications
+                ON public.applicant_feed_state USING GIN (qualifications)
+            """))
+            conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_events_company_id_start_date
+                ON public.events (company_id, start_date)
+            """))
+            result = conn.execute(text("""
+            INSERT INTO public.applicant_feed_state (user_id, dirty)
+            SELECT user_id, TRUE FROM public.applicant
+            ON CONFLICT (user_id) DO UPDATE SET dirty = TRUE
+            """))
+
+            print(f"applicant_feedテーブルが正常に作成されました。({result.rowcount}人を作成の対象にしました)")
+
+def migrate_event_calendar_days():
+    """
+    カレンダーの月ごとのイベント数 (GET /events/calendar) のためのマイグレーション
+    - event_calendar_days テーブルを作成し、events から日ごと・イベントの種類ごとに集計して作り直す
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.event_calendar_days (
+                day DATE NOT NULL,
+                event_type event_type NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, event_type)
+            )
+            """))
+            conn.execute(text("DELETE FROM public.event_calendar_days"))
+            result = conn.execute(text("""
+            INSERT INTO public.event_calendar_days (day, event_type, event_count)
+            SELECT date_trunc('day', start_date)::DATE, event_type, count(*)
+              FROM public.events
+             GROUP BY 1, 2
+            """))
+
+            print(f"event_calendar_daysテーブルが正常に作成されました。({result.rowcount}行)")
+
+def migrate_xp_review_adjusted():
+    """
+    レビューの評価の変更・削除による経験値の補正のためのマイグレーション
+    - xp_source に REVIEW_ADJUSTED を追加
+    """
+    # ENUMへの値の追加はトランザクション外で実行する
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ALTER TYPE xp_source ADD VALUE IF NOT EXISTS 'REVIEW_ADJUSTED'"))
+
+        print("xp_sourceにREVIEW_ADJUSTEDが正常に追加されました。")
+
+def migrate_applicant_feed_outbox():
+    """
+    イベントの変更によるフィードの作り直しを、リクエストの外で行うためのマイグレーション
+    - applicant_feed_outbox テーブルを作成
+    - applicant_feed.event_id の外部キーを削除（イベントの削除時にフィードの行を消さず、作り直しで置き換える）
+    """
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS public.applicant_feed_outbox (
+                outbox_id BIGSERIAL PRIMARY KEY,
+                event_ids UUID[],
+                qualifications TEXT[],
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """))
+            conn.execute(text("""
+            ALTER TABLE public.applicant_feed DROP CONSTRAINT IF EXISTS applicant_feed_event_id_fkey
+            """))
+
+            print("applicant_feed_outboxテーブルが正常に作成されました。")
+
+# 実行可能なマイグレーションの一覧（コマンドライン引数で指定する）
+MIGRATIONS = {
+    "reviews_table": migrate_reviews_table,
+    "events_indexes": migrate_events_indexes,
+    "events_image_etag": migrate_events_image_etag,
+    "pagination_indexes": migrate_pagination_indexes,
+    "events_tags": migrate_events_tags,
+    "join_event_idempotency": migrate_join_event_idempotency,
+    "event_admission": migrate_event_admission,
+    "leaderboard_snapshot": migrate_leaderboard_snapshot,
+    "xp_events": migrate_xp_events,
+    "events_search": migrate_events_search,
+    "events_facets": migrate_events_facets,
+    "event_qualifications": migrate_event_qualifications,
+    "applicant_feed": migrate_applicant_feed,
+    "event_calendar_days": migrate_event_calendar_days,
+    "xp_review_adjusted": migrate_xp_review_adjusted,
+    "applicant_feed_outbox": migrate_applicant_feed_outbox,
+}
+
 if __name__ == "__main__":
+    # 引数なしの場合は従来通り reviews テーブルのマイグレーションを実行
+    names = sys.argv[1:] or ["reviews_table"]
     try:
-        migrate_reviews_table()
+        for name in names:
+            if name not in MIGRATIONS:
+                raise ValueError(f"不明なマイグレーションです: {name} (利用可能: {', '.join(MIGRATIONS)})")
+            MIGRATIONS[name]()
         print("マイグレーションが正常に完了しました。")
     except Exception as e:
         print(f"マイグレーション中にエラーが発生しました: {e}") 
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+構造化ログ (JSON) の設定
+
+- ログは QueueHandler でキューに積み、別スレッドの QueueListener が標準出力に書き込むため、
+  リクエスト処理中に標準出力への書き込みで待たされない
+- extra で渡した項目はJSONのフィールドとして出力し、長い文字列やバイナリは切り詰める
+- route ごとにサンプリング率を設定できる (WARNING 以上は常に出力)
+
+環境変数:
+    LOG_LEVEL             ログレベル (デフォルト: INFO)
+    LOG_DEBUG_PAYLOADS    true の場合のみリクエストの内容をログに出力する (デフォルト: false)
+    LOG_MAX_FIELD_LENGTH  1項目あたりの最大文字数 (デフォルト: 256)
+    LOG_SAMPLE_RATES      route ごとのサンプリング率 (例: "/get-events=0.1,/event=0.5")
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DEBUG_PAYLOADS = os.getenv("LOG_DEBUG_PAYLOADS", "false").lower() in ("1", "true", "yes")
+LOG_MAX_FIELD_LENGTH = int(os.getenv("LOG_MAX_FIELD_LENGTH", "256"))
+
+# LogRecord が標準で持つ属性（extra として出力しないもの）
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+# JsonQueueHandler で例外を文字列にするためのフォーマッター
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """"/get-events=0.1,/event=0.5" 形式の文字列を route → サンプリング率の辞書にする"""
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        route, rate = item.split("=", 1)
+        rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def truncate(value: Any, max_length: int = LOG_MAX_FIELD_LENGTH) -> Any:
+    """ログに出力する値を切り詰める（Base64の画像などをそのまま出力しないため）"""
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        if len(value) > max_length:
+            return f"{value[:max_length]}...(+{len(value) - max_length} chars)"
+        return value
+    if isinstance(value, dict):
+        return {str(k): truncate(v, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [truncate(v, max_length) for v in value[:max_length]]
+        if len(value) > max_length:
+            items.append(f"...(+{len(value) - max_length} items)")
+        return items
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate(str(value), max_length)
+
+
+class JsonFormatter(logging.Formatter):
+    """ログレコードを1行のJSONに変換するフォーマッター"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = truncate(value)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif getattr(record, "_exception", None):
+            # JsonQueueHandler.prepare で整形済みの例外
+            data["exception"] = record._exception
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class JsonQueueHandler(logging.handlers.QueueHandler):
+    """
+    ログレコードをキューに積むハンドラー
+    標準の QueueHandler.prepare() は例外のトレースバックを message に連結して exc_info を消すため、
+    message はそのままにし、整形したトレースバックを _exception に入れて JsonFormatter に渡す。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # トレースバックのオブジェクトは別スレッドに渡さず、このスレッドで文字列にする
+            record._exception = record.exc_text or _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    route ごとにログを間引くフィルター
+    extra={"route": ...} を指定したINFO以下のログのみが対象で、WARNING以上は常に出力する。
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "route", None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+def setup_logging() -> None:
+    """
+    アプリケーション全体のログ設定を行う（複数回呼び出しても一度だけ設定する）
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = JsonQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))))
+
+    app_logger = logging.getLogger("api")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # 終了時にキューに残ったログを書き出す
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """アプリケーション用のロガーを取得する (api.<name>)"""
+    setup_logging()
+    return logging.getLogger(f"api.{name}")
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SAEnum, ForeignKey, JSON, LargeBinary, UUID, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Integer, String, Date, DateTime, Text, Enum as SAEnum, ForeignKey, JSON, LargeBinary, UUID, Float, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from .database import Base
 from datetime import datetime
@@ -21,6 +22,7 @@ class ApplicationStatusEnum(enum.Enum):
     PENDING = "未対応"
     APPROVED = "承認"
     REJECTED = "否認"
+    WAITLISTED = "キャンセル待ち"  # 満員のため募集枠が空くのを待っている応募
 
 # 0_init.sql の participants_status ENUM に対応
 class ParticipantStatusEnum(enum.Enum):
@@ -41,20 +43,115 @@ class Event(Base):
     company_id = Column(UUID(as_uuid=True), nullable=False) # まずは company_id をUUID型として定義
     event_type = Column(SAEnum(EventTypeEnum, name="event_type"), nullable=False)
     title = Column(String(255), nullable=False)
-    image = Column(LargeBinary, nullable=True) # Base64エンコードされた文字列をフロントとやり取りし、DBにはバイナリで保存
+    # DBにはバイナリで保存し、GET /event/{event_id}/image で配信する (一覧取得時には読み込まない)
+    image = deferred(Column(LargeBinary, nullable=True))
+    image_etag = Column(String(64), nullable=True) # 画像のSHA-256 (ETag・キャッシュ判定用)
     description = Column(Text, nullable=True)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
     location = Column(String(255), nullable=True)
     reward = Column(String(100), nullable=True)
     required_qualifications = Column(Text, nullable=True)
+    # 絞り込み用の列。reward・location・required_qualifications から src/classes/event_facets.py の derive_facet_values で作成する
+    reward_amount = Column(Integer, nullable=True)          # 報酬の金額（円）
+    prefecture = Column(String(10), nullable=True)          # 開催場所の都道府県
+    qualifications = Column(ARRAY(Text), nullable=True)     # 必要資格のリスト
     available_spots = Column(Integer, nullable=True)
+    # 残りの募集枠数 (NULLは定員なし)。src/classes/admission.py の EventAdmission で更新する
+    remaining_spots = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
-    tags = Column(JSON, nullable=True)
+    tags = Column(JSONB, nullable=True)
+    # 検索用の生成列 search_vector・search_text はモデルに定義しない（一覧取得で読み込まないため）
+    # db_migration.py の migrate_events_search で作成し、src/classes/event_search.py で参照する
+
+    # 日付範囲での検索用インデックス (db_migration.py の migrate_events_indexes で作成)
+    __table_args__ = (
+        Index("idx_events_start_date", "start_date"),
+        Index("idx_events_start_date_event_type", "start_date", "event_type"),
+        # カーソルページング用 (db_migration.py の migrate_pagination_indexes で作成)
+        Index("idx_events_created_at_event_id", "created_at", "event_id"),
+        # 絞り込み・ファセット用 (db_migration.py の migrate_events_facets で作成)
+        Index("idx_events_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+        Index("idx_events_qualifications", "qualifications", postgresql_using="gin"),
+        Index("idx_events_reward_amount", "reward_amount"),
+        Index("idx_events_prefecture_start_date", "prefecture", "start_date"),
+        # 応募したことのある企業のイベントを取得する用 (db_migration.py の migrate_applicant_feed で作成)
+        Index("idx_events_company_id_start_date", "company_id", "start_date"),
+    )
 
     # company = relationship("Company") # companyテーブルとの連携は後で検討
 
+# イベントの必要資格の転置インデックス (資格 → イベント)
+# events の required_qualifications・start_date・reward_amount から src/classes/event_matching.py の sync_event_qualifications で作成する
+class EventQualification(Base):
+    __tablename__ = "event_qualifications"
+
+    qualification = Column(String(100), primary_key=True)   # 正規化した資格名 (normalize_qualification)
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    start_date = Column(DateTime, nullable=False)           # events.start_date の複製
+    reward_amount = Column(Integer, nullable=True)          # events.reward_amount の複製
+    required_count = Column(Integer, nullable=False)        # イベントの必要資格の数
+
+    __table_args__ = (
+        # 資格ごとに開催前のイベントを取得する用インデックス (db_migration.py の migrate_event_qualifications で作成)
+        Index(
+            "idx_event_qualifications_qualification_start_date", "qualification", "start_date",
+            postgresql_include=["event_id", "reward_amount", "required_count"]
+        ),
+        Index("idx_event_qualifications_event_id", "event_id"),
+    )
+
+# 日ごと・イベントの種類ごとのイベント数 (カレンダー表示用の集計)
+# イベントの作成・更新・削除時に src/classes/event_calendar.py の apply_calendar_changes で更新する
+class EventCalendarDay(Base):
+    __tablename__ = "event_calendar_days"
+
+    day = Column(Date, primary_key=True)                    # 開始日
+    event_type = Column(SAEnum(EventTypeEnum, name="event_type"), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+# 応募者ごとのおすすめイベントのフィード（スコアの高い順。src/classes/applicant_feed.py の FeedRefresher で作成する）
+class ApplicantFeed(Base):
+    __tablename__ = "applicant_feed"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("applicant.user_id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)            # 順位 (1から。キーセットページングのキー)
+    # 外部キーにしない（イベントの削除時に多数の行を消さず、作り直しで置き換える。取得時は events と結合する）
+    event_id = Column(UUID(as_uuid=True), nullable=False)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # イベントの更新時にフィードを作り直す応募者を探す用インデックス
+        Index("idx_applicant_feed_event_id", "event_id"),
+    )
+
+# 応募者ごとのフィードの作成状況
+class ApplicantFeedState(Base):
+    __tablename__ = "applicant_feed_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("applicant.user_id", ondelete="CASCADE"), primary_key=True)
+    dirty = Column(Boolean, nullable=False, default=True)   # 作り直しが必要か
+    qualifications = Column(ARRAY(Text), nullable=True)     # 作成時の応募者の資格（資格の一致するイベントの更新時に dirty にする）
+    refreshed_at = Column(DateTime, nullable=True)          # 最後に作り直した日時
+
+    __table_args__ = (
+        # 作り直しが必要な応募者・古いフィードを取得する用インデックス (db_migration.py の migrate_applicant_feed で作成)
+        Index("idx_applicant_feed_state_dirty", "user_id", postgresql_where=dirty),
+        Index("idx_applicant_feed_state_refreshed_at", "refreshed_at"),
+        # イベントの必要資格を持つ応募者を探す用インデックス
+        Index("idx_applicant_feed_state_qualifications", "qualifications", postgresql_using="gin"),
+    )
+
+# イベントの作成・更新・削除で順位が変わりうるフィードの記録（FeedRefresher が作り直しの対象に展開して削除する）
+class ApplicantFeedOutbox(Base):
+    __tablename__ = "applicant_feed_outbox"
+
+    outbox_id = Column(Integer, primary_key=True, autoincrement=True)
+    event_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=True)  # フィードに含まれていれば作り直すイベント
+    qualifications = Column(ARRAY(Text), nullable=True)            # イベントの必要資格（正規化した資格名）
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
 class Application(Base):
     __tablename__ = "applications"
     
@@ -70,6 +167,24 @@ class Application(Base):
     # リレーションシップの追加
     applicant = relationship("Applicant", back_populates="applications")
 
+    __table_args__ = (
+        # カーソルページング用インデックス
+        Index("idx_applications_applied_at_application_id", "applied_at", "application_id"),
+        # キャンセル待ちの繰り上げ (イベントごとに応募順で検索) 用インデックス
+        Index("idx_applications_event_id_status_applied_at", "event_id", "status", "applied_at"),
+        # 同じ応募者が同じイベントに重複して応募できないようにする
+        UniqueConstraint("event_id", "user_id", name="uq_applications_event_id_user_id"),
+    )
+
+# 冪等キーモデル (POST /join-event の再送で重複登録しないため)
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    idempotency_key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # リクエスト内容のSHA-256 (同じキーで別の内容が送られた場合の検出用)
+    response = Column(JSON, nullable=False)            # 最初のリクエストに返したレスポンス
+    created_at = Column(DateTime, server_default=func.now())
+
 # TODO: Companyモデルも必要に応じて定義する (company_idのForeignKeyのため)
 # class Company(Base):
 #     __tablename__ = "company"
@@ -93,6 +208,11 @@ class Applicant(Base):
     # リレーションシップの追加
     applications = relationship("Application", back_populates="applicant")
 
+    __table_args__ = (
+        # POST /join-event で同じメールアドレスの応募者を探す用インデックス
+        Index("idx_applicant_mail_address", func.lower(func.trim(mail_address))),
+    )
+
 # レビューリクエストモデル
 class ReviewRequest(Base):
     __tablename__ = "review_requests"
@@ -108,7 +228,11 @@ class ReviewRequest(Base):
 # レビューモデル
 class Review(Base):
     __tablename__ = "reviews"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        # カーソルページング用インデックス
+        Index("idx_reviews_created_at_review_id", "created_at", "review_id"),
+        {"schema": "public"},
+    )
     
     review_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     application_id = Column(UUID(as_uuid=True), ForeignKey("applications.application_id"), nullable=False)
@@ -131,6 +255,56 @@ class Participant(Base):
     # リレーションシップの追加
     user = relationship("User", back_populates="participants")
 
+# プレイヤー（ゲーミフィケーションの進行状況）モデル
+# level・experience は xp_events を src/classes/xp_ledger.py の XpAggregator で集計して更新する
+class Player(Base):
+    __tablename__ = "player"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("applicant.user_id"), primary_key=True)
+    level = Column(Integer, nullable=False, default=1)
+    experience = Column(Integer, nullable=False, default=0)
+    skill_data = Column(JSON, nullable=False, default=dict)
+    item_data = Column(JSON, nullable=False, default=list)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+# 経験値の獲得理由
+class XpSourceEnum(enum.Enum):
+    APPLICATION_APPROVED = "応募承認"
+    EVENT_COMPLETED = "イベント参加"
+    REVIEW_RATED = "レビュー評価"
+    REVIEW_ADJUSTED = "レビュー修正"  # レビューの評価の変更・削除による補正 (負の値もある)
+    MIGRATED = "移行"  # xp_events 導入前に player に記録されていた経験値
+
+# 経験値の獲得履歴 (追記のみ。player の経験値はこの合計から再計算できる)
+class XpEvent(Base):
+    __tablename__ = "xp_events"
+
+    xp_event_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("applicant.user_id"), nullable=False)
+    source = Column(SAEnum(XpSourceEnum, name="xp_source"), nullable=False)
+    source_id = Column(UUID(as_uuid=True), nullable=True)   # 応募ID・参加者ID・レビューIDなど
+    company_id = Column(UUID(as_uuid=True), nullable=True)  # 経験値を獲得したイベントの企業ID (企業ごとのランキング用)
+    amount = Column(Integer, nullable=False)                # 経験値 (補正の場合は負の値もある)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    applied_at = Column(DateTime, nullable=True)            # player に集計した日時 (未集計はNULL)
+
+    __table_args__ = (
+        # 同じ理由で同じ経験値を二重に付与しない
+        UniqueConstraint("user_id", "source", "source_id", name="uq_xp_events_user_id_source_source_id"),
+        # 未集計の履歴を古い順に取得する用インデックス
+        Index("idx_xp_events_unapplied", "xp_event_id", postgresql_where=applied_at.is_(None)),
+    )
+
+# ランキングのスナップショット (記録用。ランキング自体は src/classes/leaderboard.py で保持し、起動時は player と xp_events から復元する)
+class LeaderboardSnapshot(Base):
+    __tablename__ = "leaderboard_snapshot"
+
+    board = Column(String(100), primary_key=True)  # ボード名 (global / company:{company_id} / monthly:YYYY-MM)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("applicant.user_id"), primary_key=True)
+    score = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)
+    snapshot_at = Column(DateTime, nullable=False)
+
 class User(Base):
     __tablename__ = "users"
     
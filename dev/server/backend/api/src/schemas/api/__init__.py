@@ -1,9 +1,25 @@
 # API schemas package
-from .base import DateModel, BaseResponse
+from .base import DateModel, DateRangeModel, BaseResponse
+from .bulk import BulkImportError, BulkImportResult
+from .filter import EventFilterResult, FacetCount
 from .join_event import JoinEventRequest
+from .leaderboard import LeaderboardEntry, LeaderboardPage, LeaderboardRank
+from .pagination import CursorPage
+from .search import EventSearchHit, EventSearchResult
 
 __all__ = [
     "DateModel",
+    "DateRangeModel",
     "BaseResponse",
+    "BulkImportError",
+    "BulkImportResult",
+    "EventFilterResult",
+    "FacetCount",
     "JoinEventRequest",
+    "LeaderboardEntry",
+    "LeaderboardPage",
+    "LeaderboardRank",
+    "CursorPage",
+    "EventSearchHit",
+    "EventSearchResult",
 ]
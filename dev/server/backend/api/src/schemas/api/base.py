@@ -1,7 +1,7 @@
 """
 Common schemas and base models for FastAPI
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from datetime import datetime, date
 import uuid
@@ -17,6 +17,25 @@ class DateModel(BaseModel):
         from_attributes = True
 
 
+class DateRangeModel(BaseModel):
+    """
+    期間モデル - [start_date, end_date) の期間を表現するモデル（end_dateは含まない）
+    """
+    start_date: date = Field(..., description="検索開始日（この日を含む）")
+    end_date: date = Field(..., description="検索終了日（この日を含まない）")
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.end_date <= self.start_date:
+            raise ValueError('end_date must be after start_date')
+        if (self.end_date - self.start_date).days > 62:
+            raise ValueError('date range must be 62 days or less')
+        return self
+
+    class Config:
+        from_attributes = True
+
+
 class BaseResponse(BaseModel):
     """Base response model with common fields"""
     id: uuid.UUID
@@ -0,0 +1,20 @@
+"""
+Bulk import API schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import List
+import uuid
+
+
+class BulkImportError(BaseModel):
+    """一括登録で登録できなかった行のエラー"""
+    line: int = Field(..., description="入力データの行番号 (1始まり。CSVはヘッダー行を1行目とする)")
+    errors: List[str] = Field(default_factory=list, description="エラー内容")
+
+
+class BulkImportResult(BaseModel):
+    """イベント一括登録の結果"""
+    received: int = Field(..., description="受け付けた行数")
+    inserted: int = Field(..., description="登録したイベント数")
+    event_ids: List[uuid.UUID] = Field(default_factory=list, description="登録したイベントのID (入力順)")
+    errors: List[BulkImportError] = Field(default_factory=list, description="行ごとのエラー")
@@ -0,0 +1,19 @@
+"""
+Event calendar API schemas for FastAPI
+"""
+from datetime import date
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class EventCalendarDay(BaseModel):
+    """イベントのある日"""
+    date: date
+    count: int = Field(..., description="その日に開始するイベントの数")
+    types: List[str] = Field(default_factory=list, description="その日のイベントの種類 (インターンシップ / 説明会)")
+
+
+class EventCalendarMonth(BaseModel):
+    """月ごとのイベントのある日 (日付順。イベントのない日は含まない)"""
+    month: str = Field(..., description="YYYY-MM")
+    days: List[EventCalendarDay] = Field(default_factory=list)
@@ -0,0 +1,23 @@
+"""
+Applicant feed API schemas for FastAPI
+"""
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+from src.schemas.database.event import Event
+
+
+class FeedItem(BaseModel):
+    """フィードのイベント"""
+    position: int = Field(..., description="順位 (1から)")
+    score: float = Field(..., description="スコア (資格・開催日・報酬・企業との関係・イベントの種類の好みから計算。大きいほど上位)")
+    event: Event
+
+
+class ApplicantFeedPage(BaseModel):
+    """応募者ごとのおすすめイベントのフィード (順位順)"""
+    user_id: UUID
+    refreshed_at: datetime = Field(..., description="フィードを作成した日時")
+    items: List[FeedItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(None, description="次のページを取得するためのカーソル")
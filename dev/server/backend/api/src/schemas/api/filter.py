@@ -0,0 +1,22 @@
+"""
+Event filter API schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+from src.schemas.database.event import Event
+
+
+class FacetCount(BaseModel):
+    """ファセットの値と件数"""
+    value: Any
+    count: int
+
+
+class EventFilterResult(BaseModel):
+    """イベントの絞り込み結果 (開始日時順)"""
+    total: int = Field(..., description="条件に一致するイベントの数")
+    items: List[Event] = Field(default_factory=list)
+    facets: Dict[str, List[FacetCount]] = Field(
+        default_factory=dict,
+        description="event_type / prefecture / tag / qualification ごとの値と件数 (件数の多い順)"
+    )
@@ -0,0 +1,30 @@
+"""
+Leaderboard API schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import uuid
+
+
+class LeaderboardEntry(BaseModel):
+    """ランキングの1行"""
+    rank: int = Field(..., description="順位 (1始まり)")
+    user_id: uuid.UUID
+    name: Optional[str] = Field(None, description="応募者名")
+    score: int = Field(..., description="スコア (経験値)")
+
+
+class LeaderboardPage(BaseModel):
+    """ランキング (スコアの高い順)"""
+    board: str = Field(..., description="ボード名 (global / company:{company_id} / monthly:YYYY-MM)")
+    total: int = Field(..., description="ボードの人数")
+    items: List[LeaderboardEntry] = Field(default_factory=list)
+
+
+class LeaderboardRank(BaseModel):
+    """プレイヤーの順位"""
+    board: str
+    user_id: uuid.UUID
+    rank: int = Field(..., description="順位 (1始まり)")
+    score: int = Field(..., description="スコア (経験値)")
+    total: int = Field(..., description="ボードの人数")
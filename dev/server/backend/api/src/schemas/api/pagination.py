@@ -0,0 +1,16 @@
+"""
+Pagination schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    カーソルページングの応答モデル
+    next_cursor を次のリクエストの cursor に指定すると続きを取得できる（最後のページではNone）
+    """
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="次のページを取得するためのカーソル")
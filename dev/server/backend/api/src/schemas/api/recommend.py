@@ -0,0 +1,21 @@
+"""
+Recommended events API schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import List
+from uuid import UUID
+from src.schemas.database.event import Event
+
+
+class RecommendedEvent(BaseModel):
+    """応募者におすすめのイベント"""
+    event: Event
+    score: float = Field(..., description="スコア (資格の一致率・開催日の近さ・報酬の重み付きの和。大きいほど上位)")
+    matched_qualifications: List[str] = Field(default_factory=list, description="一致した資格 (正規化した資格名)")
+
+
+class RecommendedEvents(BaseModel):
+    """おすすめイベントの一覧 (スコアの高い順)"""
+    user_id: UUID
+    qualifications: List[str] = Field(default_factory=list, description="照合に使った応募者の資格 (正規化した資格名)")
+    items: List[RecommendedEvent] = Field(default_factory=list)
@@ -0,0 +1,23 @@
+"""
+Event search API schemas for FastAPI
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from src.schemas.database.event import Event
+
+
+class EventSearchHit(BaseModel):
+    """検索に一致したイベント"""
+    event: Event
+    score: float = Field(..., description="一致度 (大きいほど上位)")
+    highlights: Dict[str, str] = Field(
+        default_factory=dict,
+        description="検索語を <mark></mark> で囲んだ抜粋 (title / description / location のうち検索語を含むもの)"
+    )
+
+
+class EventSearchResult(BaseModel):
+    """イベント検索の結果 (一致度の高い順)"""
+    query: str
+    terms: List[str] = Field(default_factory=list, description="検索に使った語 (小文字)")
+    items: List[EventSearchHit] = Field(default_factory=list)
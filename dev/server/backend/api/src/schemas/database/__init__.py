@@ -2,6 +2,8 @@
 from .applicant import Applicant, ApplicantCreate, ApplicantUpdate
 from .application import ApplicationResponse, ApplicationCreate, ApplicationUpdate, ApplicationDetail
 from .event import Event, EventCreate, EventUpdate
+from .participant import ParticipantResponse, ParticipantUpdate
+from .player import Player
 from .review import Review, ReviewCreate, ReviewUpdate, ReviewDetail
 
 __all__ = [
@@ -15,6 +17,9 @@ __all__ = [
     "Event",
     "EventCreate",
     "EventUpdate",
+    "ParticipantResponse",
+    "ParticipantUpdate",
+    "Player",
     "Review",
     "ReviewCreate",
     "ReviewUpdate",
@@ -1,13 +1,28 @@
 """
 Event-related Pydantic schemas for FastAPI
 """
-from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional, Any, List, Union
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Any, Dict, Iterable, List, Union
 from datetime import datetime
 import base64
 import json
 import uuid
-from src.models import EventTypeEnum
+from src.classes.tag_normalizer import is_normalized, normalize_tags
+from src.models import Event as EventModel, EventTypeEnum
+
+
+def event_image_url(event_id: Any, image_etag: Optional[str], size: Optional[str] = None) -> Optional[str]:
+    """
+    イベント画像の取得URLを返す (画像がない場合はNone)
+    画像が更新されるとURLも変わるように、ETagの先頭をクエリに付ける
+    sizeを指定すると縮小版 (thumb: 一覧用, detail: 詳細用) のURLになる
+    """
+    if not image_etag:
+        return None
+    url = f"/event/{event_id}/image?v={image_etag[:16]}"
+    if size:
+        url += f"&size={size}"
+    return url
 
 
 class TagData(BaseModel):
@@ -90,39 +105,109 @@ class EventUpdate(BaseModel):
 class Event(EventBase):
     """
     イベント応答モデル
+    画像はimage_url (GET /event/{event_id}/image) で取得する。
+    レスポンスの作成には serialize_event を使用し、このモデルはAPIドキュメント用のスキーマとして使う。
     """
     event_id: uuid.UUID
     created_at: datetime
     updated_at: datetime
+    image_url: Optional[str] = Field(None, description="イベント画像の取得URL")
+    image_thumbnail_url: Optional[str] = Field(None, description="一覧表示用の縮小画像の取得URL")
+    image_etag: Optional[str] = Field(None, description="イベント画像のETag")
+    remaining_spots: Optional[int] = Field(None, description="残りの募集枠数 (Noneは定員なし)")
+    reward_amount: Optional[int] = Field(None, description="報酬の金額 (円。rewardから解析)")
+    prefecture: Optional[str] = Field(None, description="開催場所の都道府県 (locationから解析)")
 
     class Config:
         from_attributes = True
 
-    @model_validator(mode='before')
-    @classmethod
-    def convert_sqlalchemy_event(cls, data: Any) -> Any:
-        if hasattr(data, '_sa_instance_state'):  # SQLAlchemyのモデルインスタンスかチェック
-            # event_type を文字列に変換
-            if isinstance(data.event_type, EventTypeEnum):
-                data.event_type = data.event_type.value
-            # image (LargeBinary) をBase64文字列に変換
-            if data.image is not None:
-                data.image = base64.b64encode(data.image).decode('utf-8')
-            else:
-                data.image = None  # 明示的にNoneを設定
-            # tags (JSON) は既にJSON文字列として扱われる想定なので、DBから取得したまま（Pythonのdict/list）なら文字列化する
-            if data.tags is not None and not isinstance(data.tags, str):
-                data.tags = json.dumps(data.tags, ensure_ascii=False)
-            
-            # required_qualifications を文字列からリストに変換
-            if isinstance(data.required_qualifications, str):
-                # 空文字列の場合は空のリスト、そうでなければカンマで分割
-                if data.required_qualifications.strip() == "":
-                    data.required_qualifications = []
-                else:
-                    data.required_qualifications = [q.strip() for q in data.required_qualifications.split(',') if q.strip()]
-            elif data.required_qualifications is None: # Noneの場合は空のリストに
-                data.required_qualifications = []
-            # 既にリストの場合は何もしない
-
-        return data
+
+# 一覧取得で読み込む列（image以外のすべての列）。ORMインスタンスを作らずに列のタプルとして取得する
+EVENT_COLUMNS = tuple(
+    column for column in EventModel.__table__.columns if column.name != "image"
+)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _event_type_value(value: Any) -> Any:
+    return value.value if isinstance(value, EventTypeEnum) else value
+
+
+def _qualifications(value: Any) -> List[str]:
+    # DBにはカンマ区切りの文字列で保存している
+    if isinstance(value, str):
+        return [q.strip() for q in value.split(',') if q.strip()]
+    if isinstance(value, list):
+        return [str(q) for q in value]
+    return []
+
+
+def _tags(value: Any) -> List[Dict[str, str]]:
+    # 作成・更新時に正規形で保存しているため、通常はそのまま返す
+    if is_normalized(value):
+        return value
+    return normalize_tags(value) or []
+
+
+# (レスポンスのキー, 行の属性名, 変換関数) の組。Eventモデルのフィールド順に合わせる
+_EVENT_FIELDS = (
+    ("company_id", "company_id", _str_or_none),
+    ("event_type", "event_type", _event_type_value),
+    ("title", "title", None),
+    ("description", "description", None),
+    ("start_date", "start_date", _isoformat),
+    ("end_date", "end_date", _isoformat),
+    ("location", "location", None),
+    ("reward", "reward", None),
+    ("required_qualifications", "required_qualifications", _qualifications),
+    ("available_spots", "available_spots", None),
+    ("tags", "tags", _tags),
+)
+
+
+def serialize_event(row: Any, include_image: bool = False) -> Dict[str, Any]:
+    """
+    イベント1件をJSONに変換できるdictにする関数（Eventモデルと同じ形式）
+    レスポンス時のPydanticによる再検証を省くため、すべてのイベント取得APIはこの関数を使用する。
+    :param row: EVENT_COLUMNS で取得した行、またはEventモデルのインスタンス
+    :param include_image: Trueの場合のみ、imageにBase64文字列を含める（rowにimageが必要）
+    :return: レスポンス用のdict
+    """
+    data: Dict[str, Any] = {}
+    for key, attr, convert in _EVENT_FIELDS:
+        value = getattr(row, attr)
+        data[key] = convert(value) if convert is not None else value
+
+    image = None
+    if include_image:
+        raw = getattr(row, "image", None)
+        if isinstance(raw, bytes):
+            image = base64.b64encode(raw).decode('utf-8')
+        elif isinstance(raw, str):
+            image = raw
+    data["image"] = image
+
+    event_id = row.event_id
+    image_etag = row.image_etag
+    data["event_id"] = str(event_id)
+    data["created_at"] = _isoformat(row.created_at)
+    data["updated_at"] = _isoformat(row.updated_at)
+    data["image_url"] = event_image_url(event_id, image_etag)
+    data["image_thumbnail_url"] = event_image_url(event_id, image_etag, "thumb")
+    data["image_etag"] = image_etag
+    data["remaining_spots"] = row.remaining_spots
+    data["reward_amount"] = row.reward_amount
+    data["prefecture"] = row.prefecture
+    return data
+
+
+def serialize_events(rows: Iterable[Any], include_image: bool = False) -> List[Dict[str, Any]]:
+    """複数のイベントをまとめて serialize_event で変換する関数"""
+    return [serialize_event(row, include_image) for row in rows]
@@ -0,0 +1,35 @@
+"""
+Participant-related Pydantic schemas for FastAPI
+"""
+from pydantic import BaseModel, model_validator
+from typing import Any
+from datetime import datetime
+import uuid
+from src.models import ParticipantStatusEnum
+
+
+class ParticipantUpdate(BaseModel):
+    """Participant update model"""
+    status: str
+
+
+class ParticipantResponse(BaseModel):
+    """Participant response model"""
+    participant_id: uuid.UUID
+    event_id: uuid.UUID
+    user_id: uuid.UUID
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+    @model_validator(mode='before')
+    @classmethod
+    def convert_sqlalchemy_participant(cls, data: Any) -> Any:
+        if hasattr(data, '_sa_instance_state'):
+            # ステータスを文字列に変換
+            if isinstance(data.status, ParticipantStatusEnum):
+                data.status = data.status.value
+        return data
@@ -0,0 +1,22 @@
+"""
+Player-related Pydantic schemas for FastAPI
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+import uuid
+
+
+class Player(BaseModel):
+    """Player response model (経験値・レベルと次のレベルまでの進み具合)"""
+    user_id: uuid.UUID
+    level: int
+    experience: int
+    level_experience: int                          # 現在のレベルに必要な累計経験値
+    next_level_experience: Optional[int] = None    # 次のレベルに必要な累計経験値（最大レベルの場合はNone）
+    skill_data: Dict[str, Any] = {}
+    item_data: Any = []
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
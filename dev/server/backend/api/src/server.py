@@ -0,0 +1,121 @@
+"""
+APIサーバー (uvicorn) の起動設定
+
+SERVER_MODE で起動モードを切り替える:
+    development  1ワーカー・自動リロードあり (デフォルト。ローカル開発用)
+    production   CPUコア数のワーカー・自動リロードなし・uvloop/httptools を使用
+
+環境変数:
+    SERVER_MODE                 起動モード (development / production)
+    HOST                        待ち受けるアドレス (デフォルト: 0.0.0.0)
+    PORT                        待ち受けるポート (デフォルト: 3000)
+    WEB_CONCURRENCY             ワーカー数 (production のデフォルト: 使用できるCPUコア数)
+    DB_MAX_CONNECTIONS          全ワーカー合計のDB接続数の上限。指定した場合はワーカー数で割って
+                                ワーカーごとの DB_POOL_SIZE / DB_MAX_OVERFLOW を決める
+                                (DB_ASYNC=true の場合は同期エンジン用の DB_SYNC_POOL_SIZE / DB_SYNC_MAX_OVERFLOW と半分ずつ)
+    TIMEOUT_KEEP_ALIVE          Keep-Alive の接続を保持する秒数 (デフォルト: 5)
+    TIMEOUT_GRACEFUL_SHUTDOWN   終了時に処理中のリクエストを待つ最大秒数 (デフォルト: 30)
+    BACKLOG                     接続待ちキューの長さ (デフォルト: 2048)
+"""
+import importlib.util
+import os
+from typing import Any, Dict
+
+from src.logger import get_logger
+
+logger = get_logger("server")
+
+SERVER_MODE = os.getenv("SERVER_MODE", "development").lower()
+
+
+def cpu_count() -> int:
+    """このプロセスが使用できるCPUコア数を返す (コンテナのCPU制限 (affinity) を考慮する)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """
+    APIサーバーのワーカー数を返す
+    production では server_options() が SERVER_WORKERS に設定し、ワーカーのプロセスに引き継がれる。
+    uvicorn コマンドで直接起動した場合は WEB_CONCURRENCY (uvicorn の --workers のデフォルト) を使う。
+    """
+    return max(int(os.getenv("SERVER_WORKERS") or os.getenv("WEB_CONCURRENCY") or 1), 1)
+
+
+def configure_db_pool(workers: int) -> None:
+    """
+    DB_MAX_CONNECTIONS が指定されている場合、ワーカーごとのコネクションプールの大きさを環境変数に設定する
+    ワーカーは起動時に src.database を読み込み直すため、ワーカーの起動前に呼び出すこと。
+    全ワーカーの接続数の合計 (pool_size + max_overflow) が DB_MAX_CONNECTIONS を超えないようにする。
+    DB_ASYNC=true の場合、各ワーカーは同期エンジン (DBConnector 経由の /get-events など) と
+    非同期エンジンの2つのプールを持つため、ワーカーごとの接続数を2つのプールで分け合う。
+    """
+    max_connections = os.getenv("DB_MAX_CONNECTIONS")
+    if not max_connections:
+        return
+    per_worker = max(int(max_connections) // workers, 1)
+    if os.getenv("DB_ASYNC", "true").lower() in ("1", "true", "yes"):
+        sync_connections = max(per_worker // 2, 1)
+        _set_pool_env("DB_SYNC_POOL_SIZE", "DB_SYNC_MAX_OVERFLOW", sync_connections)
+        per_worker = max(per_worker - sync_connections, 1)
+    _set_pool_env("DB_POOL_SIZE", "DB_MAX_OVERFLOW", per_worker)
+
+
+def _set_pool_env(pool_size_name: str, max_overflow_name: str, connections: int) -> None:
+    # 常時保持する接続を半分、一時的な接続を残りに割り当てる
+    pool_size = max(connections // 2, 1)
+    os.environ[pool_size_name] = str(pool_size)
+    os.environ[max_overflow_name] = str(max(connections - pool_size, 0))
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(mode: str = SERVER_MODE) -> Dict[str, Any]:
+    """
+    uvicorn.run() に渡す設定を返す
+    :param mode: 起動モード (development / production)
+    """
+    options: Dict[str, Any] = {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", "3000")),
+        "log_level": os.getenv("LOG_LEVEL", "info").lower(),
+    }
+    if mode != "production":
+        os.environ["SERVER_WORKERS"] = "1"
+        options.update(reload=True, workers=1)
+        return options
+
+    workers = int(os.getenv("WEB_CONCURRENCY") or cpu_count())
+    # ワーカーは起動時に環境変数を引き継ぐため、プロセス内のキャッシュなどの設定に使えるよう記録しておく
+    os.environ["SERVER_WORKERS"] = str(workers)
+    configure_db_pool(workers)
+    options.update(
+        reload=False,
+        workers=workers,
+        # uvloop / httptools がない環境 (Windowsなど) では標準の実装を使う
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
+        # アクセスログは access_log_middleware で出力する
+        access_log=False,
+        # 終了時は新しい接続の受け付けを止め、処理中のリクエストを待ってから
+        # lifespan の終了処理 (dispose_engine) でコネクションプールを解放する
+        timeout_graceful_shutdown=int(os.getenv("TIMEOUT_GRACEFUL_SHUTDOWN", "30")),
+        timeout_keep_alive=int(os.getenv("TIMEOUT_KEEP_ALIVE", "5")),
+        backlog=int(os.getenv("BACKLOG", "2048")),
+        # リバースプロキシ配下で X-Forwarded-* を使う
+        proxy_headers=True,
+    )
+    logger.info("Production server options", extra={
+        "workers": workers,
+        "loop": options["loop"],
+        "http": options["http"],
+        "db_pool_size": os.getenv("DB_POOL_SIZE"),
+        "db_max_overflow": os.getenv("DB_MAX_OVERFLOW"),
+        "db_sync_pool_size": os.getenv("DB_SYNC_POOL_SIZE"),
+        "db_sync_max_overflow": os.getenv("DB_SYNC_MAX_OVERFLOW"),
+    })
+    return options
@@ -1,5 +1,7 @@
 -- uuid-ossp 拡張機能を有効にする
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- pg_trgm 拡張機能を有効にする（イベント検索の部分一致用）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 --------------------------------------------------
 --   TABLE NAME: test
@@ -62,6 +64,8 @@ CREATE TABLE applicant (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,         -- 更新日時
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
+-- POST /join-event で同じメールアドレスの応募者を探す用インデックス
+CREATE INDEX idx_applicant_mail_address ON applicant (lower(trim(mail_address)));
 
 --------------------------------------------------
 --   TABLE NAME: events
@@ -74,24 +78,86 @@ CREATE TABLE events (
     event_type event_type NOT NULL,                         -- イベントのタイプ（列挙型）
     title VARCHAR(255) NOT NULL,                            -- イベントのタイトル
     image BYTEA,                                            -- イベントサムネイル（base64エンコード済のバイナリ）
+    image_etag VARCHAR(64),                                 -- イベントサムネイルのSHA-256（ETag用）
     description TEXT,                                       -- イベントの説明
     start_date TIMESTAMP NOT NULL,                          -- 開始日時
     end_date TIMESTAMP NOT NULL,                            -- 終了日時
     location VARCHAR(255),                                  -- 場所
     reward VARCHAR(100),                                    -- 報酬（円）
-    required_qualifications TEXT,                           -- 必要資格
+    required_qualifications TEXT,                           -- 必要資格（カンマ区切り）
+    reward_amount INTEGER,                                  -- 報酬の金額（円。reward から解析した絞り込み用の値）
+    prefecture VARCHAR(10),                                 -- 開催場所の都道府県（location から解析した絞り込み用の値）
+    qualifications TEXT[],                                  -- 必要資格のリスト（required_qualifications から作成した絞り込み用の値）
     available_spots INTEGER,                                -- 募集人数
+    remaining_spots INTEGER CHECK (remaining_spots >= 0),   -- 残りの募集枠数（NULLは定員なし）
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,         -- 作成日時
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,         -- 更新日時
-    tags JSON,                                              -- タグ・ジャンル
+    tags JSONB,                                             -- タグ・ジャンル（[{"label": ..., "color": ...}]）
+    -- イベント検索 (GET /events/search) 用の生成列
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(location, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(jsonb_path_query_array(tags::jsonb, '$[*].label'), '[]'::jsonb)), 'B')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED,                                               -- 全文検索用（タイトル・場所・タグ・説明）
+    search_text TEXT GENERATED ALWAYS AS (
+        lower(
+            title || ' ' || coalesce(location, '') || ' '
+            || coalesce(jsonb_path_query_array(tags::jsonb, '$[*].label')::text, '') || ' '
+            || coalesce(description, ''))
+    ) STORED,                                               -- 部分一致検索用（小文字にして連結）
     FOREIGN KEY (company_id) REFERENCES company(user_id) ON DELETE CASCADE  -- * 会社が削除された場合、関連するイベントも削除
 );
+-- 日付範囲検索（カレンダー表示）用のインデックス
+CREATE INDEX idx_events_start_date ON events (start_date);
+CREATE INDEX idx_events_start_date_event_type ON events (start_date, event_type);
+-- カーソルページング用のインデックス
+CREATE INDEX idx_events_created_at_event_id ON events (created_at, event_id);
+-- イベント検索用のインデックス（全文検索・トライグラムによる部分一致）
+CREATE INDEX idx_events_search_vector ON events USING GIN (search_vector);
+CREATE INDEX idx_events_search_text_trgm ON events USING GIN (search_text gin_trgm_ops);
+-- 絞り込み・ファセット用のインデックス
+CREATE INDEX idx_events_tags ON events USING GIN (tags jsonb_path_ops);
+CREATE INDEX idx_events_qualifications ON events USING GIN (qualifications);
+CREATE INDEX idx_events_reward_amount ON events (reward_amount);
+CREATE INDEX idx_events_prefecture_start_date ON events (prefecture, start_date);
+-- 応募したことのある企業のイベントを取得する用のインデックス（フィードの候補）
+CREATE INDEX idx_events_company_id_start_date ON events (company_id, start_date);
+
+--------------------------------------------------
+--   TABLE NAME: event_calendar_days
+-- DESCRIPTIONS: 日ごと・イベントの種類ごとのイベント数を管理するテーブル（カレンダー表示用の集計。イベントの作成・更新・削除時に更新）
+--------------------------------------------------
+CREATE TABLE event_calendar_days (
+    day DATE NOT NULL,                                      -- 開始日
+    event_type event_type NOT NULL,                         -- イベントのタイプ
+    event_count INTEGER NOT NULL DEFAULT 0,                 -- イベント数
+    PRIMARY KEY (day, event_type)                           -- 月ごとの取得用
+);
+
+--------------------------------------------------
+--   TABLE NAME: event_qualifications
+-- DESCRIPTIONS: イベントの必要資格を正規化した資格 → イベントの転置インデックス（おすすめイベントの検索用）
+--------------------------------------------------
+CREATE TABLE event_qualifications (
+    qualification VARCHAR(100) NOT NULL,                    -- 正規化した資格名（NFKC・小文字・空白なし）
+    event_id UUID NOT NULL,                                 -- イベントID（外部キー）
+    start_date TIMESTAMP NOT NULL,                          -- イベントの開始日時（events.start_date の複製）
+    reward_amount INTEGER,                                  -- 報酬の金額（events.reward_amount の複製）
+    required_count INTEGER NOT NULL,                        -- イベントの必要資格の数（一致率の計算用）
+    PRIMARY KEY (qualification, event_id),
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE -- イベントが削除された場合、関連する資格も削除
+);
+-- 資格ごとに開催前のイベントを取得する用インデックス（スコアの計算に使う列を含め、events を読まずに集計する）
+CREATE INDEX idx_event_qualifications_qualification_start_date
+    ON event_qualifications (qualification, start_date) INCLUDE (event_id, reward_amount, required_count);
+CREATE INDEX idx_event_qualifications_event_id ON event_qualifications (event_id);
 
 --------------------------------------------------
 --   TABLE NAME: applications
 -- DESCRIPTIONS: イベントへの応募情報を管理するテーブル
 --------------------------------------------------
-CREATE TYPE application_status AS ENUM ('PENDING', 'APPROVED', 'REJECTED');
+CREATE TYPE application_status AS ENUM ('PENDING', 'APPROVED', 'REJECTED', 'WAITLISTED');
 CREATE TABLE applications (
     application_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(), -- 応募ID（主キー）
     event_id UUID NOT NULL,                                     -- イベントID（外部キー）
@@ -102,7 +168,23 @@ CREATE TABLE applications (
     processed_at TIMESTAMP,                                     -- 処理日時
     processed_by UUID,                                          -- 処理者ID（企業側ユーザー）
     FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE, -- * イベントが削除された場合、関連する応募も削除
-    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- * ユーザーが削除された場合、関連する応募も削除
+    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE, -- * ユーザーが削除された場合、関連する応募も削除
+    CONSTRAINT uq_applications_event_id_user_id UNIQUE (event_id, user_id)   -- 同じイベントへの重複応募を防止
+);
+-- カーソルページング用のインデックス
+CREATE INDEX idx_applications_applied_at_application_id ON applications (applied_at, application_id);
+-- キャンセル待ちの繰り上げ用のインデックス
+CREATE INDEX idx_applications_event_id_status_applied_at ON applications (event_id, status, applied_at);
+
+--------------------------------------------------
+--   TABLE NAME: idempotency_keys
+-- DESCRIPTIONS: 冪等キー（Idempotency-Key ヘッダー）と最初のレスポンスを保存するテーブル
+--------------------------------------------------
+CREATE TABLE idempotency_keys (
+    idempotency_key VARCHAR(255) PRIMARY KEY,               -- 冪等キー（主キー）
+    request_hash CHAR(64) NOT NULL,                         -- リクエスト内容のSHA-256
+    response JSON NOT NULL,                                 -- 最初のリクエストに返したレスポンス
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP          -- 作成日時
 );
 
 --------------------------------------------------
@@ -148,6 +230,84 @@ CREATE TABLE player (
     FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- * ユーザーが削除された場合、関連するプレイヤーデータも削除
 );
 
+--------------------------------------------------
+--   TABLE NAME: xp_events
+-- DESCRIPTIONS: 経験値の獲得履歴を管理するテーブル（追記のみ。player の経験値はこの合計から再計算できる）
+--------------------------------------------------
+CREATE TYPE xp_source AS ENUM ('APPLICATION_APPROVED', 'EVENT_COMPLETED', 'REVIEW_RATED', 'MIGRATED', 'REVIEW_ADJUSTED');
+
+CREATE TABLE xp_events (
+    xp_event_id BIGSERIAL PRIMARY KEY,                      -- 履歴ID（主キー。記録順）
+    user_id UUID NOT NULL,                                  -- ユーザーID（外部キー）
+    source xp_source NOT NULL,                              -- 獲得理由
+    source_id UUID,                                         -- 獲得理由のID（応募ID・参加者ID・レビューIDなど）
+    company_id UUID,                                        -- 経験値を獲得したイベントの企業ID
+    amount INTEGER NOT NULL,                                -- 経験値（補正の場合は負の値もある）
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 獲得日時
+    applied_at TIMESTAMP,                                   -- player に集計した日時（未集計はNULL）
+    CONSTRAINT uq_xp_events_user_id_source_source_id UNIQUE (user_id, source, source_id), -- 同じ理由で二重に付与しない
+    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- ユーザーが削除された場合、関連する履歴も削除
+);
+-- 未集計の履歴を古い順に取得する用インデックス
+CREATE INDEX idx_xp_events_unapplied ON xp_events (xp_event_id) WHERE applied_at IS NULL;
+
+--------------------------------------------------
+--   TABLE NAME: leaderboard_snapshot
+-- DESCRIPTIONS: ランキング（全体・企業ごと・月ごと）のスナップショットを管理するテーブル
+--------------------------------------------------
+CREATE TABLE leaderboard_snapshot (
+    board VARCHAR(100) NOT NULL,                            -- ボード名（global / company:{company_id} / monthly:YYYY-MM）
+    user_id UUID NOT NULL,                                  -- ユーザーID（外部キー）
+    score INTEGER NOT NULL,                                 -- スコア（経験値）
+    rank INTEGER NOT NULL,                                  -- スナップショット時点の順位
+    snapshot_at TIMESTAMP NOT NULL,                         -- スナップショット日時
+    PRIMARY KEY (board, user_id),
+    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- ユーザーが削除された場合、関連するスナップショットも削除
+);
+
+--------------------------------------------------
+--   TABLE NAME: applicant_feed
+-- DESCRIPTIONS: 応募者ごとのおすすめイベントのフィードを管理するテーブル（バックグラウンドで作成する）
+--------------------------------------------------
+CREATE TABLE applicant_feed (
+    user_id UUID NOT NULL,                                  -- ユーザーID（外部キー）
+    position INTEGER NOT NULL,                              -- 順位（1から）
+    event_id UUID NOT NULL,                                 -- イベントID（削除されたイベントは作り直しで除くため外部キーにしない）
+    score DOUBLE PRECISION NOT NULL,                        -- スコア
+    PRIMARY KEY (user_id, position),                        -- フィードの取得（キーセットページング）用
+    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- ユーザーが削除された場合、関連するフィードも削除
+);
+-- イベントの更新時にフィードを作り直す応募者を探す用インデックス
+CREATE INDEX idx_applicant_feed_event_id ON applicant_feed (event_id);
+
+--------------------------------------------------
+--   TABLE NAME: applicant_feed_state
+-- DESCRIPTIONS: 応募者ごとのフィードの作成状況を管理するテーブル（行のある応募者のフィードを作成する）
+--------------------------------------------------
+CREATE TABLE applicant_feed_state (
+    user_id UUID PRIMARY KEY,                               -- ユーザーID（主キー・外部キー）
+    dirty BOOLEAN NOT NULL DEFAULT TRUE,                    -- 作り直しが必要か
+    qualifications TEXT[],                                  -- 作成時の応募者の資格（正規化した資格名）
+    refreshed_at TIMESTAMP,                                 -- 最後に作り直した日時
+    FOREIGN KEY (user_id) REFERENCES applicant(user_id) ON DELETE CASCADE -- ユーザーが削除された場合、関連する状態も削除
+);
+-- 作り直しが必要な応募者・古いフィードを取得する用インデックス
+CREATE INDEX idx_applicant_feed_state_dirty ON applicant_feed_state (user_id) WHERE dirty;
+CREATE INDEX idx_applicant_feed_state_refreshed_at ON applicant_feed_state (refreshed_at);
+-- イベントの必要資格を持つ応募者を探す用インデックス
+CREATE INDEX idx_applicant_feed_state_qualifications ON applicant_feed_state USING GIN (qualifications);
+
+--------------------------------------------------
+--   TABLE NAME: applicant_feed_outbox
+-- DESCRIPTIONS: イベントの作成・更新・削除で順位が変わりうるフィードの記録（FeedRefresher が作り直しの対象に展開して削除する）
+--------------------------------------------------
+CREATE TABLE applicant_feed_outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,                        -- 記録ID（主キー。記録順）
+    event_ids UUID[],                                       -- フィードに含まれていれば作り直すイベントID
+    qualifications TEXT[],                                  -- イベントの必要資格（正規化した資格名）
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP -- 記録日時
+);
+
 --------------------------------------------------
 --   TABLE NAME: review_requests
 -- DESCRIPTIONS: レビューリクエスト情報を管理するテーブル
@@ -182,4 +342,6 @@ CREATE TABLE reviews (
     FOREIGN KEY (application_id) REFERENCES applications(application_id) ON DELETE CASCADE,  -- 応募が削除された場合、関連するレビューも削除
     FOREIGN KEY (reviewer_id) REFERENCES users(user_id) ON DELETE CASCADE                     -- ユーザーが削除された場合、関連するレビューも削除
 );
+-- カーソルページング用のインデックス
+CREATE INDEX idx_reviews_created_at_review_id ON reviews (created_at, review_id);
 
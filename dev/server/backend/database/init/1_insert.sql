@@ -129,6 +129,38 @@ BEGIN
 
 END $$;
 
+-- 絞り込み用の列（APIでの作成時は derive_facet_values で作成する。ここでは金額と必要資格のみ）
+-- タグは正規形 [{"label": ..., "color": ...}] に変換する（APIでの作成時は normalize_tags。色は tag_color と同じ計算）
+UPDATE events
+   SET reward_amount = NULLIF(regexp_replace(reward, '[^0-9]', '', 'g'), '')::INTEGER,
+       qualifications = NULLIF(string_to_array(required_qualifications, ','), '{}'),
+       tags = (
+           SELECT jsonb_agg(jsonb_build_object(
+                      'label', t.label,
+                      'color', format('hsl(%s, 70%%, 60%%)', (
+                          SELECT sum(ascii(c)) FROM regexp_split_to_table(t.label, '') AS c
+                      ) % 360)
+                  ) ORDER BY t.ord)
+             FROM jsonb_array_elements_text(tags) WITH ORDINALITY AS t(label, ord)
+       );
+
+-- カレンダー表示用の集計（APIでの作成時は apply_calendar_changes で更新する）
+INSERT INTO event_calendar_days (day, event_type, event_count)
+SELECT date_trunc('day', start_date)::DATE, event_type, count(*)
+  FROM events
+ GROUP BY 1, 2;
+
+-- 資格の転置インデックス（APIでの作成時は sync_event_qualifications で作成する。normalize_qualification と同じ正規化）
+WITH tokens AS (
+    SELECT DISTINCT e.event_id, e.start_date, e.reward_amount,
+           lower(regexp_replace(normalize(q, NFKC), '\s', '', 'g')) AS qualification
+      FROM events e, unnest(e.qualifications) AS q
+)
+INSERT INTO event_qualifications (qualification, event_id, start_date, reward_amount, required_count)
+SELECT qualification, event_id, start_date, reward_amount, count(*) OVER (PARTITION BY event_id)
+  FROM tokens
+ WHERE qualification <> '';
+
 --applicationsダミーデータ
 -- applicationsテーブルの挿入は後で行います（applicantテーブル作成後）
 
@@ -187,10 +219,11 @@ BEGIN
         NOW() - INTERVAL '5 days'
     );
     -- ダミーデータ4 (別のステータスの例)
+    -- 同じイベントへの重複応募は一意制約 (uq_applications_event_id_user_id) で禁止されているため、別のイベントに応募する
     INSERT INTO applications (application_id, event_id, user_id, status, applied_at, processed_at)
     VALUES (
         uuid_generate_v4(),
-        event_id1,
+        event_id2,
         user_id1,            -- user_id (田中太郎)
         'PENDING',  -- '処理中'は定義されていないため'PENDING'に変更
         NOW() - INTERVAL '10 hours',
@@ -200,7 +233,7 @@ BEGIN
     INSERT INTO applications (application_id, event_id, user_id, status, applied_at, processed_at)
     VALUES (
         uuid_generate_v4(),
-        event_id2,
+        event_id3,
         user_id2,            -- user_id (佐藤花子)
         'APPROVED',
         '2025-05-01 10:00:00', -- 特定の日時を指定
@@ -211,11 +244,19 @@ BEGIN
     INSERT INTO applications (
         event_id, user_id, status, message, applied_at, processed_at
     ) VALUES
-    (event_id1, user_id1, 'PENDING', 'このインターンシップに非常に興味があります。ぜひ参加させてください。', NOW() - INTERVAL '5 days', NULL),
+    (event_id3, user_id1, 'PENDING', 'このインターンシップに非常に興味があります。ぜひ参加させてください。', NOW() - INTERVAL '5 days', NULL),
     (event_id1, user_id2, 'APPROVED', '貴社のインターンシップに参加したいです。', NOW() - INTERVAL '4 days', NOW() - INTERVAL '2 days'),
     (event_id1, user_id3, 'REJECTED', '参加を希望します。', NOW() - INTERVAL '6 days', NOW() - INTERVAL '3 days');
 END $$;
 
+-- 残りの募集枠数（APIでの応募時は EventAdmission で増減する。migrate_event_admission と同じ計算）
+UPDATE events e
+   SET remaining_spots = GREATEST(e.available_spots - (
+           SELECT count(*) FROM applications a
+            WHERE a.event_id = e.event_id AND a.status IN ('PENDING', 'APPROVED')
+       ), 0)
+ WHERE e.available_spots IS NOT NULL;
+
 -- applicationsダミーデータ
 -- 既に上記で適切なデータを挿入済み
 INSERT INTO participants (